@@ -1,12 +1,102 @@
 #!/usr/bin/env python3.10
 
-from invoke import Program, Collection
-import tasks
+import time
+
+_start: float = time.perf_counter()
+
+import atexit  # noqa: E402
+import os  # noqa: E402
+import sys  # noqa: E402
+from typing import Dict, List, Optional, Tuple  # noqa: E402
+
+from invoke import Argument, Collection, Program  # noqa: E402
+
+_invoke_imported: float = time.perf_counter()
+
+import tasks  # noqa: E402
+
+_tasks_imported: float = time.perf_counter()
+
+
+def _interpreter_startup() -> Optional[float]:
+    """
+    Time between the start of the process and the start of this script,
+    from /proc (Linux only, at the resolution of the clock ticks).
+    """
+    try:
+        with open("/proc/self/stat") as stat:
+            # Fields after the command name, which may contain spaces;
+            # starttime is the 22nd field.
+            start_ticks: int = int(stat.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as uptime_file:
+            uptime: float = float(uptime_file.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return max(
+        uptime
+        - start_ticks / os.sysconf("SC_CLK_TCK")
+        - (time.perf_counter() - _start),
+        0.0,
+    )
+
+
+class LibASMProgram(Program):
+    """
+    LibASMProgram adds a --startup-time flag, which reports the time spent
+    in each startup stage (interpreter, imports...) on exit.
+    """
+
+    # When the command line was parsed (before the tasks run).
+    _parsed: Optional[float] = None
+
+    def core_args(self) -> List[Argument]:
+        return super().core_args() + [
+            Argument(
+                name="startup-time",
+                kind=bool,
+                default=False,
+                help="Report the startup time breakdown on exit.",
+            )
+        ]
+
+    def parse_core_args(self) -> None:
+        super().parse_core_args()
+        if self.args["startup-time"].value:
+            atexit.register(self.report_startup_times, _interpreter_startup())
+
+    def execute(self) -> None:
+        self._parsed = time.perf_counter()
+        super().execute()
+
+    def report_startup_times(self, interpreter: Optional[float]) -> None:
+        stages: List[Tuple[str, float]] = [
+            ("import invoke", _invoke_imported - _start),
+            ("import tasks", _tasks_imported - _invoke_imported),
+        ]
+        if interpreter is not None:
+            stages.insert(0, ("interpreter", interpreter))
+        if self._parsed is not None:
+            stages.append(
+                ("parse the command line", self._parsed - _tasks_imported)
+            )
+        # The stages of the tasks run several times (e.g. imports) are
+        # summed up:
+        durations: Dict[str, float] = {}
+        for name, duration in tasks.startup_times:
+            durations[name] = durations.get(name, 0.0) + duration
+        stages += durations.items()
+        total: float = (interpreter or 0.0) + time.perf_counter() - _start
+        print("Startup time:", file=sys.stderr)
+        for name, duration in stages + [("total (until exit)", total)]:
+            print(f"  {name:<24} {duration * 1000:8.1f}ms", file=sys.stderr)
+
 
 # TODO: Perhaps find a DRY-way for the version?
 # TODO: refacto: everything not directly linked to invoke should be a level
 #       lower in directories.
-program = Program(namespace=Collection.from_module(tasks), version="0.0.0")
+program = LibASMProgram(
+    namespace=Collection.from_module(tasks), version="0.0.0"
+)
 
 if __name__ == "__main__":
     program.run()
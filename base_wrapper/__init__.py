@@ -5,8 +5,18 @@ libraries.
 
 from .base_wrapper import BaseWrapper
 from .result import Result
+from .lazy_args import LazyArg, LazyBuffer, MemfdCapture, SharedBuffer
+from .executor import AllocationFailure, IsolatedExecutor
+from .guarded import GuardedBuffer
 
 __all__ = [
     "BaseWrapper",
     "Result",
+    "LazyArg",
+    "LazyBuffer",
+    "MemfdCapture",
+    "SharedBuffer",
+    "GuardedBuffer",
+    "AllocationFailure",
+    "IsolatedExecutor",
 ]
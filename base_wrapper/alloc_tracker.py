@@ -0,0 +1,148 @@
+"""
+The alloc_tracker module reads the counters of the allocation tracker
+(libasm_test_suite/bin_tools/alloc_tracker.c), a shim preloaded
+(LD_PRELOAD) in the processes of an IsolatedExecutor created with
+track_allocations.
+
+The shim counts the blocks allocated by the tracked library's code (and
+their frees, whoever frees them), and detects the library's invalid frees
+(double frees, pointers that weren't allocated). Comparing two snapshots
+gives the live allocation delta of a call (cf. Result.allocations).
+
+The library's allocations can also be made to fail (cf. fail_allocations),
+to test how out of memory conditions are handled.
+"""
+
+import ctypes
+import functools
+import os
+from typing import Any, Dict, NamedTuple, Optional
+
+from .ptrace import executable_ranges, function_address
+
+
+class _Counters(ctypes.Structure):
+    """
+    t_alloc_counters (cf. alloc_tracker.c).
+    """
+
+    _fields_ = [
+        ("allocations", ctypes.c_uint64),
+        ("frees", ctypes.c_uint64),
+        ("bytes_allocated", ctypes.c_uint64),
+        ("bytes_freed", ctypes.c_uint64),
+        ("invalid_frees", ctypes.c_uint64),
+        ("untracked", ctypes.c_uint64),
+        ("failed_allocations", ctypes.c_uint64),
+    ]
+
+
+class Allocations(NamedTuple):
+    """
+    Allocations and frees made by the tracked library (during a call, when
+    obtained as the difference of two snapshots).
+    """
+
+    allocations: int = 0
+    frees: int = 0
+    bytes_allocated: int = 0
+    bytes_freed: int = 0
+    invalid_frees: int = 0
+    # Allocations made to fail (cf. fail_allocations).
+    failed_allocations: int = 0
+
+    @property
+    def live_blocks(self) -> int:
+        """
+        Blocks allocated and not freed (negative when more blocks were
+        freed than allocated).
+        """
+        return self.allocations - self.frees
+
+    @property
+    def live_bytes(self) -> int:
+        return self.bytes_allocated - self.bytes_freed
+
+    def __sub__(self, other: Any) -> "Allocations":
+        return Allocations(*(a - b for a, b in zip(self, other)))
+
+    def __add__(self, other: Any) -> "Allocations":
+        return Allocations(*(a + b for a, b in zip(self, other)))
+
+    def __str__(self) -> str:
+        return (
+            f"{self.allocations} allocations ({self.bytes_allocated}B),"
+            f" {self.frees} frees ({self.bytes_freed}B),"
+            f" {self.invalid_frees} invalid frees"
+        ) + (
+            f", {self.failed_allocations} failed allocations"
+            if self.failed_allocations
+            else ""
+        )
+
+
+@functools.cache
+def _counters() -> Optional[_Counters]:
+    try:
+        return _Counters.in_dll(ctypes.CDLL(None), "g_alloc_counters")
+    except ValueError:
+        return None
+
+
+def is_preloaded() -> bool:
+    """
+    Whether the tracker is preloaded in the current process.
+    """
+    return _counters() is not None
+
+
+def snapshot() -> Allocations:
+    """
+    Current values of the counters (zeros if the tracker isn't preloaded).
+    """
+    counters: Optional[_Counters] = _counters()
+    if counters is None:
+        return Allocations()
+    return Allocations(
+        counters.allocations,
+        counters.frees,
+        counters.bytes_allocated,
+        counters.bytes_freed,
+        counters.invalid_frees,
+        counters.failed_allocations,
+    )
+
+
+def track(f: Any) -> None:
+    """
+    Counts the blocks allocated by the code of the library defining `f` (a
+    foreign function).
+    """
+    library: ctypes.CDLL = ctypes.CDLL(None)
+    for start, end in executable_ranges(function_address(f)):
+        library.alloc_tracker_add_range(
+            ctypes.c_size_t(start), ctypes.c_size_t(end)
+        )
+
+
+def fail_allocations(nth: int, keep_failing: bool = False) -> None:
+    """
+    Makes the `nth` (starting at 1) allocation attempt of the tracked code
+    fail (malloc, calloc and realloc return NULL and set errno to ENOMEM),
+    as well as the following ones with `keep_failing`. Attempts are counted
+    from this call, 0 disables the failures.
+    """
+    ctypes.CDLL(None).alloc_tracker_fail(
+        ctypes.c_uint64(nth), ctypes.c_int(keep_failing)
+    )
+
+
+def preload_environment(path: str) -> Dict[str, str]:
+    """
+    The current environment, with the tracker at `path` preloaded.
+    """
+    environment: Dict[str, str] = dict(os.environ)
+    environment["LD_PRELOAD"] = " ".join(
+        filter(None, (os.path.abspath(path), environment.get("LD_PRELOAD")))
+    )
+    return environment
@@ -5,9 +5,12 @@ for test purpose.
 """
 
 import ctypes
+import functools
 import os
-from typing import Dict, Type, Tuple
+from typing import Any, Dict, Optional, Type, Tuple
 
+from .batch import Batch
+from .elf import ElfError, LibraryIndex, library_index, library_path
 from .decorators import (
     wrap_CDLL_func,
 )
@@ -29,7 +32,7 @@ class NotImplementedCDLLFunc(CDLLFunc[None, P]):
 
 def make_not_implemented_CDLLFunc(func_name: str) -> CDLLFunc[None, P]:
 
-    return NotImplementedCDLLFunc("func_name")
+    return NotImplementedCDLLFunc(func_name)
 
 
 # def NotImplementedCDLLFuncFactory(CDLLFunc):
@@ -43,6 +46,12 @@ def make_not_implemented_CDLLFunc(func_name: str) -> CDLLFunc[None, P]:
 #         raise NotImplementedError(f"{self.func_name} not implemented.")
 
 
+def _portable(value: Any) -> Any:
+    if isinstance(value, ctypes.CDLL):
+        return value._name
+    return value
+
+
 # TODO: make it explicitly an abstract class
 class BaseWrapper:
     """
@@ -51,6 +60,35 @@ class BaseWrapper:
     """
 
     functions: Dict[str, FuncInfos]
+    # Path of the compiled batch harness (cf. base_wrapper.batch).
+    batch_shim_path: Optional[str] = None
+    # Path of the compiled allocation tracker (cf.
+    # base_wrapper.alloc_tracker).
+    alloc_tracker_path: Optional[str] = None
+    # Path of the compiled fault reporter (cf. base_wrapper.faults).
+    fault_reporter_path: Optional[str] = None
+    # Kept to rebuild the wrapper in another process (cf. __reduce__).
+    _init_args: Tuple[Tuple[Any, ...], Dict[str, Any]]
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> "BaseWrapper":
+        self: BaseWrapper = super().__new__(cls)
+        self._init_args = (args, kwargs)
+        return self
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Any, ...]]:
+        """
+        Wrappers are pickled as their constructor arguments (CDLL instances
+        as their name), e.g. to be rebuilt in the exec'd workers of an
+        IsolatedExecutor.
+        """
+        args, kwargs = self._init_args
+        return (
+            functools.partial(
+                type(self),
+                **{key: _portable(value) for key, value in kwargs.items()},
+            ),
+            tuple(_portable(arg) for arg in args),
+        )
 
     def __init__(
         self,
@@ -58,6 +96,8 @@ class BaseWrapper:
         /,
         *,
         system_lib: bool = False,
+        timeout: Optional[float] = None,
+        batch_shim: Optional[str | ctypes.CDLL] = None,
     ) -> None:
         """
         __init__ expects either a path to a shared library (.so), or a
@@ -68,8 +108,18 @@ class BaseWrapper:
 
         system_lib(bool): determines whether the provided lib path should be
         resolved as a system library by using an explicit path. Default: False.
+
+        timeout (Optional[float]): default timeout (in seconds) of the calls
+        run through an IsolatedExecutor. Default: None (no timeout).
+
+        batch_shim (Optional[str | ctypes.CDLL]): batch harness (path or
+        CDLL instance) used by the batch attribute. Default: None
+        (batch_shim_path).
         """
         self.system_lib: bool = system_lib
+        self.timeout: Optional[float] = timeout
+        self._batch_shim: Optional[str | ctypes.CDLL] = batch_shim
+        self._batch: Optional[Batch] = None
 
         attr_name: str
 
@@ -95,6 +145,53 @@ class BaseWrapper:
             func_name = self.get_src_func_name(func_name)
             self.build_method(attr_name, func_name, func_infos)
 
+    @property
+    def batch(self) -> Batch:
+        """
+        The wrapped functions, called on whole batches of inputs in a single
+        ctypes crossing (cf. base_wrapper.batch), e.g.
+        `wrapper.batch.ft_strlen([b"foo", b"bar"])`.
+        """
+        if self._batch is None:
+            shim: Optional[str | ctypes.CDLL] = (
+                self._batch_shim or self.batch_shim_path
+            )
+            if shim is None:
+                raise NotImplementedError(
+                    f"{type(self).__name__} has no batch harness."
+                )
+            if isinstance(shim, str):
+                if not os.path.isfile(shim):
+                    raise FileNotFoundError(
+                        f"{shim} not found (it's compiled by the build task)."
+                    )
+                shim = ctypes.CDLL(os.path.abspath(shim))
+            self._batch = Batch(self, shim)
+        return self._batch
+
+    @functools.cached_property
+    def symbols(self) -> Optional[LibraryIndex]:
+        """
+        Index of the symbols of the wrapped library (cf. elf.library_index),
+        None when its file can't be read (e.g. it isn't ELF64).
+        """
+        path: Optional[str] = library_path(self.cdll)
+        if path is None:
+            return None
+        try:
+            return library_index(path)
+        except (OSError, ElfError):
+            return None
+
+    def implements(self, func_name: str) -> bool:
+        """
+        Whether the wrapped library defines `func_name` (rather than one of
+        its dependencies).
+        """
+        if self.symbols is None:
+            return hasattr(self.cdll, func_name)
+        return self.symbols.implements(func_name)
+
     def get_attr_name(self, func_name: str) -> str:
         return func_name
 
@@ -105,11 +202,17 @@ class BaseWrapper:
         self, attr_name: str, func_name: str, func_infos: FuncInfos
     ) -> None:
         f_decorated: WrappedCDLLFunc
-        f: CDLLFunc = getattr(
-            self.cdll, func_name, make_not_implemented_CDLLFunc(func_name)
+        f: CDLLFunc = (
+            getattr(self.cdll, func_name)
+            if self.implements(func_name)
+            else make_not_implemented_CDLLFunc(func_name)
         )
         f.argtypes = func_infos.argtypes
-        f.restype = func_infos.restype
+        # type(None) stands for void, ctypes expects None (it would call
+        # any other Python type on the return value).
+        f.restype = (
+            None if func_infos.restype is type(None) else func_infos.restype
+        )
         if func_infos.errcheck is not None:
             f.errcheck = func_infos.errcheck
         f_decorated = wrap_CDLL_func(f)
@@ -0,0 +1,204 @@
+"""
+The batch module calls a foreign function on a whole batch of inputs in a
+single ctypes crossing, through a small C shim (cf.
+libasm_test_suite/bin_tools/batch.c) that loops over the inputs.
+
+This avoids paying the ctypes argument conversion, the errcheck and the
+wrapping layers (cf. decorators.wrap_CDLL_func) for each input, which
+dominate the duration of short calls.
+
+The results are raw: errcheck isn't applied, errno is returned alongside
+the return values.
+"""
+
+import array
+import ctypes
+import itertools
+import operator
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+
+# This permits to avoid circular imports.
+if TYPE_CHECKING:
+    from .base_wrapper import BaseWrapper
+
+# An argument column: either byte strings (packed in a single buffer and
+# passed as pointers), integers, or ready-made addresses (array("Q")).
+Column = Union[Sequence[bytes], Sequence[int], array.array]
+
+
+class _Column(ctypes.Structure):
+    _fields_ = [
+        ("base", ctypes.c_size_t),
+        ("values", ctypes.c_void_p),
+    ]
+
+
+class BatchResult(NamedTuple):
+    """
+    Return values (as 64 bits integers, pointers are addresses) and errno
+    values of each call.
+    """
+
+    return_values: array.array
+    errnos: array.array
+
+
+def _type_code(ctype: Optional[Type[Any]]) -> str:
+    """
+    Type codes of the shim's entry points (cf. batch.c).
+    """
+    if ctype is None or ctype is type(None):
+        return "v"
+    if ctype is ctypes.c_int:
+        return "i"
+    if ctype is ctypes.c_size_t:
+        return "z"
+    if ctype is ctypes.c_ssize_t:
+        return "s"
+    if issubclass(
+        ctype,
+        (
+            ctypes._Pointer,
+            ctypes.c_void_p,
+            ctypes.c_char_p,
+            ctypes._CFuncPtr,  # type: ignore[attr-defined]
+        ),
+    ):
+        return "p"
+    raise TypeError(f"{ctype} isn't supported by the batch harness.")
+
+
+def entry_point_name(f: Any) -> str:
+    """
+    Name of the shim entry point able to call `f` (a raw foreign function)
+    with respect to its argtypes and restype.
+    """
+    argument_codes: str = "".join(_type_code(t) for t in f.argtypes)
+    return f"batch_{argument_codes}_{_type_code(f.restype)}"
+
+
+def _signed(ctype: Optional[Type[Any]]) -> bool:
+    return ctype in (ctypes.c_int, ctypes.c_ssize_t)
+
+
+def _pack(column: Column) -> Tuple[_Column, Any]:
+    """
+    Returns the column structure and the object(s) keeping its memory
+    alive.
+    """
+    values: array.array
+    if isinstance(column, array.array):
+        values = column if column.typecode == "Q" else array.array("Q", column)
+        return _Column(0, values.buffer_info()[0]), values
+    if column and isinstance(column[0], (bytes, bytearray)):
+        # Nul terminated strings, one after the other:
+        offsets: array.array = array.array(
+            "Q",
+            itertools.accumulate(
+                # len(s) + 1 for each string but the last one (without a
+                # Python level loop).
+                map(
+                    operator.add,
+                    map(len, column[:-1]),  # type: ignore
+                    itertools.repeat(1),
+                ),
+                initial=0,
+            ),
+        )
+        packed: ctypes.Array[ctypes.c_char] = ctypes.create_string_buffer(
+            b"\0".join(column) + b"\0"  # type: ignore
+        )
+        return (
+            _Column(ctypes.addressof(packed), offsets.buffer_info()[0]),
+            (packed, offsets),
+        )
+    # Integers (negative ones are stored as their two's complement).
+    values = array.array(
+        "Q", (v & 0xFFFFFFFFFFFFFFFF for v in column)  # type: ignore
+    )
+    return _Column(0, values.buffer_info()[0]), values
+
+
+class BatchFunction:
+    """
+    BatchFunction calls a foreign function on each row of its argument
+    columns, e.g. `strcmp(["a", "b"], ["a", "c"])` calls strcmp("a", "a")
+    then strcmp("b", "c").
+    """
+
+    def __init__(self, shim: ctypes.CDLL, f: Any) -> None:
+        self.f = f
+        self.address: Optional[int] = ctypes.cast(f, ctypes.c_void_p).value
+        self.entry_point: Any = getattr(shim, entry_point_name(f))
+        self.entry_point.restype = None
+        self.entry_point.argtypes = (
+            ctypes.c_void_p,
+            ctypes.POINTER(_Column),
+            ctypes.c_size_t,
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+        )
+        self.signed: bool = _signed(f.restype)
+
+    def __call__(self, *columns: Column) -> BatchResult:
+        if len(columns) != len(self.f.argtypes):
+            raise TypeError(
+                f"{len(self.f.argtypes)} argument columns expected, got"
+                f" {len(columns)}."
+            )
+        n: int = len(columns[0]) if columns else 0
+        if any(len(column) != n for column in columns):
+            raise ValueError("Argument columns have different lengths.")
+        packed: List[Tuple[_Column, Any]] = [_pack(c) for c in columns]
+        column_structs: ctypes.Array[_Column] = (_Column * len(packed))(
+            *(column_struct for column_struct, _ in packed)
+        )
+        return_values: array.array = array.array(
+            "q" if self.signed else "Q", bytes(8 * n)
+        )
+        errnos: array.array = array.array("i", bytes(4 * n))
+        self.entry_point(
+            self.address,
+            column_structs,
+            n,
+            return_values.buffer_info()[0],
+            errnos.buffer_info()[0],
+        )
+        return BatchResult(return_values, errnos)
+
+
+class Batch:
+    """
+    Batch exposes the functions of a wrapper as BatchFunctions, under the
+    same names (wrapper.batch.ft_strlen([b"foo", b"bar"]) for instance).
+    """
+
+    def __init__(self, wrapper: "BaseWrapper", shim: ctypes.CDLL) -> None:
+        self.wrapper = wrapper
+        self.shim = shim
+        self._functions: Dict[str, BatchFunction] = {}
+
+    def __getattr__(self, name: str) -> Callable[..., BatchResult]:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        functions: Dict[str, BatchFunction] = self.__dict__["_functions"]
+        if name not in functions:
+            raw: Any = getattr(self.wrapper, f"raw_{name}", None)
+            if raw is None:
+                raise AttributeError(name)
+            if not isinstance(raw, ctypes._CFuncPtr):  # type: ignore
+                raise NotImplementedError(f"{name} not implemented.")
+            functions[name] = BatchFunction(self.shim, raw)
+        return functions[name]
@@ -0,0 +1,302 @@
+"""
+The benchmark module provides a benchmark engine for foreign functions,
+either raw (ctypes) or wrapped (cf. decorators.wrap_CDLL_func).
+
+The process is pinned to a single core during the measure, the function is
+warmed up, the number of calls per sample and the number of samples are
+chosen adaptively, outliers are rejected, and the measured overhead of the
+ctypes (and wrapping) layers is subtracted (unless it isn't well below the
+duration of the call, in which case the difference would be mostly noise).
+"""
+
+import contextlib
+import ctypes
+import math
+import os
+import statistics
+import time
+from typing import (
+    Any,
+    Callable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .decorators import wrap_CDLL_func
+
+# Normal distribution quantiles for the usual confidence levels.
+_z_values = {0.9: 1.645, 0.95: 1.96, 0.99: 2.576}
+
+
+class BenchmarkStats(NamedTuple):
+    """
+    Durations are in nanoseconds per call, overhead subtracted if
+    overhead_subtracted.
+    """
+
+    median: float
+    p95: float
+    ci_low: float
+    ci_high: float
+    samples: int
+    outliers: int
+    loops: int
+    overhead: float
+    overhead_subtracted: bool
+
+    @property
+    def ci_half_width(self) -> float:
+        return (self.ci_high - self.ci_low) / 2
+
+    @property
+    def relative_precision(self) -> float:
+        if not self.median:
+            return math.inf
+        return self.ci_half_width / self.median
+
+
+###############################################################################
+#                                Statistics                                   #
+###############################################################################
+
+
+def reject_outliers(
+    samples: Sequence[float], threshold: float = 3.5
+) -> Tuple[List[float], int]:
+    """
+    Rejects the samples whose modified z-score (based on the median
+    absolute deviation) exceeds `threshold`. Returns the kept samples and
+    the number of rejected ones.
+    """
+    median: float = statistics.median(samples)
+    mad: float = statistics.median(abs(s - median) for s in samples)
+    if not mad:
+        kept = [s for s in samples if s == median]
+    else:
+        kept = [
+            s for s in samples if 0.6745 * abs(s - median) / mad <= threshold
+        ]
+    return kept, len(samples) - len(kept)
+
+
+def percentile(sorted_samples: Sequence[float], p: float) -> float:
+    """
+    Linear interpolation percentile of already sorted samples.
+    """
+    k: float = (len(sorted_samples) - 1) * p
+    lo: int = math.floor(k)
+    hi: int = math.ceil(k)
+    return sorted_samples[lo] + (sorted_samples[hi] - sorted_samples[lo]) * (
+        k - lo
+    )
+
+
+def median_confidence_interval(
+    sorted_samples: Sequence[float], confidence: float = 0.95
+) -> Tuple[float, float]:
+    """
+    Distribution-free confidence interval of the median, based on the
+    binomial distribution of the ranks (normal approximation).
+    """
+    n: int = len(sorted_samples)
+    delta: float = _z_values[confidence] * math.sqrt(n) / 2
+    lo: int = max(0, math.floor(n / 2 - delta))
+    hi: int = min(n - 1, math.ceil(n / 2 + delta) - 1)
+    return sorted_samples[lo], sorted_samples[hi]
+
+
+###############################################################################
+#                                  Engine                                     #
+###############################################################################
+
+
+@contextlib.contextmanager
+def pinned(cpu: Optional[int] = None) -> Iterator[int]:
+    """
+    Pins the current process to `cpu` (by default, the last one it's
+    allowed to run on) and restores the previous affinity afterwards.
+    """
+    previous: set = os.sched_getaffinity(0)
+    if cpu is None:
+        cpu = max(previous)
+    os.sched_setaffinity(0, {cpu})
+    try:
+        yield cpu
+    finally:
+        os.sched_setaffinity(0, previous)
+
+
+def _time_sample(
+    f: Callable[..., Any],
+    args: Tuple[Any, ...],
+    loops: int,
+    cleanup: Optional[Callable[[Any], None]],
+) -> float:
+    """
+    Returns the duration of a call in nanoseconds, averaged over `loops`
+    calls.
+    """
+    r = range(loops)
+    if cleanup is None:
+        start: int = time.perf_counter_ns()
+        for _ in r:
+            f(*args)
+        return (time.perf_counter_ns() - start) / loops
+    start = time.perf_counter_ns()
+    for _ in r:
+        cleanup(f(*args))
+    return (time.perf_counter_ns() - start) / loops
+
+
+def null_function(f: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    null_function returns a function going through the same layers as `f`
+    (same prototype and flags, e.g. use_errno, same argtypes, restype and
+    errcheck, wrapped by wrap_CDLL_func if `f` is) but calling a native
+    function that does (almost) nothing: libc's labs, which only reads its
+    first argument.
+    """
+    wrapped: bool = hasattr(f, "__wrapped__")
+    raw: Any = getattr(f, "__wrapped__", f)
+    # The class of a foreign function holds its calling convention and
+    # flags (those of the CDLL it comes from, or of its CFUNCTYPE).
+    null: Any = type(raw)(
+        ctypes.cast(ctypes.CDLL("libc.so.6").labs, ctypes.c_void_p).value
+    )
+    null.argtypes = raw.argtypes
+    null.restype = raw.restype
+    if getattr(raw, "errcheck", None) is not None:
+        null.errcheck = raw.errcheck
+    return wrap_CDLL_func(null) if wrapped else null
+
+
+def _subtracted(
+    raw_samples: Sequence[float],
+    overheads: Sequence[float],
+    max_overhead: float,
+) -> bool:
+    """
+    Whether the overhead is well enough below the raw durations to be
+    subtracted from them.
+    """
+    return bool(overheads) and statistics.median(
+        overheads
+    ) <= max_overhead * statistics.median(raw_samples)
+
+
+def benchmark(
+    f: Callable[..., Any],
+    *args: Any,
+    cpu: Optional[int] = None,
+    warmup_time: float = 0.02,
+    min_sample_time: float = 0.001,
+    min_samples: int = 10,
+    max_samples: int = 1000,
+    max_time: float = 1.0,
+    target_precision: float = 0.01,
+    confidence: float = 0.95,
+    subtract_overhead: bool = True,
+    max_overhead: float = 0.5,
+    cleanup: Optional[Callable[[Any], None]] = None,
+) -> BenchmarkStats:
+    """
+    benchmark measures the duration of `f(*args)` (a raw or wrapped
+    foreign function).
+
+    Each sample lasts at least `min_sample_time` seconds (the number of
+    calls per sample is doubled until it does). Samples are taken until the
+    confidence interval of the median is within `target_precision` (relative
+    to the median), with at least `min_samples` and at most `max_samples`
+    samples or `max_time` seconds. At least `min_samples` samples are kept
+    after the outliers are rejected (unless `max_samples` is reached).
+
+    The overhead is measured with null_function(f), alternating with the
+    samples of f, so that both are equally affected by frequency scaling
+    or background load. Each sample is the difference of the two, unless
+    the median overhead exceeds `max_overhead` times the median duration
+    of f: the raw durations are reported then.
+
+    `cleanup` is called with each return value (to free returned memory for
+    instance), its cost isn't subtracted.
+    """
+    null: Optional[Callable[..., Any]] = None
+    overheads: List[float] = []
+    samples: List[float] = []
+    raw_samples: List[float] = []
+    loops: int = 1
+    kept: List[float]
+    n_outliers: int
+
+    if subtract_overhead:
+        null = null_function(f)
+        try:
+            null(*args)
+        except OSError:
+            # The errcheck of f rejected labs' return value.
+            null = None
+
+    with pinned(cpu):
+        # Warmup:
+        deadline: float = time.perf_counter() + warmup_time
+        while time.perf_counter() < deadline:
+            _time_sample(f, args, 1, cleanup)
+            if null is not None:
+                _time_sample(null, args, 1, None)
+
+        # Calibration:
+        while _time_sample(f, args, loops, cleanup) * loops < (
+            min_sample_time * 1e9
+        ):
+            loops *= 2
+
+        # Sampling:
+        deadline = time.perf_counter() + max_time
+        while True:
+            sample: float = _time_sample(f, args, loops, cleanup)
+            raw_samples.append(sample)
+            if null is not None:
+                overheads.append(_time_sample(null, args, loops, None))
+                sample -= overheads[-1]
+            samples.append(sample)
+            if len(samples) >= max_samples:
+                break
+            if len(samples) < min_samples:
+                continue
+            kept, _ = reject_outliers(
+                samples
+                if _subtracted(raw_samples, overheads, max_overhead)
+                else raw_samples
+            )
+            if len(kept) < min_samples:
+                continue
+            if time.perf_counter() > deadline:
+                break
+            kept.sort()
+            ci_low, ci_high = median_confidence_interval(kept, confidence)
+            median: float = statistics.median(kept)
+            if median > 0 and (ci_high - ci_low) / 2 / median <= (
+                target_precision
+            ):
+                break
+
+    subtracted: bool = _subtracted(raw_samples, overheads, max_overhead)
+    kept, n_outliers = reject_outliers(samples if subtracted else raw_samples)
+    kept.sort()
+    ci_low, ci_high = median_confidence_interval(kept, confidence)
+    # A call can't last less than nothing (the overhead measure is noisy
+    # too).
+    return BenchmarkStats(
+        median=max(0.0, statistics.median(kept)),
+        p95=max(0.0, percentile(kept, 0.95)),
+        ci_low=max(0.0, ci_low),
+        ci_high=max(0.0, ci_high),
+        samples=len(kept),
+        outliers=n_outliers,
+        loops=loops,
+        overhead=statistics.median(overheads) if overheads else 0.0,
+        overhead_subtracted=subtracted,
+    )
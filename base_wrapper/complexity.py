@@ -0,0 +1,233 @@
+"""
+The complexity module estimates the complexity class of a function from
+its costs (durations, instruction counts, comparator calls...) measured
+over geometrically growing input sizes.
+
+Each class is fitted as cost(n) = a + c * f(n) (a, c >= 0, the constant
+term absorbing call overheads) by least squares on relative residuals, so
+that small and large sizes weigh the same. The best fit is the lowest
+class whose residuals no higher class significantly reduces (noise fits
+some class a bit better than the actual one), its confidence compares its
+residuals to the residuals of the runner-up.
+"""
+
+import math
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# Complexity classes, in increasing order.
+complexity_classes: Dict[str, Callable[[float], float]] = {
+    "1": lambda n: 1.0,
+    "log n": lambda n: math.log2(n),
+    "n": lambda n: n,
+    "n log n": lambda n: n * math.log2(n),
+    "n^2": lambda n: n * n,
+    "n^3": lambda n: n * n * n,
+}
+
+# Residuals can't be smaller than this, so that exact fits tie.
+_residuals_floor: float = 1e-9
+
+# A higher class must reduce the residuals of a lower one by this fraction
+# to be preferred (noise alone sometimes fits O(1) costs to O(n^3)).
+_significant_reduction: float = 0.5
+
+
+def parse_complexity(complexity: str) -> str:
+    """
+    Normalizes `complexity` ("O(n log n)", "nlogn", "n²"...) to one of the
+    complexity_classes keys.
+    """
+    name: str = complexity.strip().lower()
+    match: Optional[re.Match] = re.fullmatch(r"o\((.*)\)", name)
+    if match:
+        name = match.group(1)
+    name = name.replace("²", "^2").replace("³", "^3").replace("**", "^")
+    name = re.sub(r"\s+", "", name).replace("log", " log ").strip()
+    name = re.sub(r"\s+", " ", name)
+    if name not in complexity_classes:
+        raise ValueError(
+            f"Unknown complexity: {complexity!r} (expected one of"
+            f" {', '.join(complexity_classes)})."
+        )
+    return name
+
+
+def geometric_sizes(start: int, stop: int, factor: float = 2) -> List[int]:
+    """
+    Sizes from `start` to `stop` (included), each `factor` times larger
+    than the previous one.
+    """
+    if start < 1 or factor <= 1:
+        raise ValueError("Sizes must start at 1 or more and grow.")
+    sizes: List[int] = []
+    size: float = start
+    while size <= stop:
+        if not sizes or round(size) != sizes[-1]:
+            sizes.append(round(size))
+        size *= factor
+    return sizes
+
+
+class ComplexityFit(NamedTuple):
+    """
+    Best fitting class, with cost(n) ~= constant + coefficient * f(n).
+    `residuals` are the relative RMS residuals of each class.
+    """
+
+    complexity: str
+    coefficient: float
+    constant: float
+    confidence: float
+    residuals: Dict[str, float]
+    sizes: Tuple[int, ...]
+    costs: Tuple[float, ...]
+
+    def predict(self, size: int) -> float:
+        return self.constant + self.coefficient * complexity_classes[
+            self.complexity
+        ](size)
+
+    def exceeds(self, max_complexity: str) -> bool:
+        """
+        Whether the fitted class is above `max_complexity`.
+        """
+        order: List[str] = list(complexity_classes)
+        return order.index(self.complexity) > order.index(
+            parse_complexity(max_complexity)
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"O({self.complexity}) (confidence: {self.confidence:.0%},"
+            f" residuals: {self.residuals[self.complexity]:.1%})"
+        )
+
+
+def _fit_class(
+    f: Callable[[float], float],
+    sizes: Sequence[int],
+    costs: Sequence[float],
+) -> Tuple[float, float, float]:
+    """
+    Returns (constant, coefficient, residuals) of the weighted least
+    squares fit of cost(n) = a + c * f(n).
+    """
+    xs: List[float] = [f(n) for n in sizes]
+    ws: List[float] = [1 / max(y, _residuals_floor) ** 2 for y in costs]
+    s0: float = sum(ws)
+    s1: float = sum(w * x for w, x in zip(ws, xs))
+    s2: float = sum(w * x * x for w, x in zip(ws, xs))
+    t0: float = sum(w * y for w, y in zip(ws, costs))
+    t1: float = sum(w * x * y for w, x, y in zip(ws, xs, costs))
+    det: float = s0 * s2 - s1 * s1
+    a: float = 0.0
+    c: float = 0.0
+    if det > 1e-12 * s0 * s2:
+        a = (s2 * t0 - s1 * t1) / det
+        c = (s0 * t1 - s1 * t0) / det
+    if a < 0 or c < 0 or det <= 1e-12 * s0 * s2:
+        # Fall back to a single term fit.
+        a, c = 0.0, t1 / s2
+        if c <= 0 or s0 * s2 - s1 * s1 <= 1e-12 * s0 * s2:
+            a, c = t0 / s0, 0.0
+    residuals: float = math.sqrt(
+        sum(w * (a + c * x - y) ** 2 for w, x, y in zip(ws, xs, costs))
+        / len(costs)
+    )
+    return a, c, max(residuals, _residuals_floor)
+
+
+def fit_complexity(
+    sizes: Sequence[int], costs: Sequence[float]
+) -> ComplexityFit:
+    """
+    Fits `costs` (measured for each of `sizes`) to each complexity class.
+
+    A class wins over the lower ones if its residuals are at most
+    1 - _significant_reduction times theirs. The confidence is
+    1 - best residuals / runner-up residuals (at least 0): close to 1 when a
+    single class fits, close to 0 when the sizes don't tell classes apart.
+    """
+    if len(sizes) != len(costs) or len(sizes) < 3:
+        raise ValueError("At least 3 (size, cost) pairs are needed.")
+    fits: Dict[str, Tuple[float, float, float]] = {
+        name: _fit_class(f, sizes, costs)
+        for name, f in complexity_classes.items()
+    }
+    # Classes whose fit degenerated to a constant are the same fit as O(1)
+    # and don't compete.
+    competing: List[str] = [
+        name
+        for name, (_, coefficient, _) in fits.items()
+        if name == "1"
+        or coefficient * complexity_classes[name](max(sizes))
+        > 1e-6 * max(costs)
+    ]
+    best: str = competing[0]
+    for name in competing[1:]:
+        if fits[name][2] <= (1 - _significant_reduction) * fits[best][2]:
+            best = name
+    constant, coefficient, residuals = fits[best]
+    confidence: float = 1.0
+    if len(competing) > 1:
+        runner_up: float = min(
+            fits[name][2] for name in competing if name != best
+        )
+        confidence = max(0.0, 1 - residuals / runner_up)
+    return ComplexityFit(
+        complexity=best,
+        coefficient=coefficient,
+        constant=constant,
+        confidence=confidence,
+        residuals={name: fit[2] for name, fit in fits.items()},
+        sizes=tuple(sizes),
+        costs=tuple(costs),
+    )
+
+
+def analyze(
+    cost: Callable[[int], float], sizes: Sequence[int], repeat: int = 1
+) -> ComplexityFit:
+    """
+    Measures `cost(n)` for each of `sizes` (the minimum of `repeat`
+    measures, for noisy costs such as durations) and fits the results.
+    """
+    return fit_complexity(
+        sizes, [min(cost(n) for _ in range(repeat)) for n in sizes]
+    )
+
+
+def check_complexity(
+    fit: ComplexityFit, max_complexity: str, min_confidence: float = 0.5
+) -> Optional[str]:
+    """
+    Returns an error message if `fit` exceeds `max_complexity` (with at
+    least `min_confidence`), None otherwise.
+    """
+    if fit.exceeds(max_complexity) and fit.confidence >= min_confidence:
+        return (
+            f"Expected at most O({parse_complexity(max_complexity)}), got"
+            f" {fit}."
+        )
+    return None
+
+
+def assert_complexity(
+    cost: Callable[[int], float],
+    sizes: Sequence[int],
+    max_complexity: str,
+    min_confidence: float = 0.5,
+    repeat: int = 1,
+) -> ComplexityFit:
+    """
+    analyze() followed by check_complexity(), raising AssertionError on
+    failure. Returns the fit.
+    """
+    fit: ComplexityFit = analyze(cost, sizes, repeat)
+    error: Optional[str] = check_complexity(
+        fit, max_complexity, min_confidence
+    )
+    if error is not None:
+        raise AssertionError(error)
+    return fit
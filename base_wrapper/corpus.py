@@ -0,0 +1,66 @@
+"""
+The corpus module stores failing inputs (minimized by the shrink module
+for instance) on disk, one directory per function, so that they can be
+replayed before anything else by later runs.
+
+Each case is a JSON file named after the hash of its content, byte
+strings are stored as hexadecimal strings.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, List
+
+from .shrink import Row, Value
+
+
+def _encode(value: Value) -> Dict[str, Any]:
+    if isinstance(value, (bytes, bytearray)):
+        return {"bytes": bytes(value).hex()}
+    return {"int": value}
+
+
+def _decode(value: Dict[str, Any]) -> Value:
+    if "bytes" in value:
+        return bytes.fromhex(value["bytes"])
+    return int(value["int"])
+
+
+class Corpus:
+    """
+    A Corpus is a directory holding the failing cases of each function.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = os.path.abspath(path)
+
+    def directory(self, function: str) -> str:
+        return os.path.join(self.path, function)
+
+    def add(self, function: str, row: Row) -> str:
+        """
+        Stores `row` (unless it already is) and returns its path.
+        """
+        content: str = json.dumps([_encode(value) for value in row])
+        digest: str = hashlib.sha256(content.encode()).hexdigest()[:16]
+        path: str = os.path.join(self.directory(function), f"{digest}.json")
+        if not os.path.isfile(path):
+            os.makedirs(self.directory(function), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(content)
+        return path
+
+    def load(self, function: str) -> List[Row]:
+        """
+        Returns the stored cases of `function`, in a stable order.
+        """
+        directory: str = self.directory(function)
+        if not os.path.isdir(directory):
+            return []
+        rows: List[Row] = []
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith(".json"):
+                with open(os.path.join(directory, filename)) as f:
+                    rows.append(tuple(_decode(v) for v in json.load(f)))
+        return rows
@@ -5,14 +5,13 @@ function to make them testable easily with pytest.
 
 from functools import wraps
 from typing import (
+    Any,
+    List,
     Optional,
     Callable,
     Type,
 )
 
-import ctypes
-import os
-
 from .wrapper_types import (
     CDLLFunc,
     WrappedCDLLFunc,
@@ -25,8 +24,42 @@ from .wrapper_types import (
     FdToWriteToInfos,
     FdToListenOnInfos,
     Mode,
+    ArgIndex,
 )
 from .result import Result
+from .lazy_args import LazyArg
+from .pumps import FeedingPump, DrainingPump
+
+
+def _call(
+    f: CDLLFunc[ResTypeTypeVar, P], *args: P.args, **kwargs: P.kwargs
+) -> Result[ResTypeTypeVar]:
+    """
+    Actually runs the CDLL function, materializing the lazy arguments
+    right before the call.
+    """
+    lazy_args: List[LazyArg] = [
+        arg for arg in args if isinstance(arg, LazyArg)
+    ]
+    result: Result[ResTypeTypeVar]
+    try:
+        materialized_args: List[Any] = [
+            arg.materialize() if isinstance(arg, LazyArg) else arg
+            for arg in args
+        ]
+        res_val = f(*materialized_args, **kwargs)
+        result = Result(res_val)
+        for arg_index, arg in enumerate(args):
+            if isinstance(arg, LazyArg):
+                arg.collect(result, ArgIndex(arg_index))
+    except OSError:
+        raise
+    finally:
+        # Lazy args are released right after the call (a returned
+        # pointer to one of them is dangling after that).
+        for lazy_arg in lazy_args:
+            lazy_arg.release()
+    return result
 
 
 def wrap_CDLL_func(
@@ -44,81 +77,65 @@ def wrap_CDLL_func(
         **kwargs: P.kwargs,
     ) -> Result[ResTypeTypeVar]:
         result: Result[ResTypeTypeVar]
-        mode: Optional[Mode]
+        feeding_pumps: List[FeedingPump] = []
+        draining_pumps: List[DrainingPump] = []
 
-        # Handling writing:
+        # fds should be assumed to be already opened.
+        # Pipes are fed and drained concurrently with the call.
         if fds_to_write_to_infos:
-            current_fd_to_write_to: FdToWriteTo
-            current_fd_to_write_to_infos: FdToWriteToInfos
-            current_data_to_write: bytes
-            current_size_to_write: ctypes.c_size_t
-            current_associated_fd_to_listen_on: FdToListenOn
-
-            current_fd_to_write_to, current_fd_to_write_to_infos = (
-                fds_to_write_to_infos.popitem()
-            )
-            (
-                current_data_to_write,
-                current_size_to_write,
-                current_associated_fd_to_listen_on,
-                mode,
-            ) = current_fd_to_write_to_infos
-
-            # fds should be assumed to be already opened
-            with os.fdopen(current_associated_fd_to_listen_on, "rb") as fd_r:
-                if mode is None:
-                    mode = Mode("bw")
-                with os.fdopen(current_fd_to_write_to, mode) as fd_w:
-                    fd_w.write(current_data_to_write)
-
-                result = decorated_f(
-                    *args,
-                    fds_to_write_to_infos=fds_to_write_to_infos,
-                    fds_to_listen_on_infos=fds_to_listen_on_infos,
-                    **kwargs,
+            fd_to_write_to: FdToWriteTo
+            fd_to_write_to_infos: FdToWriteToInfos
+            data_to_write: bytes
+            associated_fd_to_listen_on: FdToListenOn
+            mode: Optional[Mode]
+
+            for (
+                fd_to_write_to,
+                fd_to_write_to_infos,
+            ) in fds_to_write_to_infos.items():
+                data_to_write, _, associated_fd_to_listen_on, mode = (
+                    fd_to_write_to_infos
                 )
-
-        # Handling reading:
-        elif fds_to_listen_on_infos:
-            current_fd_to_listen_on: FdToListenOn
-            current_fd_to_listen_on_infos: FdToListenOnInfos
-            current_size_to_listen: ctypes.c_size_t
-            current_associated_fd_to_write_to: FdToWriteTo
-            retrieved_output: bytes
-
-            current_fd_to_listen_on, current_fd_to_listen_on_infos = (
-                fds_to_listen_on_infos.popitem()
-            )
-            current_size_to_listen, current_associated_fd_to_write_to, mode = (
-                current_fd_to_listen_on_infos
-            )
-
-            if mode is None:
-                mode = Mode("rb")
-            with os.fdopen(current_fd_to_listen_on, mode) as fd_r:
-                with os.fdopen(
-                    current_associated_fd_to_write_to, "wb"
-                ) as fd_w:
-                    result = decorated_f(
-                        *args,
-                        fds_to_write_to_infos=fds_to_write_to_infos,
-                        fds_to_listen_on_infos=fds_to_listen_on_infos,
-                        **kwargs,
+                feeding_pumps.append(
+                    FeedingPump(
+                        fd_to_write_to,
+                        data_to_write,
+                        associated_fd_to_listen_on,
+                        mode,
+                    )
+                )
+        if fds_to_listen_on_infos:
+            fd_to_listen_on: FdToListenOn
+            fd_to_listen_on_infos: FdToListenOnInfos
+            associated_fd_to_write_to: FdToWriteTo
+
+            for (
+                fd_to_listen_on,
+                fd_to_listen_on_infos,
+            ) in fds_to_listen_on_infos.items():
+                _, associated_fd_to_write_to, mode = fd_to_listen_on_infos
+                draining_pumps.append(
+                    DrainingPump(
+                        fd_to_listen_on, associated_fd_to_write_to, mode
                     )
-                retrieved_output = fd_r.read()
-                result.add_output(
-                    retrieved_output,
-                    current_fd_to_listen_on,
-                    current_associated_fd_to_write_to,
                 )
 
-        # Actually run the CDLL function:
-        else:
-            try:
-                res_val = f(*args, **kwargs)
-            except OSError:
-                raise
-            result = Result(res_val)
+        for pump in (*feeding_pumps, *draining_pumps):
+            pump.start()
+
+        try:
+            result = _call(f, *args, **kwargs)
+        finally:
+            for feeding_pump in feeding_pumps:
+                feeding_pump.finish()
+            outputs: List[bytes] = [
+                draining_pump.finish() for draining_pump in draining_pumps
+            ]
+
+        for draining_pump, output in zip(draining_pumps, outputs):
+            result.add_output(
+                output, draining_pump.fd, draining_pump.associated_fd
+            )
 
         return result
 
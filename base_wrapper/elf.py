@@ -0,0 +1,416 @@
+"""
+The elf module reads the symbols and relocations of ELF64 (little-endian)
+shared libraries and object files, in pure Python over a read-only mmap:
+no subprocess (nm, objdump...), and no call into the library.
+
+library_index gives, once per version of a library file, the symbols it
+defines (e.g. to tell the implemented functions without probing them with
+dlsym) and, for each defined function, the external symbols it calls
+through the PLT or the GOT (e.g. a forbidden strlen@plt call).
+
+The calls of a function are found by scanning its code for the rel32
+call/jmp instructions targeting a PLT entry, and for the RIP-relative
+indirect call/jmp instructions reading a GOT slot (-fno-plt). The scan
+doesn't decode instructions: a sequence of bytes that happens to look like
+such an instruction and hits a PLT entry or GOT slot is reported too.
+"""
+
+import ctypes
+import functools
+import mmap
+import os
+import struct
+from typing import Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Tuple
+
+# sh_type:
+SHT_SYMTAB: int = 2
+SHT_RELA: int = 4
+SHT_DYNSYM: int = 11
+
+SHN_UNDEF: int = 0
+
+# Symbol types:
+STT_NOTYPE: int = 0
+STT_FUNC: int = 2
+STT_GNU_IFUNC: int = 10
+
+# Symbol bindings:
+STB_LOCAL: int = 0
+
+_ident = struct.Struct("<4sBB")
+_header = struct.Struct("<16sHHIQQQIHHHHHH")
+_section_header = struct.Struct("<IIQQQQIIQQ")
+_symbol = struct.Struct("<IBBHQQ")
+_rela = struct.Struct("<QQq")
+
+# Opcodes of the calls and jumps found by the scan, followed by a 32 bits
+# displacement: relative to the PLT entry (rel32) or to the GOT slot
+# (indirect).
+_call_rel32: bytes = b"\xe8"
+_jmp_rel32: bytes = b"\xe9"
+_call_indirect: bytes = b"\xff\x15"
+_jmp_indirect: bytes = b"\xff\x25"
+
+
+class ElfError(ValueError):
+    pass
+
+
+class Section(NamedTuple):
+    name: str
+    type: int
+    address: int
+    offset: int
+    size: int
+    link: int
+    entry_size: int
+
+
+class Symbol(NamedTuple):
+    name: str
+    value: int
+    size: int
+    type: int
+    bind: int
+    section: int
+
+    @property
+    def defined(self) -> bool:
+        return self.section != SHN_UNDEF
+
+
+class Relocation(NamedTuple):
+    offset: int
+    type: int
+    symbol: Optional[Symbol]
+    addend: int
+
+
+class Function(NamedTuple):
+    name: str
+    address: int
+    size: int
+    # External symbols called through the PLT or the GOT, in order.
+    imports: Tuple[str, ...]
+
+
+class ElfFile:
+    """
+    ElfFile maps an ELF64 file and parses its section headers. Symbol
+    tables and relocations are parsed on demand.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        with open(path, "rb") as f:
+            self._map: mmap.mmap = mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        try:
+            self._parse_header()
+        except (ElfError, struct.error) as e:
+            self.close()
+            raise ElfError(f"{path}: {e}") from None
+
+    def __enter__(self) -> "ElfFile":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._map.close()
+
+    def _parse_header(self) -> None:
+        magic, elf_class, data = _ident.unpack_from(self._map)
+        if magic != b"\x7fELF":
+            raise ElfError("not an ELF file.")
+        if elf_class != 2 or data != 1:
+            raise ElfError("only little-endian ELF64 is supported.")
+        (
+            _,
+            self.type,
+            self.machine,
+            _,
+            _,
+            _,
+            section_headers,
+            _,
+            _,
+            _,
+            _,
+            section_header_size,
+            n_sections,
+            names_index,
+        ) = _header.unpack_from(self._map)
+        headers: List[Tuple[int, ...]] = [
+            _section_header.unpack_from(
+                self._map, section_headers + i * section_header_size
+            )
+            for i in range(n_sections)
+        ]
+        names_offset: int = headers[names_index][4] if headers else 0
+        self.sections: List[Section] = [
+            Section(
+                self._string(names_offset + h[0]),
+                h[1],
+                h[3],
+                h[4],
+                h[5],
+                h[6],
+                h[9],
+            )
+            for h in headers
+        ]
+
+    def _string(self, offset: int) -> str:
+        end: int = self._map.find(b"\0", offset)
+        return self._map[offset:end].decode(errors="replace")
+
+    def section(self, name: str) -> Optional[Section]:
+        for section in self.sections:
+            if section.name == name:
+                return section
+        return None
+
+    def data(self, section: Section) -> bytes:
+        return self._map[section.offset : section.offset + section.size]
+
+    def _symbol_table(self, section_type: int) -> List[Symbol]:
+        for table in self.sections:
+            if table.type == section_type:
+                break
+        else:
+            return []
+        strings: bytes = self.data(self.sections[table.link])
+        return [
+            Symbol(
+                strings[name : strings.find(b"\0", name)].decode(
+                    errors="replace"
+                ),
+                value,
+                size,
+                info & 0xF,
+                info >> 4,
+                section,
+            )
+            for name, info, _, section, value, size in _symbol.iter_unpack(
+                self.data(table)[: table.size - table.size % _symbol.size]
+            )
+        ]
+
+    @functools.cached_property
+    def dynamic_symbols(self) -> List[Symbol]:
+        """
+        Symbols of .dynsym (those of a shared library's interface).
+        """
+        return self._symbol_table(SHT_DYNSYM)
+
+    @functools.cached_property
+    def static_symbols(self) -> List[Symbol]:
+        """
+        Symbols of .symtab (those of an object file, or of a shared library
+        that isn't stripped).
+        """
+        return self._symbol_table(SHT_SYMTAB)
+
+    def relocations(self) -> Iterator[Relocation]:
+        """
+        Relocations of the sections linked to .dynsym (.rela.dyn,
+        .rela.plt).
+        """
+        for section in self.sections:
+            if section.type != SHT_RELA or not (
+                0 < section.link < len(self.sections)
+                and self.sections[section.link].type == SHT_DYNSYM
+            ):
+                continue
+            for offset in range(
+                section.offset, section.offset + section.size, _rela.size
+            ):
+                r_offset, info, addend = _rela.unpack_from(self._map, offset)
+                index: int = info >> 32
+                yield Relocation(
+                    r_offset,
+                    info & 0xFFFFFFFF,
+                    self.dynamic_symbols[index] if index else None,
+                    addend,
+                )
+
+    def _got_imports(self) -> Dict[int, str]:
+        """
+        Names of the undefined symbols, by address of their GOT slot.
+        """
+        return {
+            r.offset: r.symbol.name
+            for r in self.relocations()
+            if r.symbol is not None and not r.symbol.defined
+        }
+
+    def _plt_imports(self, got: Dict[int, str]) -> Dict[int, str]:
+        """
+        Names of the undefined symbols, by address of their PLT entry.
+        """
+        plt: Dict[int, str] = {}
+        for section in self.sections:
+            if not section.name.startswith(".plt"):
+                continue
+            code: bytes = self.data(section)
+            entry_size: int = section.entry_size or 16
+            for start in range(0, len(code), entry_size):
+                # The entries jump through their GOT slot (after an
+                # endbr64 and a bnd prefix, with IBT).
+                entry: bytes = code[start : start + entry_size]
+                jmp: int = entry.find(_jmp_indirect)
+                if jmp == -1 or jmp + 6 > len(entry):
+                    continue
+                (displacement,) = struct.unpack_from("<i", entry, jmp + 2)
+                slot: int = section.address + start + jmp + 6 + displacement
+                if slot in got:
+                    plt[section.address + start] = got[slot]
+        return plt
+
+    def _code(self, address: int, size: int) -> bytes:
+        for section in self.sections:
+            if section.address <= address < section.address + section.size:
+                offset: int = section.offset + address - section.address
+                return self._map[offset : offset + size]
+        return b""
+
+    def functions(self, prefix: str = "") -> Dict[str, Function]:
+        """
+        Functions defined (and exported) by a shared library whose name
+        starts with `prefix`, and their imports.
+
+        Symbols of any type are considered: assemblers don't type labels as
+        functions unless asked to (e.g. nasm's `global f:function`). When
+        their size is unknown, functions extend to the next symbol.
+        """
+        got: Dict[int, str] = self._got_imports()
+        plt: Dict[int, str] = self._plt_imports(got)
+        defined: List[Symbol] = [
+            s
+            for s in self.dynamic_symbols
+            if s.defined
+            and s.type in (STT_NOTYPE, STT_FUNC, STT_GNU_IFUNC)
+            and s.name
+        ]
+        boundaries: List[int] = sorted(
+            {
+                s.value
+                for s in self.dynamic_symbols + self.static_symbols
+                if s.defined and s.value
+            }
+            | {s.address + s.size for s in self.sections if s.address}
+        )
+        functions: Dict[str, Function] = {}
+        for symbol in defined:
+            if not symbol.name.startswith(prefix):
+                continue
+            size: int = (
+                symbol.size
+                or next(
+                    (b for b in boundaries if b > symbol.value), symbol.value
+                )
+                - symbol.value
+            )
+            functions[symbol.name] = Function(
+                symbol.name,
+                symbol.value,
+                size,
+                _calls(self._code(symbol.value, size), symbol.value, plt, got),
+            )
+        return functions
+
+
+def _calls(
+    code: bytes, address: int, plt: Dict[int, str], got: Dict[int, str]
+) -> Tuple[str, ...]:
+    calls: List[str] = []
+    for opcode, targets in (
+        (_call_rel32, plt),
+        (_jmp_rel32, plt),
+        (_call_indirect, got),
+        (_jmp_indirect, got),
+    ):
+        if not targets:
+            continue
+        length: int = len(opcode) + 4
+        i: int = code.find(opcode)
+        while i != -1 and i + length <= len(code):
+            (displacement,) = struct.unpack_from("<i", code, i + len(opcode))
+            name: Optional[str] = targets.get(
+                address + i + length + displacement
+            )
+            if name is not None and name not in calls:
+                calls.append(name)
+            i = code.find(opcode, i + 1)
+    return tuple(calls)
+
+
+class LibraryIndex:
+    """
+    LibraryIndex tells what a shared library defines and imports. The
+    imports of its functions are only looked for when asked for.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        with ElfFile(path) as elf:
+            # Defined (exported) symbols:
+            self.defined: FrozenSet[str] = frozenset(
+                s.name for s in elf.dynamic_symbols if s.defined
+            )
+            # Undefined symbols (imports of the whole library):
+            self.undefined: FrozenSet[str] = frozenset(
+                s.name for s in elf.dynamic_symbols if not s.defined and s.name
+            )
+
+    def implements(self, name: str) -> bool:
+        return name in self.defined
+
+    @functools.cached_property
+    def functions(self) -> Dict[str, Function]:
+        with ElfFile(self.path) as elf:
+            return elf.functions()
+
+
+@functools.lru_cache(maxsize=64)
+def _library_index(path: str, version: Tuple[int, int, int]) -> LibraryIndex:
+    return LibraryIndex(path)
+
+
+def library_index(path: str) -> LibraryIndex:
+    """
+    Index of the shared library at `path`, parsed once per version of the
+    file (a rebuilt library is parsed again).
+    """
+    path = os.path.realpath(path)
+    st: os.stat_result = os.stat(path)
+    return _library_index(path, (st.st_ino, st.st_size, st.st_mtime_ns))
+
+
+_RTLD_DI_LINKMAP: int = 2
+
+
+class _LinkMap(ctypes.Structure):
+    _fields_ = [("l_addr", ctypes.c_void_p), ("l_name", ctypes.c_char_p)]
+
+
+def library_path(cdll: ctypes.CDLL) -> Optional[str]:
+    """
+    Path of the file a loaded library comes from (e.g. for a system
+    library loaded by name), None if it can't be told.
+    """
+    dlinfo = getattr(ctypes.CDLL(None), "dlinfo", None)
+    if dlinfo is None:
+        return None
+    link_map = ctypes.POINTER(_LinkMap)()
+    if dlinfo(
+        ctypes.c_void_p(cdll._handle), _RTLD_DI_LINKMAP, ctypes.byref(link_map)
+    ):
+        return None
+    name: Optional[bytes] = link_map.contents.l_name
+    if not name or not os.path.isfile(name):
+        return None
+    return os.fsdecode(name)
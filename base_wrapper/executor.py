@@ -0,0 +1,747 @@
+"""
+The executor module provides IsolatedExecutor, a pool of pre-forked worker
+processes calling the wrapped functions on behalf of the test process.
+
+Workers are forked once the shared library is loaded, so they don't have
+to load it again, and a foreign function that crashes only kills its
+worker (which is then transparently respawned) instead of the whole test
+session.
+
+When allocations are tracked, workers are forked then exec'd with the
+allocation tracker preloaded (cf. base_wrapper.alloc_tracker), and
+rebuild the wrapper from its pickled constructor arguments. The
+allocations of a call can then be made to fail, e.g. to check that every
+allocation failure is handled (cf. IsolatedExecutor.allocation_failures).
+
+When faults are reported, workers install a SIGSEGV/SIGBUS handler which
+records the faulting address in shared memory (cf. base_wrapper.faults).
+
+When syscalls are traced, workers run each call in a child they trace
+(cf. base_wrapper.ptrace), from the foreign function's entry point to its
+return, and a child that dies makes its worker die the same way.
+"""
+
+import ctypes
+import faulthandler
+import functools
+import io
+import os
+import pickle
+import queue
+import signal
+import socket
+import struct
+import sys
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TYPE_CHECKING,
+    Union,
+)
+
+from . import alloc_tracker, faults
+from .alloc_tracker import Allocations
+from .faults import Fault, FaultReporter
+from .lazy_args import SharedBuffer
+from .ptrace import (
+    Syscall,
+    TracedCall,
+    TracedChildTerminated,
+    _check_platform,
+)
+from .result import Result
+
+# This permits to avoid circular imports.
+if TYPE_CHECKING:
+    from .base_wrapper import BaseWrapper
+
+# Payload size and number of file descriptors sent along.
+_header = struct.Struct("!QI")
+_max_fds: int = 253
+
+# A method name, or a (picklable) function called with the wrapper, its
+# arguments, and the allocation to fail (and whether the following ones
+# should fail as well).
+Failure = Optional[Tuple[int, bool]]
+Request = Tuple[
+    Union[str, Callable[..., Any]], Tuple[Any, ...], Dict[str, Any], Failure
+]
+Reply = Tuple[str, Any]
+
+
+###############################################################################
+#                               Wire protocol                                 #
+###############################################################################
+
+
+class _Pickler(pickle.Pickler):
+    """
+    Sends SharedBuffers as file descriptors rather than by value.
+    """
+
+    def __init__(self, file: io.BytesIO) -> None:
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.fds: List[int] = []
+
+    def persistent_id(self, obj: Any) -> Optional[Tuple[str, int, int]]:
+        if isinstance(obj, SharedBuffer):
+            self.fds.append(obj.fd)
+            return ("SharedBuffer", len(self.fds) - 1, obj.size)
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    def __init__(self, file: io.BytesIO, fds: List[int]) -> None:
+        super().__init__(file)
+        self.fds = fds
+
+    def persistent_load(self, pid: Tuple[str, int, int]) -> SharedBuffer:
+        kind, index, size = pid
+        if kind != "SharedBuffer":
+            raise pickle.UnpicklingError(f"Unknown persistent id {kind}.")
+        return SharedBuffer.from_fd(self.fds[index], size)
+
+
+def _send(sock: socket.socket, obj: Any) -> None:
+    buf: io.BytesIO = io.BytesIO()
+    pickler: _Pickler = _Pickler(buf)
+    pickler.dump(obj)
+    payload: bytes = buf.getvalue()
+    socket.send_fds(
+        sock, [_header.pack(len(payload), len(pickler.fds))], pickler.fds
+    )
+    sock.sendall(payload)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    buf: bytearray = bytearray(size)
+    view: memoryview = memoryview(buf)
+    received: int = 0
+    while received < size:
+        n: int = sock.recv_into(view[received:])
+        if not n:
+            raise EOFError()
+        received += n
+    return bytes(buf)
+
+
+def _recv(sock: socket.socket) -> Any:
+    header, fds, _, _ = socket.recv_fds(sock, _header.size, _max_fds)
+    if not header:
+        raise EOFError()
+    header += _recv_exactly(sock, _header.size - len(header))
+    size, _ = _header.unpack(header)
+    return _Unpickler(io.BytesIO(_recv_exactly(sock, size)), fds).load()
+
+
+###############################################################################
+#                                  Worker                                     #
+###############################################################################
+
+
+def _portable_return_value(value: Any) -> Any:
+    """
+    Converts a return value to something that can be sent to the test
+    process. Pointers are converted to addresses (which are only
+    meaningful in the worker).
+    """
+    if isinstance(value, ctypes._SimpleCData):
+        return value.value
+    if isinstance(value, (ctypes._Pointer, ctypes.Array)):
+        return ctypes.cast(value, ctypes.c_void_p).value
+    return value
+
+
+def _reply(wrapper: "BaseWrapper", request: Request, tracking: bool) -> Reply:
+    """
+    Runs a request. The syscalls of the reply are set by _traced_reply.
+    """
+    method, args, kwargs, failure = request
+    try:
+        result: Result
+        faults.clear()
+        before: Allocations = alloc_tracker.snapshot()
+        if failure is not None:
+            alloc_tracker.fail_allocations(*failure)
+        try:
+            if callable(method):
+                result = Result(method(wrapper, *args, **kwargs))
+            else:
+                result = getattr(wrapper, method)(*args, **kwargs)
+        finally:
+            if failure is not None:
+                alloc_tracker.fail_allocations(0)
+        return (
+            "result",
+            (
+                _portable_return_value(result.return_value),
+                result.outputs,
+                {
+                    arg_index: output.tobytes()
+                    for arg_index, output in result.memfd_outputs.items()
+                },
+                alloc_tracker.snapshot() - before if tracking else None,
+                None,
+            ),
+        )
+    except Exception as e:
+        return ("exception", e)
+
+
+def _die_like(status: int) -> None:
+    """
+    Terminates the worker the way its child did.
+    """
+    if os.WIFSIGNALED(status):
+        if os.WTERMSIG(status) != signal.SIGKILL:
+            signal.signal(os.WTERMSIG(status), signal.SIG_DFL)
+        os.kill(os.getpid(), os.WTERMSIG(status))
+    os._exit(os.waitstatus_to_exitcode(status))
+
+
+def _traced_reply(
+    wrapper: "BaseWrapper", request: Request, tracking: bool
+) -> Reply:
+    """
+    Runs a call in a child traced by the worker, and adds the syscalls the
+    foreign function made to the reply. Submitted functions aren't traced.
+    """
+    method: Union[str, Callable[..., Any]] = request[0]
+    f: Any = None if callable(method) else getattr(wrapper, f"raw_{method}")
+    if not isinstance(f, ctypes._CFuncPtr):  # type: ignore[attr-defined]
+        return _reply(wrapper, request, tracking)
+    read_fd, write_fd = os.pipe()
+    status: Optional[int] = None
+    syscalls: Optional[List[Syscall]] = None
+    pid: int = 0
+    data: bytes
+
+    def run() -> None:
+        # Child:
+        os.close(read_fd)
+        reply: Reply = _reply(wrapper, request, tracking)
+        try:
+            pickled: bytes = pickle.dumps(reply)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            pickled = pickle.dumps(
+                ("exception", RuntimeError(f"{reply[1]!r} ({e})"))
+            )
+        with open(write_fd, "wb") as pipe:
+            pipe.write(pickled)
+
+    try:
+        with TracedCall(f, run=run) as call:
+            syscalls = call.trace_syscalls()
+            pid = call.detach()
+    except TracedChildTerminated as e:
+        status = e.status
+    finally:
+        os.close(write_fd)
+    with open(read_fd, "rb") as pipe:
+        data = pipe.read()
+    if status is None:
+        _, status = os.waitpid(pid, 0)
+    if not data:
+        # The child died before replying.
+        _die_like(status)
+    kind, payload = pickle.loads(data)
+    if kind == "result":
+        payload = (*payload[:-1], syscalls)
+    return kind, payload
+
+
+def _serve(
+    wrapper: "BaseWrapper", sock: socket.socket, trace_syscalls: bool = False
+) -> None:
+    """
+    Worker main loop: runs the requested calls until the test process
+    sends None or closes the socket.
+    """
+    request: Optional[Request]
+    reply: Reply
+    tracking: bool = alloc_tracker.is_preloaded()
+
+    while True:
+        try:
+            request = _recv(sock)
+        except (EOFError, ConnectionError):
+            return
+        if request is None:
+            return
+        if trace_syscalls:
+            reply = _traced_reply(wrapper, request, tracking)
+        else:
+            reply = _reply(wrapper, request, tracking)
+        try:
+            _send(sock, reply)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            _send(sock, ("exception", RuntimeError(f"{reply[1]!r} ({e})")))
+
+
+def _track_library(wrapper: "BaseWrapper") -> None:
+    """
+    Tracks the allocations of the library the wrapper's functions belong
+    to.
+    """
+    for func_name in wrapper.functions:
+        f: Any = getattr(
+            wrapper, f"raw_{wrapper.get_attr_name(func_name)}", None
+        )
+        if isinstance(f, ctypes._CFuncPtr):  # type: ignore[attr-defined]
+            alloc_tracker.track(f)
+            return
+
+
+def _exec_worker(fd: int) -> None:
+    """
+    Main function of the exec'd workers: the wrapper (the fault reporter to
+    install, and whether syscalls are traced) is received first, an
+    acknowledgment is sent once it's rebuilt.
+    """
+    sock: socket.socket = socket.socket(fileno=fd)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    wrapper: "BaseWrapper"
+    fault_reporter_path: Optional[str]
+    report: Optional[SharedBuffer]
+    trace_syscalls: bool
+    wrapper, fault_reporter_path, report, trace_syscalls = _recv(sock)
+    if fault_reporter_path is not None:
+        FaultReporter(report).install(fault_reporter_path)
+    _track_library(wrapper)
+    _send(sock, "ready")
+    _serve(wrapper, sock, trace_syscalls)
+
+
+class WorkerDied(Exception):
+    """
+    Raised when the worker died while handling a request.
+    """
+
+    status: int
+
+    def __init__(self, status: int) -> None:
+        super().__init__(status)
+        self.status = status
+
+
+class WorkerTimedOut(Exception):
+    """
+    Raised when the worker was killed because the call took too long.
+    """
+
+
+class _Worker:
+    """
+    A pre-forked worker process and the socket to talk to it.
+    """
+
+    pid: int
+    sock: socket.socket
+    reporter: Optional[FaultReporter]
+
+    def __init__(
+        self,
+        wrapper: "BaseWrapper",
+        alloc_tracker_path: Optional[str] = None,
+        fault_reporter_path: Optional[str] = None,
+        trace_syscalls: bool = False,
+    ) -> None:
+        self.wrapper = wrapper
+        self.alloc_tracker_path = alloc_tracker_path
+        self.fault_reporter_path = fault_reporter_path
+        self.trace_syscalls = trace_syscalls
+
+    def spawn(self, fds_to_close: List[int]) -> None:
+        """
+        Forks the worker. `fds_to_close` are the test process ends of the
+        other workers' sockets, the worker shouldn't keep them open.
+        """
+        parent_sock, child_sock = socket.socketpair()
+        # A new report for each worker, it outlives it:
+        self.reporter = (
+            None if self.fault_reporter_path is None else FaultReporter()
+        )
+        pid: int = os.fork()
+        if pid == 0:
+            # Worker:
+            try:
+                parent_sock.close()
+                for fd in fds_to_close:
+                    os.close(fd)
+                # Interruptions and crash reports are the test process'
+                # business.
+                signal.signal(signal.SIGINT, signal.SIG_IGN)
+                faulthandler.disable()
+                if self.alloc_tracker_path is not None:
+                    self._exec(child_sock)
+                if self.reporter is not None:
+                    assert self.fault_reporter_path is not None
+                    self.reporter.install(self.fault_reporter_path)
+                _serve(self.wrapper, child_sock, self.trace_syscalls)
+            finally:
+                os._exit(0)
+        child_sock.close()
+        self.pid = pid
+        self.sock = parent_sock
+        if self.alloc_tracker_path is not None:
+            try:
+                if (
+                    self.request(
+                        (
+                            self.wrapper,
+                            self.fault_reporter_path,
+                            self.reporter and self.reporter.shared_buffer,
+                            self.trace_syscalls,
+                        )
+                    )
+                    != "ready"
+                ):
+                    raise WorkerDied(0)
+            except WorkerDied:
+                raise RuntimeError(
+                    "The worker couldn't rebuild the wrapper (cf. its"
+                    " output)."
+                )
+
+    def _exec(self, sock: socket.socket) -> None:
+        assert self.alloc_tracker_path is not None
+        os.set_inheritable(sock.fileno(), True)
+        environment: Dict[str, str] = alloc_tracker.preload_environment(
+            self.alloc_tracker_path
+        )
+        # The wrapper's modules have to be importable:
+        environment["PYTHONPATH"] = os.pathsep.join(filter(None, sys.path))
+        os.execve(
+            sys.executable,
+            [
+                sys.executable,
+                "-c",
+                "import sys; from base_wrapper.executor import _exec_worker;"
+                " _exec_worker(int(sys.argv[1]))",
+                str(sock.fileno()),
+            ],
+            environment,
+        )
+
+    def request(
+        self, request: Optional[Any], timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Sends the request and waits for the reply. Raises WorkerDied if the
+        worker dies in the meantime, and WorkerTimedOut (after killing the
+        worker) if no reply came within `timeout` seconds.
+        """
+        try:
+            _send(self.sock, request)
+            self.sock.settimeout(timeout)
+            try:
+                return _recv(self.sock)
+            finally:
+                self.sock.settimeout(None)
+        except TimeoutError:
+            os.kill(self.pid, signal.SIGKILL)
+            self.reap()
+            raise WorkerTimedOut(timeout)
+        except (EOFError, ConnectionError):
+            raise WorkerDied(self.reap())
+
+    def fault(self) -> Optional[Fault]:
+        """
+        The fault that killed the worker (when faults are reported).
+        """
+        return None if self.reporter is None else self.reporter.fault()
+
+    def reap(self) -> int:
+        self.sock.close()
+        _, status = os.waitpid(self.pid, 0)
+        return status
+
+    def stop(self) -> None:
+        try:
+            _send(self.sock, None)
+        except OSError:
+            pass
+        self.reap()
+
+
+###############################################################################
+#                                 Executor                                    #
+###############################################################################
+
+
+def _shim_path(
+    option: Union[bool, str], default: Optional[str], name: str
+) -> Optional[str]:
+    """
+    Path of a compiled shim: `option` itself, `default` when it's True, or
+    None when it's False.
+    """
+    if not option:
+        return None
+    path: Optional[str] = option if isinstance(option, str) else default
+    if path is None:
+        raise NotImplementedError(f"The wrapper has no {name}.")
+    if not os.path.isfile(path):
+        raise FileNotFoundError(
+            f"{path} not found (it's compiled by the build task)."
+        )
+    return path
+
+
+class AllocationFailure(NamedTuple):
+    """
+    Outcome of a call whose `allocation`-th allocation failed: its Result,
+    or the exception it raised (e.g. OSError from errcheck).
+    """
+
+    allocation: int
+    outcome: Union[Result, Exception]
+
+
+class IsolatedExecutor:
+    """
+    IsolatedExecutor runs the methods of a wrapper in a pool of pre-forked
+    worker processes.
+
+    Wrapped methods are available as attributes and return Result instances
+    (libasm_isolated.ft_strlen(b"foo") for instance). If the worker dies
+    during the call, Result.signal (or Result.exit_code) is set and the
+    worker is respawned.
+
+    Arguments are sent by value, memory the foreign function writes to has
+    to be a SharedBuffer, and lazy arguments are materialized in the
+    worker. Returned pointers are converted to (worker) addresses.
+
+    Calls lasting longer than `timeout` seconds (defaults to the wrapper's
+    timeout, can be overridden per call) are aborted by killing the worker,
+    and Result.timed_out is set.
+
+    With `track_allocations` (True for the wrapper's alloc_tracker_path, or
+    the path of the compiled tracker), Result.allocations reports the
+    allocations and frees the library made during each call, and calls can
+    be run with failing allocations.
+
+    With `report_faults` (True for the wrapper's fault_reporter_path, or the
+    path of the compiled reporter), Result.fault reports the faulting
+    address of crashed calls, e.g. the overrun of a GuardedBuffer.
+
+    With `trace_syscalls`, Result.syscalls reports the syscalls made by the
+    foreign function of each call (Linux x86_64 only, not for submitted
+    functions), e.g. to check that ft_write makes a single write.
+    """
+
+    wrapper: "BaseWrapper"
+    timeout: Optional[float]
+
+    def __init__(
+        self,
+        wrapper: "BaseWrapper",
+        /,
+        *,
+        workers: int = 1,
+        timeout: Optional[float] = None,
+        track_allocations: Union[bool, str] = False,
+        report_faults: Union[bool, str] = False,
+        trace_syscalls: bool = False,
+    ) -> None:
+        self.wrapper = wrapper
+        self.timeout = wrapper.timeout if timeout is None else timeout
+        self.alloc_tracker_path: Optional[str] = _shim_path(
+            track_allocations, wrapper.alloc_tracker_path, "allocation tracker"
+        )
+        self.fault_reporter_path: Optional[str] = _shim_path(
+            report_faults, wrapper.fault_reporter_path, "fault reporter"
+        )
+        if trace_syscalls:
+            _check_platform()
+        self._workers: List[_Worker] = []
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        for _ in range(workers):
+            worker: _Worker = _Worker(
+                wrapper,
+                self.alloc_tracker_path,
+                self.fault_reporter_path,
+                trace_syscalls,
+            )
+            self._spawn(worker)
+            self._workers.append(worker)
+            self._idle.put(worker)
+
+    def __enter__(self) -> "IsolatedExecutor":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.shutdown()
+
+    def __getattr__(self, name: str) -> Callable[..., Result]:
+        wrapper: Optional["BaseWrapper"] = self.__dict__.get("wrapper")
+        if name.startswith("_") or not callable(getattr(wrapper, name, None)):
+            raise AttributeError(name)
+        return functools.partial(self.call, name)
+
+    def _spawn(self, worker: _Worker) -> None:
+        worker.spawn(
+            [
+                other.sock.fileno()
+                for other in self._workers
+                if other is not worker
+            ]
+        )
+
+    def call(
+        self,
+        method_name: str,
+        /,
+        *args: Any,
+        timeout: Optional[float] = None,
+        fail_allocation: int = 0,
+        keep_failing: bool = False,
+        **kwargs: Any,
+    ) -> Result:
+        """
+        Runs `method_name` with the given arguments in one of the workers.
+        Exceptions raised by the wrapped method (OSError from errcheck for
+        instance) are raised again in the test process.
+
+        `timeout` overrides the executor's timeout for this call.
+
+        The `fail_allocation`-th (starting at 1) allocation of the library
+        during the call fails, and so do the following ones with
+        `keep_failing` (allocations have to be tracked).
+        """
+        return self._run(
+            (
+                method_name,
+                args,
+                kwargs,
+                self._failure(fail_allocation, keep_failing),
+            ),
+            timeout,
+        )
+
+    def submit(
+        self,
+        function: Callable[..., Any],
+        /,
+        *args: Any,
+        timeout: Optional[float] = None,
+        fail_allocation: int = 0,
+        keep_failing: bool = False,
+        **kwargs: Any,
+    ) -> Result:
+        """
+        Runs `function(wrapper, *args, **kwargs)` in one of the workers,
+        its return value is stored in Result.return_value. It permits to run
+        several foreign calls and process their results in a single
+        request.
+
+        `function` has to be picklable (i.e. defined at the top level of a
+        module) and so does its return value.
+
+        `timeout`, `fail_allocation` and `keep_failing`: cf. call().
+        """
+        return self._run(
+            (
+                function,
+                args,
+                kwargs,
+                self._failure(fail_allocation, keep_failing),
+            ),
+            timeout,
+        )
+
+    def allocation_failures(
+        self,
+        method: Union[str, Callable[..., Any]],
+        /,
+        *args: Any,
+        timeout: Optional[float] = None,
+        keep_failing: bool = False,
+        **kwargs: Any,
+    ) -> Iterator[AllocationFailure]:
+        """
+        Runs `method` (a method name, or a function as with submit()) once
+        for each allocation it makes, with that allocation failing (and the
+        following ones with `keep_failing`), and yields the outcomes.
+
+        The allocations are counted by a first call, nothing is yielded if
+        it crashes.
+        """
+        self._failure(1, keep_failing)
+        probe: Result = self._run((method, args, kwargs, None), timeout)
+        if probe.allocations is None:
+            return
+        outcome: Union[Result, Exception]
+        for allocation in range(1, probe.allocations.allocations + 1):
+            try:
+                outcome = self._run(
+                    (method, args, kwargs, (allocation, keep_failing)),
+                    timeout,
+                )
+            except Exception as e:
+                outcome = e
+            yield AllocationFailure(allocation, outcome)
+
+    def _failure(self, fail_allocation: int, keep_failing: bool) -> Failure:
+        if not fail_allocation:
+            return None
+        if self.alloc_tracker_path is None:
+            raise RuntimeError(
+                "Allocations can only fail when they're tracked (cf."
+                " track_allocations)."
+            )
+        return (fail_allocation, keep_failing)
+
+    def _run(self, request: Request, timeout: Optional[float]) -> Result:
+        result: Result
+        worker: _Worker = self._idle.get()
+        try:
+            try:
+                kind, payload = worker.request(
+                    request,
+                    self.timeout if timeout is None else timeout,
+                )
+            except WorkerDied as e:
+                result = self._death_result(e.status)
+                result.fault = worker.fault()
+                self._spawn(worker)
+                return result
+            except WorkerTimedOut:
+                self._spawn(worker)
+                result = Result(None)
+                result.timed_out = True
+                return result
+        finally:
+            self._idle.put(worker)
+
+        if kind == "exception":
+            raise payload
+        return_value, outputs, memfd_outputs, allocations, syscalls = payload
+        result = Result(return_value, outputs)
+        for arg_index, output in memfd_outputs.items():
+            result.add_memfd_output(memoryview(output), arg_index)
+        result.allocations = allocations
+        result.syscall_trace = syscalls
+        return result
+
+    @staticmethod
+    def _death_result(status: int) -> Result:
+        result: Result = Result(None)
+        if os.WIFSIGNALED(status):
+            result.signal = signal.Signals(os.WTERMSIG(status))
+        else:
+            result.exit_code = os.waitstatus_to_exitcode(status)
+        return result
+
+    def shutdown(self) -> None:
+        """
+        Stops all the workers.
+        """
+        while self._workers:
+            self._workers.pop().stop()
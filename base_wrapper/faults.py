@@ -0,0 +1,180 @@
+"""
+The faults module reports where the isolated workers crash: the fault
+reporter (libasm_test_suite/bin_tools/fault_reporter.c), installed in the
+workers of an IsolatedExecutor created with report_faults, writes the
+faulting address of SIGSEGV and SIGBUS to a report shared with the test
+process.
+
+The guarded buffers passed to the call (cf. guarded.GuardedBuffer) are
+registered in the same report, so that a fault in a guard page is
+reported as a boundary violation of the buffer it guards (cf.
+Result.fault).
+"""
+
+import ctypes
+import os
+import signal
+from typing import NamedTuple, Optional
+
+from .lazy_args import SharedBuffer
+
+# Guarded buffers a report can describe.
+max_regions: int = 16
+
+# Size of the guarded buffers' labels (their repr), nul byte included.
+label_size: int = 64
+
+# Kinds of access (cf. fault_reporter.c).
+_accesses = {0: "read", 1: "write"}
+
+
+class _Region(ctypes.Structure):
+    """
+    A guarded buffer: [start, end) is the buffer, [end, guard_end) the
+    bytes past it up to the end of its guard page.
+    """
+
+    _fields_ = [
+        ("start", ctypes.c_uint64),
+        ("end", ctypes.c_uint64),
+        ("guard_end", ctypes.c_uint64),
+        ("label", ctypes.c_char * label_size),
+    ]
+
+
+class _Report(ctypes.Structure):
+    """
+    t_fault_report (cf. fault_reporter.c), followed by the regions.
+    """
+
+    _fields_ = [
+        ("signo", ctypes.c_int32),
+        ("code", ctypes.c_int32),
+        ("access", ctypes.c_int32),
+        ("padding", ctypes.c_int32),
+        ("address", ctypes.c_uint64),
+        ("n_regions", ctypes.c_uint64),
+        ("regions", _Region * max_regions),
+    ]
+
+
+class Fault(NamedTuple):
+    """
+    Signal that killed a worker, its faulting address and, when the address
+    lies past the end of a guarded buffer, that buffer and the offset of
+    the address from its end.
+    """
+
+    signal: signal.Signals
+    address: int
+    # "read", "write" or None when unknown.
+    access: Optional[str] = None
+    buffer: Optional[str] = None
+    offset: int = 0
+
+    @property
+    def boundary_violation(self) -> bool:
+        return self.buffer is not None
+
+    def __str__(self) -> str:
+        access: str = f"invalid {self.access}" if self.access else "fault"
+        if self.buffer is not None:
+            return (
+                f"{access} {self.offset} byte(s) past the end of"
+                f" {self.buffer} (at {self.address:#x})"
+            )
+        return f"{access} at {self.address:#x}"
+
+
+class FaultReporter:
+    """
+    FaultReporter holds a report in shared memory: it's created by the test
+    process, then installed in a worker (which can also receive it through
+    a socket, cf. SharedBuffer).
+    """
+
+    def __init__(self, shared_buffer: Optional[SharedBuffer] = None) -> None:
+        self.shared_buffer: SharedBuffer = shared_buffer or SharedBuffer(
+            ctypes.sizeof(_Report)
+        )
+        # Not from_buffer: the mapping couldn't be closed while the report
+        # exists.
+        self.report: _Report = _Report.from_address(
+            ctypes.addressof(self.shared_buffer.materialize())
+        )
+
+    def install(self, path: str) -> None:
+        """
+        Installs the signal handlers of the compiled reporter at `path` in
+        the current process.
+        """
+        global _installed
+        library: ctypes.CDLL = ctypes.CDLL(
+            os.path.abspath(path), use_errno=True
+        )
+        if library.fault_reporter_install(ctypes.byref(self.report)) == -1:
+            raise OSError(ctypes.get_errno(), "fault_reporter_install failed")
+        _installed = self
+
+    def clear(self) -> None:
+        self.report.signo = 0
+        self.report.n_regions = 0
+
+    def register(
+        self, start: int, end: int, guard_end: int, label: str
+    ) -> None:
+        """
+        Registers a guarded buffer (ignored past max_regions).
+        """
+        if self.report.n_regions < max_regions:
+            region: _Region = self.report.regions[self.report.n_regions]
+            region.start, region.end, region.guard_end = start, end, guard_end
+            region.label = label.encode()[: label_size - 1]
+            self.report.n_regions += 1
+
+    def fault(self) -> Optional[Fault]:
+        """
+        The fault that killed the worker, if any.
+        """
+        if not self.report.signo:
+            return None
+        address: int = self.report.address
+        fault: Fault = Fault(
+            signal.Signals(self.report.signo),
+            address,
+            _accesses.get(self.report.access),
+        )
+        for region in self.report.regions[: self.report.n_regions]:
+            if region.end <= address < region.guard_end:
+                return fault._replace(
+                    buffer=region.label.decode(), offset=address - region.end
+                )
+        return fault
+
+
+# Reporter installed in the current process (in a worker).
+_installed: Optional[FaultReporter] = None
+
+
+def is_installed() -> bool:
+    """
+    Whether a reporter is installed in the current process.
+    """
+    return _installed is not None
+
+
+def register(start: int, end: int, guard_end: int, label: str) -> None:
+    """
+    Registers a guarded buffer in the reporter installed in the current
+    process, if any.
+    """
+    if _installed is not None:
+        _installed.register(start, end, guard_end, label)
+
+
+def clear() -> None:
+    """
+    Forgets the guarded buffers of the previous call.
+    """
+    if _installed is not None:
+        _installed.clear()
@@ -0,0 +1,140 @@
+"""
+The guarded module provides GuardedBuffer, a lazy argument (cf. lazy_args)
+placed right before a PROT_NONE guard page, so that reading or writing
+past its end faults instead of silently hitting neighbouring memory (as
+it would with ctypes.create_string_buffer).
+
+The guarded regions are recycled (cf. GuardedPool): mapping and
+protecting pages is what costs, not filling them.
+"""
+
+import ctypes
+import mmap
+from typing import Dict, List, Optional
+
+from . import faults
+from .lazy_args import LazyArg, _libc, _mmap, _round_up
+
+PROT_NONE: int = 0
+
+_libc.mprotect.restype = ctypes.c_int
+_libc.mprotect.argtypes = (ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int)
+
+
+class GuardedPool:
+    """
+    GuardedPool hands out regions of `size` read-write bytes (a multiple of
+    the page size) followed by a guard page, and keeps at most
+    `max_free_regions` released regions of each size for reuse.
+    """
+
+    def __init__(self, max_free_regions: int = 64) -> None:
+        self.max_free_regions = max_free_regions
+        self._free: Dict[int, List[int]] = {}
+
+    def acquire(self, size: int) -> int:
+        free: List[int] = self._free.get(size, [])
+        if free:
+            return free.pop()
+        address: int = _mmap(
+            None,
+            size + mmap.PAGESIZE,
+            PROT_NONE,
+            mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS,
+        )
+        if (
+            size
+            and _libc.mprotect(address, size, mmap.PROT_READ | mmap.PROT_WRITE)
+            == -1
+        ):
+            _libc.munmap(address, size + mmap.PAGESIZE)
+            raise OSError(ctypes.get_errno(), "mprotect failed")
+        return address
+
+    def release(self, address: int, size: int) -> None:
+        free: List[int] = self._free.setdefault(size, [])
+        if len(free) < self.max_free_regions:
+            free.append(address)
+        else:
+            _libc.munmap(address, size + mmap.PAGESIZE)
+
+
+pool: GuardedPool = GuardedPool()
+
+
+class GuardedBuffer(LazyArg):
+    """
+    GuardedBuffer is a char buffer whose end is flush with a guard page, or
+    `slack` bytes before it (e.g. to allow the word-sized reads of aligned
+    loops, which can't cross a page boundary).
+
+    `init` is either the buffer size or its initial content (in which case
+    a nul byte is appended unless `nul_terminated` is False). The slack
+    bytes are zeroed.
+
+    When the call is run in an IsolatedExecutor reporting faults, an
+    access past the end is reported as a boundary violation of the buffer
+    in Result.fault.
+    """
+
+    size: int
+    slack: int
+
+    def __init__(
+        self,
+        init: bytes | int,
+        /,
+        *,
+        slack: int = 0,
+        nul_terminated: bool = True,
+    ) -> None:
+        if slack < 0:
+            raise ValueError("slack must be positive.")
+        self._data: bytes = (
+            b"" if isinstance(init, int) else init + b"\0" * nul_terminated
+        )
+        self.size = init if isinstance(init, int) else len(self._data)
+        self.slack = slack
+        self._region: Optional[int] = None
+        self._region_size: int = 0
+
+    def __repr__(self) -> str:
+        if self._data:
+            r = f"GuardedBuffer({self._data[:16]!r}"
+            r += "..." if len(self._data) > 16 else ""
+        else:
+            r = f"GuardedBuffer({self.size}"
+        return r + (f", slack={self.slack})" if self.slack else ")")
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def address(self) -> Optional[int]:
+        """
+        Address of the buffer while it's materialized.
+        """
+        if self._region is None:
+            return None
+        return self._region + self._region_size - self.slack - self.size
+
+    def materialize(self) -> ctypes.Array[ctypes.c_char]:
+        if self._region is not None:
+            raise RuntimeError(f"{self!r} is already materialized.")
+        self._region_size = _round_up(self.size + self.slack, mmap.PAGESIZE)
+        self._region = pool.acquire(self._region_size)
+        address: Optional[int] = self.address
+        assert address is not None
+        ctypes.memset(address, 0, self.size + self.slack)
+        ctypes.memmove(address, self._data, len(self._data))
+        end: int = address + self.size
+        if faults.is_installed():
+            faults.register(
+                address, end, end + self.slack + mmap.PAGESIZE, repr(self)
+            )
+        return (ctypes.c_char * self.size).from_address(address)
+
+    def release(self) -> None:
+        if self._region is not None:
+            pool.release(self._region, self._region_size)
+            self._region = None
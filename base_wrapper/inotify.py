@@ -0,0 +1,171 @@
+"""
+The inotify module watches directory trees for file changes with Linux's
+inotify, through ctypes (no polling of the files' modification times).
+
+Only Linux is supported.
+"""
+
+import ctypes
+import os
+import platform
+import select
+import struct
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+IN_CLOSE_WRITE: int = 0x8
+IN_MOVED_FROM: int = 0x40
+IN_MOVED_TO: int = 0x80
+IN_CREATE: int = 0x100
+IN_DELETE: int = 0x200
+IN_Q_OVERFLOW: int = 0x4000
+IN_IGNORED: int = 0x8000
+IN_ISDIR: int = 0x40000000
+
+IN_CLOEXEC: int = os.O_CLOEXEC
+IN_NONBLOCK: int = os.O_NONBLOCK
+
+# Events meaning that a file's content changed (editors either write files
+# in place or move a new version over them).
+changes: int = (
+    IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE
+)
+
+# struct inotify_event, followed by `len` bytes of nul-padded name.
+_event_header = struct.Struct("iIII")
+
+_libc = ctypes.CDLL(None, use_errno=True)
+_libc.inotify_init1.restype = ctypes.c_int
+_libc.inotify_init1.argtypes = (ctypes.c_int,)
+_libc.inotify_add_watch.restype = ctypes.c_int
+_libc.inotify_add_watch.argtypes = (
+    ctypes.c_int,
+    ctypes.c_char_p,
+    ctypes.c_uint32,
+)
+
+
+class Event(NamedTuple):
+    path: str
+    mask: int
+
+    @property
+    def overflow(self) -> bool:
+        """
+        Whether events were lost (the queue overflowed), in which case any
+        file may have changed.
+        """
+        return bool(self.mask & IN_Q_OVERFLOW)
+
+    @property
+    def is_dir(self) -> bool:
+        return bool(self.mask & IN_ISDIR)
+
+
+def _is_hidden(name: str) -> bool:
+    return name.startswith(".")
+
+
+class Inotify:
+    """
+    Inotify watches directory trees: subdirectories created while watching
+    are watched too. Directories for which `skip` returns True (hidden ones
+    by default) are ignored.
+    """
+
+    def __init__(
+        self,
+        mask: int = changes,
+        skip: Callable[[str], bool] = _is_hidden,
+    ) -> None:
+        if platform.system() != "Linux":
+            raise NotImplementedError("inotify is only supported on Linux.")
+        self.mask: int = mask | IN_CREATE
+        self.skip: Callable[[str], bool] = skip
+        self.fd: int = _libc.inotify_init1(IN_CLOEXEC | IN_NONBLOCK)
+        if self.fd == -1:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # Watched directories, by watch descriptor.
+        self._directories: Dict[int, str] = {}
+
+    def __enter__(self) -> "Inotify":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.fd != -1:
+            os.close(self.fd)
+            self.fd = -1
+
+    def add_tree(self, root: str) -> None:
+        """
+        Watches `root` and its subdirectories.
+        """
+        for directory, subdirectories, _ in os.walk(root):
+            subdirectories[:] = [d for d in subdirectories if not self.skip(d)]
+            wd: int = _libc.inotify_add_watch(
+                self.fd, os.fsencode(directory), self.mask
+            )
+            if wd == -1:
+                raise OSError(
+                    ctypes.get_errno(),
+                    f"inotify_add_watch failed: {directory}",
+                )
+            self._directories[wd] = directory
+
+    def _read_events(self) -> List[Event]:
+        events: List[Event] = []
+        try:
+            data: bytes = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return events
+        offset: int = 0
+        while offset < len(data):
+            wd, mask, _, length = _event_header.unpack_from(data, offset)
+            offset += _event_header.size
+            name: str = os.fsdecode(
+                data[offset : offset + length].rstrip(b"\0")
+            )
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                events.append(Event("", mask))
+                continue
+            if mask & IN_IGNORED:
+                self._directories.pop(wd, None)
+                continue
+            directory: Optional[str] = self._directories.get(wd)
+            if directory is None:
+                continue
+            path: str = os.path.join(directory, name) if name else directory
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                if self.skip(name):
+                    continue
+                self.add_tree(path)
+            events.append(Event(path, mask))
+        return events
+
+    def read(
+        self, timeout: Optional[float] = None, settle: float = 0.0
+    ) -> List[Event]:
+        """
+        Waits at most `timeout` seconds (forever if None) for events, then
+        keeps reading until none arrives for `settle` seconds (editors and
+        builds change several files in a row).
+        """
+        events: List[Event] = []
+        deadline: Optional[float] = (
+            None if timeout is None else time.monotonic() + timeout
+        )
+        while not events:
+            remaining: Optional[float] = (
+                None if deadline is None else deadline - time.monotonic()
+            )
+            if remaining is not None and remaining <= 0:
+                return events
+            if select.select([self.fd], [], [], remaining)[0]:
+                events += self._read_events()
+        while select.select([self.fd], [], [], settle)[0]:
+            events += self._read_events()
+        return events
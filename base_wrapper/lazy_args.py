@@ -0,0 +1,350 @@
+"""
+The lazy_args module provides argument descriptors that can be used in
+place of actual ctypes arguments when calling wrapped functions.
+
+Such descriptors are cheap to build (which makes them suitable for
+`pytest.mark.parametrize`) and are only turned into actual memory when
+the wrapped function is called. They are released right after the call.
+"""
+
+import ctypes
+import math
+import mmap
+import os
+from typing import Any, Optional, TYPE_CHECKING
+
+from .wrapper_types import ArgIndex
+
+# This permits to avoid circular imports.
+if TYPE_CHECKING:
+    from .result import Result
+
+# Not exposed by the mmap module.
+MAP_FIXED: int = 0x10
+
+_libc = ctypes.CDLL(None, use_errno=True)
+_libc.mmap.restype = ctypes.c_void_p
+_libc.mmap.argtypes = (
+    ctypes.c_void_p,
+    ctypes.c_size_t,
+    ctypes.c_int,
+    ctypes.c_int,
+    ctypes.c_int,
+    ctypes.c_long,
+)
+_libc.munmap.restype = ctypes.c_int
+_libc.munmap.argtypes = (ctypes.c_void_p, ctypes.c_size_t)
+
+MAP_FAILED: int = ctypes.c_void_p(-1).value  # type: ignore[assignment]
+
+
+def _mmap(
+    addr: Optional[int], length: int, prot: int, flags: int, fd: int = -1
+) -> int:
+    res: Optional[int] = _libc.mmap(addr, length, prot, flags, fd, 0)
+    if res is None or res == MAP_FAILED:
+        errno: int = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno))
+    return res
+
+
+def _round_up(n: int, multiple: int) -> int:
+    return -(-n // multiple) * multiple
+
+
+class LazyArg:
+    """
+    LazyArg is the base class of arguments that are only built right
+    before the wrapped function is called.
+    """
+
+    def materialize(self) -> Any:
+        """
+        materialize returns the actual object to pass to the foreign
+        function.
+        """
+        raise NotImplementedError()
+
+    def collect(self, result: "Result", arg_index: ArgIndex) -> None:
+        """
+        collect is called once the foreign function returned, before
+        release, to let the argument store what it captured in `result`.
+        """
+        pass
+
+    def release(self) -> None:
+        """
+        release frees whatever materialize allocated. It's called right
+        after the foreign function returned (or raised).
+        """
+        raise NotImplementedError()
+
+
+class LazyBuffer(LazyArg):
+    """
+    LazyBuffer describes a char buffer made of `pattern` repeated `repeat`
+    times, followed by `suffix` (and a nul byte unless `nul_terminated` is
+    False), i.e. the equivalent of `pattern * repeat + suffix + b"\\0"`.
+
+    The buffer is passed to the foreign function as a pointer to the mapped
+    memory, no copy is involved.
+
+    Large buffers are backed by a single memfd (tmpfs, like /dev/shm) tile
+    filled with the pattern and mapped over and over again in a contiguous
+    area, so that a 1GiB string only uses a few MiB of actual memory.
+    The mappings are private, writing to the buffer stays possible.
+    """
+
+    # Size above which the repeated tile is worth mapping instead of
+    # filling the whole buffer.
+    tile_min_size: int = 1024 * 1024
+
+    pattern: bytes
+    repeat: int
+    suffix: bytes
+    nul_terminated: bool
+
+    def __init__(
+        self,
+        pattern: bytes,
+        repeat: int = 1,
+        /,
+        *,
+        suffix: bytes = b"",
+        nul_terminated: bool = True,
+    ) -> None:
+        if repeat < 0:
+            raise ValueError("repeat must be positive.")
+        if not pattern and repeat:
+            raise ValueError("Can't repeat an empty pattern.")
+        self.pattern = pattern
+        self.repeat = repeat
+        self.suffix = suffix
+        self.nul_terminated = nul_terminated
+        self._addr: Optional[int] = None
+        self._mapped_size: int = 0
+
+    def __repr__(self) -> str:
+        r = f"LazyBuffer({self.pattern!r} * {self.repeat}"
+        if self.suffix:
+            r += f" + {self.suffix!r}"
+        return r + ")"
+
+    def __len__(self) -> int:
+        """
+        Length of the described string (terminating nul byte excluded).
+        """
+        return len(self.pattern) * self.repeat + len(self.suffix)
+
+    @property
+    def body_size(self) -> int:
+        return len(self.pattern) * self.repeat
+
+    @property
+    def buffer_size(self) -> int:
+        return len(self) + int(self.nul_terminated)
+
+    def materialize(self) -> ctypes.Array[ctypes.c_char]:
+        if self._addr is not None:
+            raise RuntimeError(f"{self!r} is already materialized.")
+        size: int = self.buffer_size
+        self._mapped_size = _round_up(max(size, 1), mmap.PAGESIZE)
+        self._addr = _mmap(
+            None,
+            self._mapped_size,
+            mmap.PROT_READ | mmap.PROT_WRITE,
+            mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS,
+        )
+        try:
+            tiled: int = self._map_tiles()
+            self._fill(tiled)
+        except BaseException:
+            self.release()
+            raise
+        return (ctypes.c_char * size).from_address(self._addr)
+
+    def release(self) -> None:
+        if self._addr is not None:
+            _libc.munmap(self._addr, self._mapped_size)
+            self._addr = None
+
+    def _map_tiles(self) -> int:
+        """
+        Maps the pattern tile over the beginning of the reserved area.
+        Returns the number of bytes covered by the tiles.
+        """
+        assert self._addr is not None
+        tile_size: int = math.lcm(len(self.pattern) or 1, mmap.PAGESIZE)
+        tile_size *= max(1, self.tile_min_size // tile_size)
+        n_tiles: int = self.body_size // tile_size
+        if n_tiles < 2:
+            return 0
+
+        fd: int = os.memfd_create("lazy_buffer", os.MFD_CLOEXEC)
+        try:
+            os.ftruncate(fd, tile_size)
+            with mmap.mmap(fd, tile_size) as tile:
+                with memoryview(tile) as view:
+                    self._fill_pattern(view, tile_size)
+            for i in range(n_tiles):
+                _mmap(
+                    self._addr + i * tile_size,
+                    tile_size,
+                    mmap.PROT_READ | mmap.PROT_WRITE,
+                    mmap.MAP_PRIVATE | MAP_FIXED,
+                    fd,
+                )
+        finally:
+            os.close(fd)
+        return n_tiles * tile_size
+
+    def _fill(self, start: int) -> None:
+        """
+        Fills the part of the buffer that isn't covered by tiles.
+        Tiles are made of whole patterns, so it starts on a pattern
+        boundary.
+        """
+        assert self._addr is not None
+        remaining: int = self.body_size - start
+        area = (ctypes.c_char * (self._mapped_size - start)).from_address(
+            self._addr + start
+        )
+        with memoryview(area).cast("B") as view:
+            self._fill_pattern(view, remaining)
+            view[remaining : remaining + len(self.suffix)] = self.suffix
+
+    def _fill_pattern(self, view: memoryview, size: int) -> None:
+        """
+        Repeats the pattern over the `size` first bytes of `view` by
+        doubling the filled area at each step.
+        """
+        if not size:
+            return
+        filled: int = min(len(self.pattern), size)
+        view[:filled] = self.pattern[:filled]
+        while filled < size:
+            n: int = min(filled, size - filled)
+            view[filled : filled + n] = view[:n]
+            filled += n
+
+
+class MemfdCapture(LazyArg):
+    """
+    MemfdCapture is meant to be passed in place of a file descriptor the
+    foreign function writes to (e.g. ft_write's fd).
+
+    The function is given a memfd_create descriptor. What was written to it
+    is exposed as a memoryview backed by a read-only mapping of the memfd
+    in Result.memfd_outputs (keyed by argument position), which avoids
+    both the pipe round-trip and the copy into a bytes object.
+    """
+
+    _fd: Optional[int]
+
+    def __init__(self) -> None:
+        self._fd = None
+
+    def __repr__(self) -> str:
+        return "MemfdCapture()"
+
+    def materialize(self) -> int:
+        if self._fd is not None:
+            raise RuntimeError(f"{self!r} is already materialized.")
+        self._fd = os.memfd_create("memfd_capture", os.MFD_CLOEXEC)
+        return self._fd
+
+    def collect(self, result: "Result", arg_index: ArgIndex) -> None:
+        assert self._fd is not None
+        size: int = os.fstat(self._fd).st_size
+        if size:
+            # The mapping outlives the descriptor, and is unmapped when the
+            # memoryview (and its exporter) are garbage collected.
+            result.add_memfd_output(
+                memoryview(mmap.mmap(self._fd, size, prot=mmap.PROT_READ)),
+                arg_index,
+            )
+        else:
+            # Empty files can't be mapped.
+            result.add_memfd_output(memoryview(b""), arg_index)
+
+    def release(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class SharedBuffer(LazyArg):
+    """
+    SharedBuffer is a char buffer backed by a shared mapping of a memfd.
+
+    It behaves like a ctypes string buffer when passed to a wrapped
+    function, but it can also be sent to an isolated worker process (cf.
+    base_wrapper.executor) which maps the same memory: what the foreign
+    function writes in the worker is visible from the test process.
+    """
+
+    size: int
+    fd: int
+
+    def __init__(self, init: bytes | int, /) -> None:
+        """
+        `init` is either the buffer size or its initial content (in which
+        case a nul byte is appended, like ctypes.create_string_buffer).
+        """
+        data: bytes = b"" if isinstance(init, int) else init + b"\0"
+        self.size = init if isinstance(init, int) else len(data)
+        self.fd = os.memfd_create("shared_buffer", os.MFD_CLOEXEC)
+        os.ftruncate(self.fd, self.size)
+        self._map()
+        ctypes.memmove(self._array, data, len(data))
+
+    @classmethod
+    def from_fd(cls, fd: int, size: int) -> "SharedBuffer":
+        """
+        Maps a SharedBuffer received from another process.
+        """
+        shared_buffer: SharedBuffer = cls.__new__(cls)
+        shared_buffer.fd = fd
+        shared_buffer.size = size
+        shared_buffer._map()
+        return shared_buffer
+
+    def _map(self) -> None:
+        self._mmap: Optional[mmap.mmap] = (
+            mmap.mmap(self.fd, self.size) if self.size else None
+        )
+        self._array: ctypes.Array[ctypes.c_char] = (
+            (ctypes.c_char * self.size).from_buffer(self._mmap)
+            if self._mmap is not None
+            else (ctypes.c_char * 0)()
+        )
+
+    def __repr__(self) -> str:
+        return f"SharedBuffer({self.size})"
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def value(self) -> bytes:
+        return self._array.value
+
+    @property
+    def raw(self) -> bytes:
+        return self._array.raw
+
+    def materialize(self) -> ctypes.Array[ctypes.c_char]:
+        return self._array
+
+    def release(self) -> None:
+        # The buffer lives as long as the SharedBuffer object.
+        pass
+
+    def __del__(self) -> None:
+        try:
+            del self._array
+            if self._mmap is not None:
+                self._mmap.close()
+            os.close(self.fd)
+        except (AttributeError, OSError):
+            pass
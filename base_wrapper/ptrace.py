@@ -0,0 +1,495 @@
+"""
+The ptrace module runs a foreign function call in a traced child process
+to observe it at the instruction level.
+
+count_instructions single-steps the call (PTRACE_SINGLESTEP) from the
+function's entry point to its return, which gives a machine-independent
+cost metric.
+
+trace_syscalls stops the call at each syscall (PTRACE_SYSCALL) until it
+returns, which tells which syscalls a function makes, and whether it makes
+them itself or through another library (libc's write for instance).
+
+Only Linux on x86_64 is supported.
+"""
+
+import _ctypes
+import ctypes
+import functools
+import os
+import platform
+import signal
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+PTRACE_TRACEME: int = 0
+PTRACE_PEEKDATA: int = 2
+PTRACE_POKEDATA: int = 5
+PTRACE_CONT: int = 7
+PTRACE_KILL: int = 8
+PTRACE_SINGLESTEP: int = 9
+PTRACE_GETREGS: int = 12
+PTRACE_SETREGS: int = 13
+PTRACE_DETACH: int = 17
+PTRACE_SYSCALL: int = 24
+PTRACE_SETOPTIONS: int = 0x4200
+
+PTRACE_O_TRACESYSGOOD: int = 0x1
+PTRACE_O_EXITKILL: int = 0x100000
+
+_INT3: int = 0xCC
+# Length of the syscall instruction (0F 05).
+_SYSCALL_LENGTH: int = 2
+
+# Names of the common syscalls (x86_64), the others are named after their
+# number (e.g. "syscall_999").
+syscall_names: Dict[int, str] = {
+    0: "read",
+    1: "write",
+    2: "open",
+    3: "close",
+    4: "stat",
+    5: "fstat",
+    6: "lstat",
+    7: "poll",
+    8: "lseek",
+    9: "mmap",
+    10: "mprotect",
+    11: "munmap",
+    12: "brk",
+    13: "rt_sigaction",
+    14: "rt_sigprocmask",
+    15: "rt_sigreturn",
+    16: "ioctl",
+    17: "pread64",
+    18: "pwrite64",
+    19: "readv",
+    20: "writev",
+    21: "access",
+    22: "pipe",
+    23: "select",
+    24: "sched_yield",
+    25: "mremap",
+    28: "madvise",
+    32: "dup",
+    33: "dup2",
+    35: "nanosleep",
+    39: "getpid",
+    41: "socket",
+    42: "connect",
+    44: "sendto",
+    45: "recvfrom",
+    46: "sendmsg",
+    47: "recvmsg",
+    56: "clone",
+    57: "fork",
+    58: "vfork",
+    59: "execve",
+    60: "exit",
+    61: "wait4",
+    62: "kill",
+    72: "fcntl",
+    186: "gettid",
+    202: "futex",
+    228: "clock_gettime",
+    231: "exit_group",
+    257: "openat",
+    262: "newfstatat",
+    293: "pipe2",
+    318: "getrandom",
+    334: "rseq",
+    435: "clone3",
+}
+
+_libc = ctypes.CDLL(None, use_errno=True)
+_libc.ptrace.restype = ctypes.c_long
+_libc.ptrace.argtypes = (
+    ctypes.c_long,
+    ctypes.c_int,
+    ctypes.c_void_p,
+    ctypes.c_void_p,
+)
+
+
+class UserRegs(ctypes.Structure):
+    """
+    struct user_regs_struct (x86_64), cf. sys/user.h.
+    """
+
+    _fields_ = [
+        (name, ctypes.c_ulonglong)
+        for name in (
+            "r15",
+            "r14",
+            "r13",
+            "r12",
+            "rbp",
+            "rbx",
+            "r11",
+            "r10",
+            "r9",
+            "r8",
+            "rax",
+            "rcx",
+            "rdx",
+            "rsi",
+            "rdi",
+            "orig_rax",
+            "rip",
+            "cs",
+            "eflags",
+            "rsp",
+            "ss",
+            "fs_base",
+            "gs_base",
+            "ds",
+            "es",
+            "fs",
+            "gs",
+        )
+    ]
+
+
+class PtraceError(OSError):
+    pass
+
+
+class TracedChildTerminated(ChildProcessError):
+    """
+    Raised when the traced child terminates while it's traced (before
+    reaching the function's entry point, or during the call).
+    """
+
+    status: int
+
+    def __init__(self, status: int) -> None:
+        super().__init__(
+            f"Traced child terminated unexpectedly (status: {status:#x})."
+        )
+        self.status = status
+
+
+class Syscall(NamedTuple):
+    """
+    A syscall made during a traced call, and whether its syscall
+    instruction belongs to the library of the traced function (rather than
+    to libc's wrappers for instance).
+    """
+
+    name: str
+    number: int
+    in_library: bool
+    # None if the syscall didn't return (exit for instance).
+    return_value: Optional[int] = None
+
+    def __str__(self) -> str:
+        where: str = "" if self.in_library else " (outside the library)"
+        return f"{self.name} = {self.return_value}{where}"
+
+
+def _signed(value: int) -> int:
+    return value - (1 << 64) if value & (1 << 63) else value
+
+
+def ptrace(request: int, pid: int, addr: int = 0, data: Any = 0) -> int:
+    ctypes.set_errno(0)
+    res: int = _libc.ptrace(request, pid, addr, data)
+    if res == -1 and ctypes.get_errno():
+        errno: int = ctypes.get_errno()
+        raise PtraceError(errno, os.strerror(errno))
+    return res
+
+
+def _check_platform() -> None:
+    if platform.system() != "Linux" or platform.machine() != "x86_64":
+        raise NotImplementedError("Tracing is only supported on Linux x86_64.")
+
+
+def executable_ranges(address: int) -> List[Tuple[int, int]]:
+    """
+    Returns the executable mappings of the file (shared library) mapped at
+    `address` in the current process.
+    """
+    mappings: List[Tuple[int, int, str, str]] = []
+    path: str = ""
+    with open("/proc/self/maps") as maps:
+        for line in maps:
+            fields: List[str] = line.split(maxsplit=5)
+            start, end = (int(a, 16) for a in fields[0].split("-"))
+            pathname: str = fields[5].strip() if len(fields) > 5 else ""
+            mappings.append((start, end, fields[1], pathname))
+            if start <= address < end:
+                path = pathname
+    if not path:
+        raise ValueError(f"No file mapped at {address:#x}.")
+    return [
+        (start, end)
+        for start, end, perms, pathname in mappings
+        if pathname == path and "x" in perms
+    ]
+
+
+@functools.cache
+def _ffi_call_ranges() -> List[Tuple[int, int]]:
+    """
+    Executable ranges of libffi, which performs the foreign calls of
+    ctypes.
+    """
+    ffi_call: Any = ctypes.CDLL(_ctypes.__file__).ffi_call
+    return executable_ranges(function_address(ffi_call))
+
+
+def function_address(f: Callable[..., Any]) -> int:
+    """
+    Entry point of a raw or wrapped (cf. decorators.wrap_CDLL_func) foreign
+    function.
+    """
+    raw: Any = getattr(f, "__wrapped__", f)
+    address: Any = ctypes.cast(raw, ctypes.c_void_p).value
+    assert address is not None
+    return address
+
+
+class TracedCall:
+    """
+    TracedCall forks a child that calls `f(*args)` under ptrace, and stops
+    it at the function's entry point (thanks to a breakpoint). The call
+    then has to be driven by the tracer (cf. count_instructions).
+
+    Calls made from elsewhere than libffi (libc's strcmp is called by the
+    dynamic loader for instance) don't stop on the breakpoint.
+
+    With `run`, the child calls `run()` instead, which is expected to call
+    `f` (e.g. through a wrapped method).
+
+    The child is killed when the TracedCall is closed, unless it was
+    detached.
+    """
+
+    entry: int
+    return_address: int
+    entry_rsp: int
+
+    def __init__(
+        self,
+        f: Callable[..., Any],
+        *args: Any,
+        run: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        _check_platform()
+        self.entry = function_address(f)
+        self.pid: int = os.fork()
+        if self.pid == 0:
+            # Tracee:
+            try:
+                ptrace(PTRACE_TRACEME, 0)
+                os.kill(os.getpid(), signal.SIGSTOP)
+                if run is None:
+                    f(*args)
+                else:
+                    run()
+            finally:
+                os._exit(0)
+        try:
+            self._wait()
+            ptrace(PTRACE_SETOPTIONS, self.pid, 0, PTRACE_O_EXITKILL)
+            self._break_at_entry()
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self) -> "TracedCall":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _wait(self) -> int:
+        """
+        Waits for the child to stop, returns the stop signal.
+        """
+        _, status = os.waitpid(self.pid, 0)
+        if not os.WIFSTOPPED(status):
+            self.pid = 0
+            raise TracedChildTerminated(status)
+        return os.WSTOPSIG(status)
+
+    def _break_at_entry(self) -> None:
+        word: int = ptrace(PTRACE_PEEKDATA, self.pid, self.entry)
+        breakpoint_word: int = (word & ~0xFF) | _INT3
+        ffi_ranges: List[Tuple[int, int]] = _ffi_call_ranges()
+        pending_signal: int = 0
+        regs: UserRegs
+
+        ptrace(PTRACE_POKEDATA, self.pid, self.entry, breakpoint_word)
+        while True:
+            # Signals other than our breakpoint's are delivered to the
+            # child, as they would be without tracing.
+            ptrace(PTRACE_CONT, self.pid, 0, pending_signal)
+            pending_signal = self._wait()
+            if pending_signal != signal.SIGTRAP:
+                continue
+            regs = self.get_regs()
+            if regs.rip != self.entry + 1:
+                continue
+            pending_signal = 0
+            # Restore the instruction and rewind to the entry point.
+            ptrace(PTRACE_POKEDATA, self.pid, self.entry, word)
+            regs.rip = self.entry
+            ptrace(PTRACE_SETREGS, self.pid, 0, ctypes.byref(regs))
+            self.entry_rsp = regs.rsp
+            self.return_address = (
+                ptrace(PTRACE_PEEKDATA, self.pid, regs.rsp)
+                & 0xFFFFFFFFFFFFFFFF
+            )
+            if any(
+                start <= self.return_address < end for start, end in ffi_ranges
+            ):
+                return
+            # Not our call: step over the entry point and set the
+            # breakpoint again.
+            self.step()
+            ptrace(PTRACE_POKEDATA, self.pid, self.entry, breakpoint_word)
+
+    def get_regs(self) -> UserRegs:
+        regs: UserRegs = UserRegs()
+        ptrace(PTRACE_GETREGS, self.pid, 0, ctypes.byref(regs))
+        return regs
+
+    def returned(self, regs: UserRegs) -> bool:
+        """
+        Whether the traced function returned to its caller.
+        """
+        return regs.rip == self.return_address and regs.rsp > self.entry_rsp
+
+    def step(self) -> UserRegs:
+        ptrace(PTRACE_SINGLESTEP, self.pid)
+        self._wait()
+        return self.get_regs()
+
+    def trace_syscalls(self) -> List[Syscall]:
+        """
+        Resumes the call until it returns, and returns the syscalls it made.
+        They are recorded in self.syscalls as they are made, which is what
+        is left when the child terminates during the call.
+        """
+        ranges: List[Tuple[int, int]] = executable_ranges(self.entry)
+        word: int = ptrace(PTRACE_PEEKDATA, self.pid, self.return_address)
+        breakpoint_word: int = (word & ~0xFF) | _INT3
+        entering: bool = True
+        pending_signal: int = 0
+        regs: UserRegs
+
+        self.syscalls: List[Syscall] = []
+        ptrace(
+            PTRACE_SETOPTIONS,
+            self.pid,
+            0,
+            PTRACE_O_EXITKILL | PTRACE_O_TRACESYSGOOD,
+        )
+        ptrace(PTRACE_POKEDATA, self.pid, self.return_address, breakpoint_word)
+        while True:
+            ptrace(PTRACE_SYSCALL, self.pid, 0, pending_signal)
+            pending_signal = self._wait()
+            if pending_signal == signal.SIGTRAP | 0x80:
+                # Syscall stops alternate between entries and exits.
+                pending_signal = 0
+                regs = self.get_regs()
+                if entering:
+                    self.syscalls.append(
+                        Syscall(
+                            syscall_names.get(
+                                regs.orig_rax, f"syscall_{regs.orig_rax}"
+                            ),
+                            regs.orig_rax,
+                            any(
+                                start <= regs.rip - _SYSCALL_LENGTH < end
+                                for start, end in ranges
+                            ),
+                        )
+                    )
+                else:
+                    self.syscalls[-1] = self.syscalls[-1]._replace(
+                        return_value=_signed(regs.rax)
+                    )
+                entering = not entering
+            elif pending_signal == signal.SIGTRAP:
+                regs = self.get_regs()
+                if regs.rip != self.return_address + 1:
+                    continue
+                # Restore the instruction and rewind to the return address.
+                pending_signal = 0
+                ptrace(PTRACE_POKEDATA, self.pid, self.return_address, word)
+                regs.rip = self.return_address
+                ptrace(PTRACE_SETREGS, self.pid, 0, ctypes.byref(regs))
+                if self.returned(regs):
+                    return self.syscalls
+                # A nested call returned there, set the breakpoint again.
+                self.step()
+                ptrace(
+                    PTRACE_POKEDATA,
+                    self.pid,
+                    self.return_address,
+                    breakpoint_word,
+                )
+
+    def detach(self) -> int:
+        """
+        Lets the child run untraced (it's no longer killed on close), and
+        returns its pid: it's up to the caller to wait for it.
+        """
+        pid: int = self.pid
+        ptrace(PTRACE_DETACH, pid)
+        self.pid = 0
+        return pid
+
+    def close(self) -> None:
+        if self.pid:
+            try:
+                os.kill(self.pid, signal.SIGKILL)
+                os.waitpid(self.pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            self.pid = 0
+
+
+class InstructionCount(NamedTuple):
+    """
+    Number of instructions retired by a call: overall (including libc's
+    malloc for instance), and inside the library the function belongs to.
+    """
+
+    total: int
+    in_library: int
+
+
+def count_instructions(f: Callable[..., Any], *args: Any) -> InstructionCount:
+    """
+    count_instructions single-steps `f(*args)` (a raw or wrapped foreign
+    function) in a child process, from its entry point to its return, and
+    counts the retired user-space instructions.
+
+    Single-stepping is slow (a few microseconds per instruction), so it's
+    meant for small to medium inputs.
+    """
+    ranges: List[Tuple[int, int]] = executable_ranges(function_address(f))
+    total: int = 0
+    in_library: int = 0
+
+    with TracedCall(f, *args) as call:
+        regs: UserRegs = call.get_regs()
+        while not call.returned(regs):
+            total += 1
+            if any(start <= regs.rip < end for start, end in ranges):
+                in_library += 1
+            regs = call.step()
+    return InstructionCount(total, in_library)
+
+
+def trace_syscalls(f: Callable[..., Any], *args: Any) -> List[Syscall]:
+    """
+    trace_syscalls runs `f(*args)` (a raw or wrapped foreign function) in a
+    child process, and returns the syscalls made from its entry point to its
+    return.
+    """
+    with TracedCall(f, *args) as call:
+        return call.trace_syscalls()
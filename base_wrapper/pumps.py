@@ -0,0 +1,118 @@
+"""
+The pumps module provides the threads feeding and draining the pipes
+involved in a wrapped function call.
+
+They run concurrently with the foreign function so that transfers larger
+than the pipe buffer can't block forever.
+"""
+
+import os
+import threading
+from typing import Optional
+
+from .wrapper_types import FdToListenOn, FdToWriteTo, Mode
+
+
+class FeedingPump(threading.Thread):
+    """
+    FeedingPump writes `data` to `fd` while the foreign function reads on
+    the associated fd.
+
+    As much data as the pipe can hold is written before the call (see
+    `prefill`), so that small payloads are entirely available when the
+    foreign function reads. The rest is written from the thread.
+    """
+
+    fd: FdToWriteTo
+    associated_fd: FdToListenOn
+    mode: Mode
+    data: memoryview
+    written: int
+
+    def __init__(
+        self,
+        fd: FdToWriteTo,
+        data: bytes,
+        associated_fd: FdToListenOn,
+        mode: Optional[Mode] = None,
+    ) -> None:
+        super().__init__(daemon=True)
+        self.fd = fd
+        self.associated_fd = associated_fd
+        self.mode = Mode("bw") if mode is None else mode
+        self.data = memoryview(data)
+        self.written = 0
+
+    def prefill(self) -> None:
+        """
+        Writes without blocking until the pipe is full or the data
+        exhausted.
+        """
+        os.set_blocking(self.fd, False)
+        try:
+            while self.written < len(self.data):
+                self.written += os.write(self.fd, self.data[self.written :])
+        except BlockingIOError:
+            pass
+        finally:
+            os.set_blocking(self.fd, True)
+
+    def run(self) -> None:
+        try:
+            with os.fdopen(self.fd, self.mode) as f:
+                f.write(self.data[self.written :])
+        except BrokenPipeError:
+            # The reading end was closed before all the data was consumed,
+            # (e.g. ft_read called with a count lower than the data size).
+            pass
+
+    def start(self) -> None:
+        self.prefill()
+        super().start()
+
+    def finish(self) -> None:
+        """
+        To be called once the foreign function returned: closes the
+        reading end (which unblocks a pending write) and waits for the
+        thread.
+        """
+        os.close(self.associated_fd)
+        self.join()
+
+
+class DrainingPump(threading.Thread):
+    """
+    DrainingPump reads everything the foreign function writes to the
+    associated fd, until it's closed.
+    """
+
+    fd: FdToListenOn
+    associated_fd: FdToWriteTo
+    mode: Mode
+    output: bytes
+
+    def __init__(
+        self,
+        fd: FdToListenOn,
+        associated_fd: FdToWriteTo,
+        mode: Optional[Mode] = None,
+    ) -> None:
+        super().__init__(daemon=True)
+        self.fd = fd
+        self.associated_fd = associated_fd
+        self.mode = Mode("rb") if mode is None else mode
+        self.output = b""
+
+    def run(self) -> None:
+        with os.fdopen(self.fd, self.mode) as f:
+            self.output = f.read()
+
+    def finish(self) -> bytes:
+        """
+        To be called once the foreign function returned: closes the
+        writing end (so the thread reaches EOF) and returns the captured
+        output.
+        """
+        os.close(self.associated_fd)
+        self.join()
+        return self.output
@@ -4,12 +4,19 @@ encapsulate the observed behaviour of a shared library function
 (not only the return value).
 """
 
-from typing import Optional, Generic
+import itertools
+from typing import List, Optional, Generic, Tuple
+from signal import Signals
+from .alloc_tracker import Allocations
+from .faults import Fault
+from .ptrace import Syscall
 from .wrapper_types import (
     ResTypeTypeVar,
     CapturedOutputs,
     FdToListenOn,
     FdToWriteTo,
+    ArgIndex,
+    MemfdOutputs,
 )
 
 
@@ -23,6 +30,18 @@ class Result(Generic[ResTypeTypeVar]):
 
     return_value: ResTypeTypeVar
     outputs: CapturedOutputs
+    memfd_outputs: MemfdOutputs
+    # Set when the call was run in an isolated worker that died.
+    signal: Optional[Signals]
+    exit_code: Optional[int]
+    # Set when the call was aborted because it exceeded its timeout.
+    timed_out: bool
+    # Set when the call was run in a worker tracking allocations.
+    allocations: Optional[Allocations]
+    # Set when the worker that died reported its fault.
+    fault: Optional[Fault]
+    # Set when the call was run in a worker tracing syscalls.
+    syscall_trace: Optional[List[Syscall]]
 
     def __init__(
         self,
@@ -38,6 +57,13 @@ class Result(Generic[ResTypeTypeVar]):
         else:
             self.outputs = captured_outputs
         self.return_value = return_value
+        self.memfd_outputs = {}
+        self.signal = None
+        self.exit_code = None
+        self.timed_out = False
+        self.allocations = None
+        self.fault = None
+        self.syscall_trace = None
 
     def __eq__(self, val) -> bool:
         """
@@ -56,6 +82,44 @@ class Result(Generic[ResTypeTypeVar]):
             )
         return self == Result(val)
 
+    def __repr__(self) -> str:
+        if self.crashed or self.timed_out:
+            return f"<Result: {self.death_repr()}>"
+        return f"<Result: {self.return_value!r}>"
+
+    @property
+    def crashed(self) -> bool:
+        """
+        Whether the isolated worker that ran the call died during it.
+        """
+        return self.signal is not None or self.exit_code is not None
+
+    @property
+    def syscalls(self) -> Optional[List[Tuple[str, int]]]:
+        """
+        The traced syscalls, consecutive identical ones counted together,
+        e.g. `result.syscalls == [("write", 1)]`.
+        """
+        if self.syscall_trace is None:
+            return None
+        return [
+            (name, len(list(group)))
+            for name, group in itertools.groupby(
+                syscall.name for syscall in self.syscall_trace
+            )
+        ]
+
+    def death_repr(self) -> str:
+        if self.timed_out:
+            return "call timed out, worker killed"
+        if self.signal is not None:
+            if self.fault is not None:
+                return f"worker killed by {self.signal.name} ({self.fault})"
+            return f"worker killed by {self.signal.name}"
+        if self.exit_code is not None:
+            return f"worker exited with status {self.exit_code}"
+        return "worker alive"
+
     def add_output(
         self,
         output: bytes,
@@ -66,3 +130,13 @@ class Result(Generic[ResTypeTypeVar]):
             output,
             fd_output_was_read_on,
         )
+
+    def add_memfd_output(
+        self, output: memoryview, arg_index: ArgIndex
+    ) -> None:
+        """
+        Stores the content of a memfd passed as the `arg_index`-th
+        argument. The memoryview is backed by a mapping of the memfd, no
+        copy is involved.
+        """
+        self.memfd_outputs[arg_index] = output
@@ -0,0 +1,128 @@
+"""
+The shrink module minimizes the arguments of a failing call (a
+divergence or a crash found by fuzzing for instance), so that the
+remaining input is small enough to be read.
+
+Arguments are shrunk according to their kind:
+ - byte strings (PointerToChar arguments) are shortened by removing
+   chunks of decreasing sizes (from halves to single bytes), then their
+   bytes are simplified (replaced by b"0" or b"a"),
+ - integers (c_int, c_size_t arguments) are bisected toward 0.
+"""
+
+from typing import Callable, Dict, Tuple, Union
+
+Value = Union[bytes, int]
+Row = Tuple[Value, ...]
+
+# Replacement bytes tried when simplifying, in order of preference.
+simple_bytes: bytes = b"0a"
+
+
+class Shrinker:
+    """
+    A Shrinker minimizes rows of arguments for which `predicate` holds
+    (the call still fails), within `max_executions` executions of the
+    predicate.
+    """
+
+    def __init__(
+        self,
+        predicate: Callable[[Row], bool],
+        max_executions: int = 1000,
+    ) -> None:
+        self.predicate = predicate
+        self.max_executions = max_executions
+        self.executions: int = 0
+        self._seen: Dict[Row, bool] = {}
+
+    @property
+    def exhausted(self) -> bool:
+        return self.executions >= self.max_executions
+
+    def test(self, row: Row) -> bool:
+        """
+        Whether the candidate still fails (false once the budget is
+        exhausted).
+        """
+        if row not in self._seen:
+            if self.exhausted:
+                return False
+            self.executions += 1
+            self._seen[row] = self.predicate(row)
+        return self._seen[row]
+
+    def shrink(self, row: Row) -> Row:
+        """
+        Returns the smallest failing row found. Arguments are shrunk in
+        turn until none of them can be shrunk further.
+        """
+        progress: bool = True
+        while progress and not self.exhausted:
+            progress = False
+            for i, value in enumerate(row):
+                shrunk: Row
+                if isinstance(value, (bytes, bytearray)):
+                    shrunk = self._shrink_bytes(row, i)
+                elif isinstance(value, int):
+                    shrunk = self._shrink_int(row, i)
+                else:
+                    continue
+                if shrunk != row:
+                    row = shrunk
+                    progress = True
+        return row
+
+    @staticmethod
+    def _replace(row: Row, i: int, value: Value) -> Row:
+        return row[:i] + (value,) + row[i + 1 :]
+
+    def _shrink_bytes(self, row: Row, i: int) -> Row:
+        s: bytes = bytes(row[i])  # type: ignore
+        candidate: bytes
+
+        # Bisect the length:
+        chunk: int = len(s) // 2 or len(s)
+        while chunk and not self.exhausted:
+            j: int = 0
+            while j < len(s):
+                candidate = s[:j] + s[j + chunk :]
+                if self.test(self._replace(row, i, candidate)):
+                    s = candidate
+                else:
+                    j += chunk
+            chunk //= 2
+
+        # Simplify the bytes:
+        for j in range(len(s)):
+            for simple_byte in simple_bytes:
+                if s[j] == simple_byte:
+                    break
+                candidate = s[:j] + bytes((simple_byte,)) + s[j + 1 :]
+                if self.test(self._replace(row, i, candidate)):
+                    s = candidate
+                    break
+        return self._replace(row, i, s)
+
+    def _shrink_int(self, row: Row, i: int) -> Row:
+        # Invariant: `failing` fails, `passing` doesn't (or isn't known to).
+        failing: int = row[i]  # type: ignore
+        passing: int = 0
+        if failing == 0 or self.test(self._replace(row, i, 0)):
+            return self._replace(row, i, 0)
+        while abs(failing - passing) > 1 and not self.exhausted:
+            middle: int = (failing + passing) // 2
+            if self.test(self._replace(row, i, middle)):
+                failing = middle
+            else:
+                passing = middle
+        return self._replace(row, i, failing)
+
+
+def shrink(
+    row: Row, predicate: Callable[[Row], bool], max_executions: int = 1000
+) -> Row:
+    """
+    Shortcut for Shrinker(predicate, max_executions).shrink(row).
+    """
+    return Shrinker(predicate, max_executions).shrink(row)
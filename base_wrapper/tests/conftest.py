@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+import ctypes
+import os
+import shutil
+import subprocess
+from typing import Callable, Dict, Tuple
+
+import pytest
+
+from base_wrapper import BaseWrapper
+from base_wrapper.utils import integer_errcheck
+from base_wrapper.wrapper_types import FuncInfos, PointerToChar
+
+BIN_TOOLS_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "../../libasm_test_suite/bin_tools",
+)
+
+
+class LibcWrapper(BaseWrapper):
+    """
+    The libc functions the tests call through a wrapper.
+    """
+
+    functions = {
+        "strlen": FuncInfos(
+            argtypes=(PointerToChar,),
+            restype=ctypes.c_size_t,
+            errcheck=None,
+        ),
+        "strcpy": FuncInfos(
+            argtypes=(PointerToChar, PointerToChar),
+            restype=PointerToChar,
+            errcheck=None,
+        ),
+        "strcmp": FuncInfos(
+            argtypes=(PointerToChar, PointerToChar),
+            restype=ctypes.c_int,
+            errcheck=None,
+        ),
+        "write": FuncInfos(
+            argtypes=(ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t),
+            restype=ctypes.c_ssize_t,
+            errcheck=None,
+        ),
+        "close": FuncInfos(
+            argtypes=(ctypes.c_int,),
+            restype=ctypes.c_int,
+            errcheck=integer_errcheck,
+        ),
+        # unsigned int sleep(unsigned int), ArgType has no c_uint.
+        "sleep": FuncInfos(
+            argtypes=(ctypes.c_int,),
+            restype=ctypes.c_int,
+            errcheck=None,
+        ),
+        "raise": FuncInfos(
+            argtypes=(ctypes.c_int,),
+            restype=ctypes.c_int,
+            errcheck=None,
+        ),
+        "getpid": FuncInfos(
+            argtypes=(),
+            restype=ctypes.c_int,
+            errcheck=None,
+        ),
+    }
+
+
+@pytest.fixture(scope="session")
+def gcc() -> str:
+    """
+    Path of gcc, the tests building native code are skipped without it.
+    """
+    path = shutil.which("gcc")
+    if path is None:
+        pytest.skip("gcc is needed to build native code.")
+    return path
+
+
+@pytest.fixture(scope="session")
+def compiled_shim(gcc, tmp_path_factory) -> Callable[..., str]:
+    """
+    compiled_shim(src, *flags) compiles a shared library and returns its
+    path. `src` is either the name of a source of
+    libasm_test_suite/bin_tools (e.g. "batch.c") or C source code. Each
+    source is compiled once per session (for given flags).
+    """
+    shims: Dict[Tuple[str, ...], str] = {}
+
+    def compile_shim(src: str, *flags: str) -> str:
+        key: Tuple[str, ...] = (src, *flags)
+        if key not in shims:
+            directory = tmp_path_factory.mktemp("shim")
+            if src.endswith(".c") and "\n" not in src:
+                name: str = src.removesuffix(".c")
+                src_path: str = os.path.join(BIN_TOOLS_DIR, src)
+            else:
+                name = "shim"
+                src_path = str(directory / "shim.c")
+                (directory / "shim.c").write_text(src)
+            shims[key] = str(directory / f"{name}.so")
+            subprocess.run(
+                [
+                    gcc,
+                    "-shared",
+                    "-fPIC",
+                    "-O2",
+                    "-o",
+                    shims[key],
+                    src_path,
+                    *flags,
+                ],
+                check=True,
+            )
+        return shims[key]
+
+    return compile_shim
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+import ctypes
+
+import pytest
+
+from base_wrapper import BaseWrapper, IsolatedExecutor
+from base_wrapper.wrapper_types import FuncInfos
+
+ALLOCATING_SRC = """
+#include <stdlib.h>
+
+void *allocate(size_t size) { return malloc(size); }
+void release(void *p) { free(p); }
+
+void *allocate_twice(size_t size)
+{
+    void *p = malloc(size);
+    void *q;
+
+    if (!p)
+        return NULL;
+    q = malloc(size);
+    free(p);
+    return q;
+}
+"""
+
+
+class AllocatingWrapper(BaseWrapper):
+    functions = {
+        "allocate": FuncInfos(
+            argtypes=(ctypes.c_size_t,),
+            restype=ctypes.c_void_p,
+            errcheck=None,
+        ),
+        "allocate_twice": FuncInfos(
+            argtypes=(ctypes.c_size_t,),
+            restype=ctypes.c_void_p,
+            errcheck=None,
+        ),
+        "release": FuncInfos(
+            argtypes=(ctypes.c_void_p,),
+            restype=type(None),
+            errcheck=None,
+        ),
+    }
+
+
+@pytest.fixture(scope="module")
+def tracked(compiled_shim):
+    # Unoptimized, so that the allocations are kept.
+    with IsolatedExecutor(
+        AllocatingWrapper(compiled_shim(ALLOCATING_SRC, "-O0")),
+        track_allocations=compiled_shim("alloc_tracker.c", "-ldl"),
+    ) as executor:
+        yield executor
+
+
+def test_allocations(tracked):
+    result = tracked.call("allocate", 24)
+    assert result.allocations.allocations == 1
+    assert result.allocations.live_blocks == 1
+    assert result.allocations.live_bytes == 24
+
+    result = tracked.call("release", result.return_value)
+    assert result.allocations.live_blocks == -1
+    assert result.allocations.live_bytes == -24
+    assert not result.allocations.invalid_frees
+
+
+def test_double_free(tracked):
+    p = tracked.call("allocate", 8).return_value
+    tracked.call("release", p)
+
+    result = tracked.call("release", p)
+    assert not result.crashed
+    assert result.allocations.invalid_frees == 1
+    assert not result.allocations.live_blocks
+
+
+def test_untracked_executor(compiled_shim):
+    with IsolatedExecutor(
+        AllocatingWrapper(compiled_shim(ALLOCATING_SRC, "-O0"))
+    ) as executor:
+        assert executor.call("allocate", 8).allocations is None
+        with pytest.raises(RuntimeError):
+            executor.call("allocate", 8, fail_allocation=1)
+
+
+def test_failing_allocation(tracked):
+    result = tracked.call("allocate", 8, fail_allocation=1)
+    assert result.return_value is None
+    assert result.allocations.failed_allocations == 1
+    assert not result.allocations.live_blocks
+
+    result = tracked.call("allocate_twice", 8, fail_allocation=2)
+    assert result.return_value is None
+    assert result.allocations.allocations == 1
+    assert not result.allocations.live_blocks
+
+    # Failures are reset after the call:
+    result = tracked.call("allocate", 8)
+    assert result.return_value is not None
+    tracked.call("release", result.return_value)
+
+
+def test_allocation_failures(tracked):
+    failures = list(tracked.allocation_failures("allocate_twice", 8))
+    assert [failure.allocation for failure in failures] == [1, 2]
+    for failure in failures:
+        assert failure.outcome.return_value is None
+        assert not failure.outcome.allocations.live_blocks
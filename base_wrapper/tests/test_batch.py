@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+from base_wrapper.tests.conftest import LibcWrapper
+import array
+import ctypes
+import errno
+import pytest
+
+
+@pytest.fixture(scope="module")
+def libc(compiled_shim):
+    return LibcWrapper(
+        "libc.so.6", system_lib=True, batch_shim=compiled_shim("batch.c")
+    )
+
+
+def test_batch_strings(libc):
+    inputs = [b"", b"foo", b"*" * 1000]
+
+    result = libc.batch.strlen(inputs)
+
+    assert list(result.return_values) == [0, 3, 1000]
+    assert list(result.errnos) == [0, 0, 0]
+
+
+def test_batch_signed_return_values(libc):
+    result = libc.batch.strcmp([b"a", b"b", b"c"], [b"b", b"b", b"a"])
+
+    assert [v < 0 for v in result.return_values] == [True, False, False]
+    assert result.return_values[1] == 0
+    assert result.return_values[2] > 0
+
+
+def test_batch_errno(libc):
+    result = libc.batch.write([-1, -1], [b"foo", b"bar"], [3, 3])
+
+    assert list(result.return_values) == [-1, -1]
+    assert list(result.errnos) == [errno.EBADF, errno.EBADF]
+
+
+def test_batch_addresses(libc):
+    buffers = [ctypes.create_string_buffer(b"*" * n) for n in (1, 2, 3)]
+
+    result = libc.batch.strlen(
+        array.array("Q", (ctypes.addressof(b) for b in buffers))
+    )
+
+    assert list(result.return_values) == [1, 2, 3]
+
+
+def test_batch_column_lengths(libc):
+    with pytest.raises(ValueError):
+        libc.batch.strcmp([b"a"], [b"a", b"b"])
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+from base_wrapper.benchmark import (
+    benchmark,
+    median_confidence_interval,
+    null_function,
+    percentile,
+    reject_outliers,
+)
+import ctypes
+import os
+
+
+def test_reject_outliers():
+    kept, n_outliers = reject_outliers([10, 11, 9, 10, 12, 10, 1000])
+    assert n_outliers == 1
+    assert 1000 not in kept
+
+
+def test_percentile():
+    samples = list(range(101))
+    assert percentile(samples, 0.5) == 50
+    assert percentile(samples, 0.95) == 95
+
+
+def test_median_confidence_interval():
+    samples = list(range(100))
+    low, high = median_confidence_interval(samples)
+    assert low < 50 < high
+
+
+def test_benchmark_raw_function():
+    strlen = ctypes.CDLL("libc.so.6").strlen
+    strlen.argtypes = (ctypes.c_char_p,)
+    strlen.restype = ctypes.c_size_t
+    affinity = os.sched_getaffinity(0)
+
+    stats = benchmark(strlen, b"*" * 4096, max_time=0.05)
+
+    assert os.sched_getaffinity(0) == affinity
+    assert stats.samples >= 10
+    assert stats.overhead > 0
+    assert stats.ci_low <= stats.median <= stats.ci_high
+
+
+def test_null_function_has_the_same_prototype():
+    strlen = ctypes.CDLL("libc.so.6").strlen
+    strlen.argtypes = (ctypes.c_char_p,)
+    strlen.restype = ctypes.c_size_t
+
+    null = null_function(strlen)
+
+    assert type(null)._flags_ == type(strlen)._flags_
+    assert null.argtypes == strlen.argtypes
+    assert null.restype == strlen.restype
+
+
+def test_benchmark_overhead_not_subtracted():
+    labs = ctypes.CDLL("libc.so.6").labs
+    labs.argtypes = (ctypes.c_long,)
+    labs.restype = ctypes.c_long
+
+    # No overhead is low enough to be subtracted: the raw durations are
+    # reported.
+    stats = benchmark(labs, 42, max_time=0.05, max_overhead=0.0)
+
+    assert not stats.overhead_subtracted
+    assert stats.overhead > 0
+    assert stats.median > 0
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import math
+import random
+
+import pytest
+
+from base_wrapper.complexity import (
+    analyze,
+    assert_complexity,
+    fit_complexity,
+    geometric_sizes,
+    parse_complexity,
+)
+
+sizes = geometric_sizes(16, 16384)
+
+
+@pytest.mark.parametrize(
+    "cost, complexity",
+    [
+        (lambda n: 100, "1"),
+        (lambda n: 50 + 3 * n, "n"),
+        (lambda n: n * math.log2(n), "n log n"),
+        # Bubble sort comparisons:
+        (lambda n: n * (n - 1) / 2, "n^2"),
+    ],
+)
+def test_fit(cost, complexity):
+    fit = analyze(cost, sizes)
+
+    assert fit.complexity == complexity
+    assert fit.confidence > 0.9
+
+
+def test_noisy_fit():
+    noise = random.Random(0)
+
+    fit = fit_complexity(
+        sizes,
+        [(200 + n * math.log2(n)) * noise.uniform(0.9, 1.1) for n in sizes],
+    )
+
+    assert fit.complexity == "n log n"
+
+
+def test_noisy_constant():
+    noise = random.Random(0)
+
+    # Higher classes fit the noise a bit better, not significantly:
+    for _ in range(20):
+        fit = fit_complexity(
+            sizes, [100 * noise.uniform(0.99, 1.01) for _ in sizes]
+        )
+        assert fit.complexity == "1"
+
+
+def test_assert_complexity():
+    assert_complexity(lambda n: n, sizes, "n log n")
+    with pytest.raises(AssertionError, match=r"O\(n\^2\)"):
+        assert_complexity(lambda n: n * n, sizes, "O(n log n)")
+
+
+@pytest.mark.parametrize("name", ["O(n log n)", "nlogn", "N Log N"])
+def test_parse_complexity(name):
+    assert parse_complexity(name) == "n log n"
+    assert parse_complexity("n²") == parse_complexity("n**2") == "n^2"
+    with pytest.raises(ValueError):
+        parse_complexity("2^n")
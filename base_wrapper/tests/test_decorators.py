@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+from base_wrapper.decorators import wrap_CDLL_func
+from base_wrapper.wrapper_types import FdToListenOn, FdToWriteTo
+import ctypes
+import os
+import pytest
+
+
+@pytest.fixture
+def wrapped_libc_write():
+    write = ctypes.CDLL("libc.so.6", use_errno=True).write
+    write.argtypes = (ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t)
+    write.restype = ctypes.c_ssize_t
+    return wrap_CDLL_func(write)
+
+
+@pytest.fixture
+def wrapped_libc_read():
+    read = ctypes.CDLL("libc.so.6", use_errno=True).read
+    read.argtypes = (ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t)
+    read.restype = ctypes.c_ssize_t
+    return wrap_CDLL_func(read)
+
+
+@pytest.mark.parametrize("size", [0, 3, 1024 * 1024 * 4])
+def test_output_larger_than_pipe_is_drained(wrapped_libc_write, size: int):
+    """
+    Writing more than the pipe buffer only works if the pipe is drained
+    during the call.
+    """
+    data = b"*" * size
+    r, w = os.pipe()
+    res = wrapped_libc_write(
+        w,
+        data,
+        size,
+        fds_to_listen_on_infos={FdToListenOn(r): (size, FdToWriteTo(w), None)},
+    )
+    assert res.return_value == size
+    assert res.outputs[w] == (data, r)
+
+
+def test_input_larger_than_pipe_is_fed(wrapped_libc_read):
+    """
+    Feeding more than the pipe buffer only works if the pipe is fed during
+    the call.
+    """
+    data = b"*" * 1024 * 1024 * 4
+    buf = ctypes.create_string_buffer(16)
+    r, w = os.pipe()
+    res = wrapped_libc_read(
+        r,
+        buf,
+        15,
+        fds_to_write_to_infos={
+            FdToWriteTo(w): (data, 15, FdToListenOn(r), None)
+        },
+    )
+    assert res.return_value == 15
+    assert buf.value == data[:15]
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+from base_wrapper import BaseWrapper
+from base_wrapper.elf import ElfError, ElfFile, library_index, library_path
+from base_wrapper.wrapper_types import FuncInfos, PointerToChar
+import ctypes
+import pytest
+
+SOURCE = """
+unsigned long strlen(const char *s);
+void *malloc(unsigned long size) __attribute__((noplt));
+
+unsigned long ft_plt(const char *s) { return strlen(s) + 1; }
+void *ft_got(unsigned long size) { return malloc(size + 1); }
+int ft_none(int x) { return x * 3; }
+"""
+
+
+class Wrapper(BaseWrapper):
+    functions = {
+        "ft_plt": FuncInfos(
+            argtypes=(PointerToChar,), restype=ctypes.c_size_t, errcheck=None
+        ),
+        "ft_missing": FuncInfos(
+            argtypes=(), restype=ctypes.c_int, errcheck=None
+        ),
+        # Found by dlsym in libc (a dependency), not defined by the library:
+        "malloc": FuncInfos(
+            argtypes=(ctypes.c_size_t,),
+            restype=ctypes.c_void_p,
+            errcheck=None,
+        ),
+    }
+
+
+@pytest.fixture(scope="module")
+def library(compiled_shim):
+    return compiled_shim(SOURCE, "-O1", "-fno-builtin")
+
+
+def test_library_index(library):
+    index = library_index(library)
+
+    assert library_index(library) is index
+    assert {"ft_plt", "ft_got", "ft_none"} <= index.defined
+    assert {"strlen", "malloc"} <= index.undefined
+    assert index.functions["ft_plt"].imports == ("strlen",)
+    assert index.functions["ft_got"].imports == ("malloc",)
+    assert index.functions["ft_none"].imports == ()
+
+
+def test_library_path():
+    path = library_path(ctypes.CDLL("libc.so.6"))
+
+    assert path is not None
+    assert library_index(path).implements("strlen")
+
+
+def test_not_elf(tmp_path):
+    (tmp_path / "lib.so").write_bytes(b"not an ELF file")
+    with pytest.raises(ElfError):
+        ElfFile(str(tmp_path / "lib.so"))
+
+
+def test_wrapper_implemented_functions(library):
+    wrapper = Wrapper(library)
+
+    assert wrapper.implements("ft_plt")
+    assert not wrapper.implements("malloc")
+    assert wrapper.ft_plt(b"foo") == 4
+    with pytest.raises(NotImplementedError, match="ft_missing"):
+        wrapper.raw_ft_missing()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+from base_wrapper import IsolatedExecutor, LazyBuffer, SharedBuffer
+from base_wrapper.tests.conftest import LibcWrapper
+import errno
+import pytest
+import signal
+
+
+@pytest.fixture(scope="module")
+def libc_isolated():
+    with IsolatedExecutor(
+        LibcWrapper("libc.so.6", system_lib=True), workers=2
+    ) as executor:
+        yield executor
+
+
+def test_isolated_call(libc_isolated):
+    assert libc_isolated.strlen(b"foo") == 3
+    assert libc_isolated.strlen(LazyBuffer(b"foo", 1024)) == 3 * 1024
+
+
+def test_isolated_call_shared_buffer(libc_isolated):
+    dst = SharedBuffer(4)
+    libc_isolated.strcpy(dst, b"foo")
+    assert dst.value == b"foo"
+
+
+def test_isolated_call_exception(libc_isolated):
+    with pytest.raises(OSError) as exc_info:
+        libc_isolated.close(-1)
+    assert exc_info.value.errno == errno.EBADF
+
+
+def test_isolated_call_crash(libc_isolated):
+    for _ in range(3):
+        result = libc_isolated.call("raise", signal.SIGSEGV)
+        assert result.crashed
+        assert result.signal == signal.SIGSEGV
+    # Workers were respawned:
+    assert libc_isolated.strlen(b"foo") == 3
+
+
+def _strlens(wrapper, strings):
+    return [wrapper.strlen(s).return_value for s in strings]
+
+
+def _crash(wrapper):
+    getattr(wrapper, "raise")(signal.SIGSEGV)
+
+
+def test_isolated_submit(libc_isolated):
+    assert libc_isolated.submit(_strlens, [b"", b"foo"]) == [0, 3]
+    assert libc_isolated.submit(_crash).signal == signal.SIGSEGV
+
+
+def test_isolated_call_timeout(libc_isolated):
+    result = libc_isolated.sleep(10, timeout=0.1)
+    assert result.timed_out
+    assert libc_isolated.sleep(0, timeout=1) == 0
+
+
+def test_isolated_call_default_timeout():
+    with IsolatedExecutor(
+        LibcWrapper("libc.so.6", system_lib=True, timeout=0.1)
+    ) as executor:
+        assert executor.sleep(10).timed_out
+        assert executor.sleep(10, timeout=0.2).timed_out
+
+
+def test_isolated_call_traced_syscalls():
+    with IsolatedExecutor(
+        LibcWrapper("libc.so.6", system_lib=True), trace_syscalls=True
+    ) as executor:
+        result = executor.getpid()
+        assert result.syscalls == [("getpid", 1)]
+        assert result.syscall_trace[0].in_library
+        assert result.syscall_trace[0].return_value == result.return_value
+        assert executor.strlen(b"foo").syscalls == []
+        # The traced child's death is the worker's:
+        assert executor.call("raise", signal.SIGSEGV).signal == signal.SIGSEGV
+        assert executor.submit(_strlens, [b"foo"]) == [3]
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+import mmap
+import signal
+
+import pytest
+
+from base_wrapper import GuardedBuffer, IsolatedExecutor
+from base_wrapper.tests.conftest import LibcWrapper
+
+
+@pytest.fixture(scope="module")
+def libc_isolated(compiled_shim):
+    with IsolatedExecutor(
+        LibcWrapper("libc.so.6", system_lib=True),
+        report_faults=compiled_shim("fault_reporter.c"),
+    ) as executor:
+        yield executor
+
+
+def test_guarded_buffer_layout():
+    buffer = GuardedBuffer(b"foo", slack=3)
+    array = buffer.materialize()
+    address = buffer.address
+    try:
+        assert array.raw == b"foo\0"
+        assert not (address + len(buffer) + buffer.slack) % mmap.PAGESIZE
+    finally:
+        buffer.release()
+
+    # The region is recycled:
+    buffer.materialize()
+    assert buffer.address == address
+    buffer.release()
+
+
+def test_guarded_buffer_in_bounds(libc_isolated):
+    assert libc_isolated.strlen(GuardedBuffer(b"foo")) == 3
+    result = libc_isolated.strcpy(GuardedBuffer(3, slack=1), b"foo")
+    assert not result.crashed
+
+
+def test_guarded_buffer_overrun(libc_isolated):
+    result = libc_isolated.strlen(GuardedBuffer(b"foo", nul_terminated=False))
+    assert result.signal == signal.SIGSEGV
+    assert result.fault.boundary_violation
+    assert result.fault.buffer == "GuardedBuffer(b'foo')"
+    assert result.fault.offset == 0
+    assert result.fault.access in ("read", None)
+
+    result = libc_isolated.strcpy(GuardedBuffer(3), b"foo")
+    assert result.fault.boundary_violation
+    assert result.fault.access in ("write", None)
+    assert "past the end of GuardedBuffer(3)" in result.death_repr()
+
+
+def test_signal_without_fault(libc_isolated):
+    result = libc_isolated.call("raise", signal.SIGSEGV)
+    assert result.signal == signal.SIGSEGV
+    assert result.fault is None
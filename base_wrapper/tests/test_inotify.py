@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+
+from base_wrapper.inotify import IN_CLOSE_WRITE, Inotify
+
+
+def test_inotify_watches_trees(tmp_path):
+    (tmp_path / "srcs").mkdir()
+    (tmp_path / ".git").mkdir()
+    with Inotify() as inotify:
+        inotify.add_tree(str(tmp_path))
+
+        (tmp_path / "srcs" / "ft_strlen.s").write_text("")
+        (tmp_path / ".git" / "index").write_text("")
+        events = inotify.read(timeout=5)
+        assert str(tmp_path / "srcs" / "ft_strlen.s") in {
+            e.path for e in events if e.mask & IN_CLOSE_WRITE
+        }
+        assert not any(".git" in e.path for e in events)
+
+        # New directories are watched too:
+        (tmp_path / "bonus").mkdir()
+        inotify.read(timeout=5)
+        (tmp_path / "bonus" / "ft_list_size.s").write_text("")
+        events = inotify.read(timeout=5, settle=0.1)
+        assert str(tmp_path / "bonus" / "ft_list_size.s") in {
+            e.path for e in events
+        }
+
+        assert inotify.read(timeout=0.1) == []
+    assert inotify.fd == -1
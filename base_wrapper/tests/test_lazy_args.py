@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+from base_wrapper.lazy_args import LazyBuffer, MemfdCapture
+from base_wrapper.result import Result
+from base_wrapper.wrapper_types import ArgIndex
+import ctypes
+import os
+import pytest
+
+
+@pytest.mark.parametrize(
+    "lazy_buffer,expected",
+    [
+        (LazyBuffer(b"", 0), b""),
+        (LazyBuffer(b"foo"), b"foo"),
+        (LazyBuffer(b"ab", 3, suffix=b"c"), b"abababc"),
+        (LazyBuffer(b"x", 0, suffix=b"yz"), b"yz"),
+    ],
+)
+def test_lazy_buffer_content(lazy_buffer: LazyBuffer, expected: bytes):
+    buf = lazy_buffer.materialize()
+    try:
+        assert buf.raw == expected + b"\0"
+    finally:
+        lazy_buffer.release()
+
+
+def test_lazy_buffer_tiled_content():
+    repeat = 3 * LazyBuffer.tile_min_size + 7
+    lazy_buffer = LazyBuffer(b"foo", repeat, suffix=b"bar")
+    buf = lazy_buffer.materialize()
+    try:
+        assert len(buf) == 3 * repeat + 4
+        assert buf[:6] == b"foofoo"
+        assert buf[3 * 123457 : 3 * 123457 + 6] == b"foofoo"
+        assert buf[3 * repeat - 3 :] == b"foobar\0"
+    finally:
+        lazy_buffer.release()
+
+
+def test_lazy_buffer_not_nul_terminated():
+    lazy_buffer = LazyBuffer(b"ab", 2, nul_terminated=False)
+    buf = lazy_buffer.materialize()
+    try:
+        assert buf.raw == b"abab"
+    finally:
+        lazy_buffer.release()
+
+
+@pytest.mark.parametrize("data", [b"", b"foo", b"*" * 1024 * 1024])
+def test_memfd_capture(data: bytes):
+    capture = MemfdCapture()
+    result: Result[ctypes.c_ssize_t] = Result(None)
+    fd = capture.materialize()
+    try:
+        os.write(fd, data)
+        capture.collect(result, ArgIndex(1))
+    finally:
+        capture.release()
+    assert result.memfd_outputs[ArgIndex(1)] == data
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+from base_wrapper.ptrace import TracedCall, count_instructions, trace_syscalls
+import ctypes
+import os
+import signal
+
+libc = ctypes.CDLL("libc.so.6")
+
+
+def test_count_instructions_is_deterministic():
+    strlen = libc.strlen
+    strlen.argtypes = (ctypes.c_char_p,)
+    strlen.restype = ctypes.c_size_t
+
+    small = count_instructions(strlen, b"*" * 16)
+    large = count_instructions(strlen, b"*" * 4096)
+
+    assert small == count_instructions(strlen, b"*" * 16)
+    assert 0 < small.in_library < large.in_library
+    assert large.in_library == large.total
+
+
+def test_count_instructions_ignores_other_calls():
+    # The dynamic loader calls strcmp too, only the call from ctypes has to
+    # be counted.
+    strcmp = libc.strcmp
+    strcmp.argtypes = (ctypes.c_char_p, ctypes.c_char_p)
+    strcmp.restype = ctypes.c_int
+
+    short = count_instructions(strcmp, b"*" * 16 + b"a", b"*" * 16 + b"b")
+    long = count_instructions(strcmp, b"*" * 4096 + b"a", b"*" * 4096 + b"b")
+
+    assert short.in_library < long.in_library
+
+
+def test_traced_call_delivers_signals():
+    strlen = libc.strlen
+    strlen.argtypes = (ctypes.c_char_p,)
+    strlen.restype = ctypes.c_size_t
+    received = []
+
+    def run():
+        # Only calls strlen if the signal raised before was delivered.
+        signal.signal(signal.SIGUSR1, lambda *_: received.append(True))
+        os.kill(os.getpid(), signal.SIGUSR1)
+        if received:
+            strlen(b"foo")
+
+    with TracedCall(strlen, run=run) as call:
+        assert call.get_regs().rip == call.entry
+
+
+def test_trace_syscalls():
+    write = libc.write
+    write.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_size_t)
+    write.restype = ctypes.c_ssize_t
+    fd = os.open(os.devnull, os.O_WRONLY)
+
+    try:
+        syscalls = trace_syscalls(write, fd, b"foo", 3)
+    finally:
+        os.close(fd)
+
+    assert [syscall.name for syscall in syscalls] == ["write"]
+    assert syscalls[0].in_library
+    assert syscalls[0].return_value == 3
+    assert trace_syscalls(libc.strlen, b"foo") == []
@@ -1,8 +1,22 @@
 #!/usr/bin/env python3
 
+from base_wrapper.ptrace import Syscall
 from base_wrapper.result import Result
 
 
 def test_result_integers():
     assert 1 == Result(1)
     assert not 0 == Result(1)
+
+
+def test_result_syscalls():
+    result = Result(3)
+    assert result.syscalls is None
+
+    result.syscall_trace = [
+        Syscall("write", 1, True, 1),
+        Syscall("write", 1, True, 2),
+        Syscall("brk", 12, False, 0),
+        Syscall("write", 1, True, 0),
+    ]
+    assert result.syscalls == [("write", 2), ("brk", 1), ("write", 1)]
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+from base_wrapper.corpus import Corpus
+from base_wrapper.shrink import Shrinker, shrink
+
+
+def test_shrink_bytes():
+    row = (b"noise" * 1000 + b"\x80" + b"noise" * 1000,)
+
+    assert shrink(row, lambda row: b"\x80" in row[0]) == (b"\x80",)
+
+
+def test_shrink_simplifies_bytes():
+    row = (b"xyz" * 10,)
+
+    assert shrink(row, lambda row: len(row[0]) >= 3) == (b"000",)
+
+
+def test_shrink_ints():
+    assert shrink((1000, -1000), lambda row: row[0] >= 37) == (37, 0)
+
+
+def test_shrink_budget():
+    shrinker = Shrinker(lambda row: b"\x80" in row[0], max_executions=5)
+
+    shrinker.shrink((b"noise" * 1000 + b"\x80",))
+
+    assert shrinker.executions == 5
+
+
+def test_corpus(tmp_path):
+    corpus = Corpus(str(tmp_path))
+
+    corpus.add("strcmp", (b"\x80", b""))
+    corpus.add("strcmp", (b"\x80", b""))
+    corpus.add("write", (-1, b"foo", 3))
+
+    assert corpus.load("strcmp") == [(b"\x80", b"")]
+    assert corpus.load("write") == [(-1, b"foo", 3)]
+    assert corpus.load("strlen") == []
@@ -26,7 +26,8 @@ def pointer_to_char_errcheck(
     /,
 ) -> PointerToChar:
     # breakpoint()
-    if result is None:
+    # NULL is None with c_char_p, and a falsy pointer with POINTER(c_char).
+    if result is None or (isinstance(result, ctypes._Pointer) and not result):
         errno: int = ctypes.get_errno()
         raise OSError(errno, os.strerror(errno))
     return result
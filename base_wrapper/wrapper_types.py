@@ -99,6 +99,10 @@ SizeToWrite = int
 
 CapturedOutputs = Dict[FdToWriteTo, Tuple[bytes, FdToListenOn]]
 
+# Position of the argument the memfd was passed as.
+ArgIndex = NewType("ArgIndex", int)
+MemfdOutputs = Dict[ArgIndex, memoryview]
+
 
 # To store infos about function (restype, argstypes, errcheck...).
 # TODO: 3.10 doesn't support generic namedtuples (introduced in 3.11).
@@ -115,7 +119,8 @@ class FuncInfos(NamedTuple):
 
 
 class CDLLFunc(Protocol[ResTypeTypeVar, P]):
-    restype: Type[ResTypeTypeVar]
+    # None for void functions.
+    restype: Optional[Type[ResTypeTypeVar]]
     argtypes: Tuple[Type[ArgType], ...]
     errcheck: Optional[ErrCheck]
 
@@ -0,0 +1,396 @@
+/* ************************************************************************** */
+/*                                                                            */
+/*                                                        :::      ::::::::   */
+/*   alloc_tracker.c                                    :+:      :+:    :+:   */
+/*                                                    +:+ +:+         +:+     */
+/*   By: vmonteco <vmonteco@student.42.fr>          +#+  +:+       +#+        */
+/*                                                +#+#+#+#+#+   +#+           */
+/*   Created: 2026/10/18 15:21:09 by vmonteco          #+#    #+#             */
+/*   Updated: 2026/10/18 15:21:09 by vmonteco         ###   ########.fr       */
+/*                                                                            */
+/* ************************************************************************** */
+
+/*
+** Allocation tracker, preloaded (LD_PRELOAD) in the isolated workers (cf.
+** base_wrapper/alloc_tracker.py).
+**
+** malloc, calloc, realloc and free are interposed. Every live block of the
+** process is recorded in an open addressing table (lock-free: slots are
+** claimed and released with compare-and-swap), so that a free of a block
+** that isn't live (double free, pointer that wasn't allocated) is detected.
+**
+** Only the blocks allocated from the tracked code (the executable mappings
+** of the tested library, cf. alloc_tracker_add_range) are counted in
+** g_alloc_counters, their frees are counted whoever frees them (e.g. the
+** caller of ft_strdup). Invalid frees made from the tracked code are
+** counted and not forwarded to the real free, so that they don't abort the
+** worker.
+**
+** Allocations from the tracked code can also be made to fail (with ENOMEM)
+** on purpose, cf. alloc_tracker_fail.
+*/
+
+#define _GNU_SOURCE
+#include <dlfcn.h>
+#include <errno.h>
+#include <stddef.h>
+#include <stdint.h>
+#include <string.h>
+#include <sys/mman.h>
+
+#define TABLE_BITS 22
+#define TABLE_SIZE (1UL << TABLE_BITS)
+#define MAX_PROBES 4096
+#define MAX_RANGES 16
+#define EMPTY 0
+#define TOMBSTONE 1
+#define NOT_FOUND SIZE_MAX
+#define TRACKED_BLOCK ((size_t)1 << 63)
+
+typedef struct s_alloc_counters
+{
+	uint64_t	allocations;
+	uint64_t	frees;
+	uint64_t	bytes_allocated;
+	uint64_t	bytes_freed;
+	uint64_t	invalid_frees;
+	uint64_t	untracked;
+	uint64_t	failed_allocations;
+}	t_alloc_counters;
+
+typedef struct s_slot
+{
+	uintptr_t	address;
+	size_t		size;
+}	t_slot;
+
+typedef struct s_range
+{
+	uintptr_t	start;
+	uintptr_t	end;
+}	t_range;
+
+t_alloc_counters	g_alloc_counters;
+
+static t_range		g_ranges[MAX_RANGES];
+static int			g_n_ranges;
+static t_slot		*g_table;
+
+/*
+** Injected failures: the g_fail_at-th allocation attempt of the tracked code
+** (counted in g_attempts) fails, and so do the following ones with
+** g_keep_failing. 0 disables them.
+*/
+static uint64_t		g_fail_at;
+static int			g_keep_failing;
+static uint64_t		g_attempts;
+
+static void			*(*g_malloc)(size_t);
+static void			*(*g_calloc)(size_t, size_t);
+static void			*(*g_realloc)(void *, size_t);
+static void			(*g_free)(void *);
+
+/*
+** dlsym allocates (with calloc) while the real functions are looked up.
+*/
+static char			g_bootstrap[4096] __attribute__((aligned(16)));
+static size_t		g_bootstrap_used;
+static int			g_initializing;
+
+#define ADD(counter, value) \
+	__atomic_fetch_add(&g_alloc_counters.counter, value, __ATOMIC_RELAXED)
+
+static void	init(void)
+{
+	if (g_initializing)
+		return ;
+	g_initializing = 1;
+	g_malloc = dlsym(RTLD_NEXT, "malloc");
+	g_calloc = dlsym(RTLD_NEXT, "calloc");
+	g_realloc = dlsym(RTLD_NEXT, "realloc");
+	g_free = dlsym(RTLD_NEXT, "free");
+	g_table = mmap(NULL, TABLE_SIZE * sizeof(t_slot), PROT_READ | PROT_WRITE,
+			MAP_PRIVATE | MAP_ANONYMOUS | MAP_NORESERVE, -1, 0);
+	if (g_table == MAP_FAILED)
+		g_table = NULL;
+	g_initializing = 0;
+}
+
+static void	*bootstrap_alloc(size_t size)
+{
+	void	*p;
+
+	size = (size + 15) & ~(size_t)15;
+	if (g_bootstrap_used + size > sizeof(g_bootstrap))
+		return (NULL);
+	p = g_bootstrap + g_bootstrap_used;
+	g_bootstrap_used += size;
+	return (p);
+}
+
+static int	is_bootstrap(void *p)
+{
+	return ((char *)p >= g_bootstrap
+		&& (char *)p < g_bootstrap + sizeof(g_bootstrap));
+}
+
+static int	is_tracked_caller(void *caller)
+{
+	int	i;
+
+	i = 0;
+	while (i < g_n_ranges)
+	{
+		if ((uintptr_t)caller >= g_ranges[i].start
+			&& (uintptr_t)caller < g_ranges[i].end)
+			return (1);
+		i++;
+	}
+	return (0);
+}
+
+static size_t	slot_index(uintptr_t address)
+{
+	return (((address >> 4) * 0x9E3779B97F4A7C15ULL) >> (64 - TABLE_BITS));
+}
+
+/*
+** Addresses of live blocks are unique: the first free slot is claimed.
+** The size of the blocks allocated from the tracked code is flagged with
+** TRACKED_BLOCK.
+*/
+static void	table_insert(void *p, size_t size)
+{
+	size_t		i;
+	size_t		probes;
+	uintptr_t	current;
+
+	if (!g_table)
+		return ;
+	i = slot_index((uintptr_t)p);
+	probes = 0;
+	while (probes++ < MAX_PROBES)
+	{
+		current = __atomic_load_n(&g_table[i].address, __ATOMIC_RELAXED);
+		if ((current == EMPTY || current == TOMBSTONE)
+			&& __atomic_compare_exchange_n(&g_table[i].address, &current,
+				(uintptr_t)p, 0, __ATOMIC_ACQ_REL, __ATOMIC_RELAXED))
+		{
+			g_table[i].size = size;
+			return ;
+		}
+		i = (i + 1) & (TABLE_SIZE - 1);
+	}
+	ADD(untracked, 1);
+}
+
+/*
+** Returns the (flagged) size of the released block, NOT_FOUND if it isn't
+** live.
+*/
+static size_t	table_remove(void *p)
+{
+	size_t		i;
+	size_t		probes;
+	size_t		size;
+	uintptr_t	current;
+
+	if (!g_table)
+		return (0);
+	i = slot_index((uintptr_t)p);
+	probes = 0;
+	while (probes++ < MAX_PROBES)
+	{
+		current = __atomic_load_n(&g_table[i].address, __ATOMIC_ACQUIRE);
+		if (current == EMPTY)
+			return (NOT_FOUND);
+		if (current == (uintptr_t)p)
+		{
+			size = g_table[i].size;
+			if (__atomic_compare_exchange_n(&g_table[i].address, &current,
+					TOMBSTONE, 0, __ATOMIC_ACQ_REL, __ATOMIC_RELAXED))
+				return (size);
+		}
+		i = (i + 1) & (TABLE_SIZE - 1);
+	}
+	return (NOT_FOUND);
+}
+
+static int	injected_failure(void)
+{
+	uint64_t	attempt;
+
+	if (!__atomic_load_n(&g_fail_at, __ATOMIC_RELAXED))
+		return (0);
+	attempt = __atomic_add_fetch(&g_attempts, 1, __ATOMIC_RELAXED);
+	if (attempt == g_fail_at || (g_keep_failing && attempt > g_fail_at))
+	{
+		ADD(failed_allocations, 1);
+		errno = ENOMEM;
+		return (1);
+	}
+	return (0);
+}
+
+static void	allocated(void *p, size_t size, int tracked)
+{
+	if (!p)
+		return ;
+	if (tracked)
+	{
+		table_insert(p, size | TRACKED_BLOCK);
+		ADD(allocations, 1);
+		ADD(bytes_allocated, size);
+	}
+	else
+		table_insert(p, size);
+}
+
+static void	freed(size_t size)
+{
+	if (size != NOT_FOUND && size & TRACKED_BLOCK)
+	{
+		ADD(frees, 1);
+		ADD(bytes_freed, size & ~TRACKED_BLOCK);
+	}
+}
+
+/*
+** Returns whether the block can be released.
+*/
+static int	released(void *p, void *caller)
+{
+	size_t	size;
+	int		tracked;
+
+	size = table_remove(p);
+	if (size == NOT_FOUND)
+	{
+		tracked = is_tracked_caller(caller);
+		if (tracked)
+			ADD(invalid_frees, 1);
+		return (!tracked);
+	}
+	freed(size);
+	return (1);
+}
+
+void	*malloc(size_t size)
+{
+	void	*p;
+	int		tracked;
+
+	if (!g_malloc)
+	{
+		init();
+		if (!g_malloc)
+			return (bootstrap_alloc(size));
+	}
+	tracked = is_tracked_caller(__builtin_return_address(0));
+	if (tracked && injected_failure())
+		return (NULL);
+	p = g_malloc(size);
+	allocated(p, size, tracked);
+	return (p);
+}
+
+void	*calloc(size_t n, size_t size)
+{
+	void	*p;
+	int		tracked;
+
+	if (!g_calloc)
+	{
+		init();
+		if (!g_calloc)
+			return (bootstrap_alloc(n * size));
+	}
+	tracked = is_tracked_caller(__builtin_return_address(0));
+	if (tracked && injected_failure())
+		return (NULL);
+	p = g_calloc(n, size);
+	allocated(p, n * size, tracked);
+	return (p);
+}
+
+void	free(void *p)
+{
+	if (!p || is_bootstrap(p))
+		return ;
+	if (!g_free)
+		init();
+	if (released(p, __builtin_return_address(0)))
+		g_free(p);
+}
+
+static void	*bootstrap_realloc(void *p, size_t size, int tracked)
+{
+	void	*new;
+	size_t	available;
+
+	new = g_malloc(size);
+	if (!new)
+		return (NULL);
+	available = g_bootstrap + sizeof(g_bootstrap) - (char *)p;
+	memcpy(new, p, size < available ? size : available);
+	allocated(new, size, tracked);
+	return (new);
+}
+
+void	*realloc(void *p, size_t size)
+{
+	void	*new;
+	size_t	old_size;
+	int		tracked;
+
+	tracked = is_tracked_caller(__builtin_return_address(0));
+	if (!g_realloc)
+		init();
+	if (p && is_bootstrap(p))
+		return (bootstrap_realloc(p, size, tracked));
+	if (tracked && size && injected_failure())
+		return (NULL);
+	old_size = NOT_FOUND;
+	if (p)
+	{
+		old_size = table_remove(p);
+		if (old_size == NOT_FOUND && tracked)
+		{
+			ADD(invalid_frees, 1);
+			return (NULL);
+		}
+	}
+	new = g_realloc(p, size);
+	if (!new && p && size)
+	{
+		if (old_size != NOT_FOUND)
+			table_insert(p, old_size);
+		return (NULL);
+	}
+	freed(old_size);
+	allocated(new, size, tracked);
+	return (new);
+}
+
+void	alloc_tracker_add_range(uintptr_t start, uintptr_t end)
+{
+	if (g_n_ranges < MAX_RANGES)
+	{
+		g_ranges[g_n_ranges].start = start;
+		g_ranges[g_n_ranges].end = end;
+		g_n_ranges++;
+	}
+}
+
+void	alloc_tracker_clear_ranges(void)
+{
+	g_n_ranges = 0;
+}
+
+void	alloc_tracker_fail(uint64_t nth, int keep_failing)
+{
+	__atomic_store_n(&g_fail_at, 0, __ATOMIC_RELAXED);
+	g_attempts = 0;
+	g_keep_failing = keep_failing;
+	__atomic_store_n(&g_fail_at, nth, __ATOMIC_RELAXED);
+}
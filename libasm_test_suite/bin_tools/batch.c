@@ -0,0 +1,75 @@
+/* ************************************************************************** */
+/*                                                                            */
+/*                                                        :::      ::::::::   */
+/*   batch.c                                            :+:      :+:    :+:   */
+/*                                                    +:+ +:+         +:+     */
+/*   By: vmonteco <vmonteco@student.42.fr>          +#+  +:+       +#+        */
+/*                                                +#+#+#+#+#+   +#+           */
+/*   Created: 2026/10/18 10:12:31 by vmonteco          #+#    #+#             */
+/*   Updated: 2026/10/18 10:12:31 by vmonteco         ###   ########.fr       */
+/*                                                                            */
+/* ************************************************************************** */
+
+/*
+** Batch harness: calls a function on a whole array of inputs in a tight
+** loop, so that the Python side (base_wrapper/batch.py) only crosses the
+** ctypes boundary once.
+**
+** Each argument is given as a column: the i-th value of the argument is
+** base + values[i] (pointers into a packed buffer, or plain integers with a
+** base of 0).
+**
+** Return values are written as 64 bits integers (sign extended when the
+** function returns a signed type), errno is reset before each call and
+** stored after it.
+**
+** Entry points are named batch_<arguments>_<return type> with:
+**   p: pointer, i: int, z: size_t, s: ssize_t, v: void
+*/
+
+#include <errno.h>
+#include <stddef.h>
+#include <stdint.h>
+#include <sys/types.h>
+
+typedef struct s_column
+{
+	uintptr_t		base;
+	const uintptr_t	*values;
+}	t_column;
+
+#define ARG(c, type) ((type)(columns[c].base + columns[c].values[i]))
+
+#define BATCH(name, call) \
+void	name(void *f, const t_column *columns, size_t n, \
+		int64_t *rets, int *errnos) \
+{ \
+	size_t	i; \
+\
+	i = 0; \
+	while (i < n) \
+	{ \
+		errno = 0; \
+		rets[i] = (int64_t)(call); \
+		errnos[i] = errno; \
+		i++; \
+	} \
+}
+
+typedef void		(*t_p_v)(void *);
+typedef size_t		(*t_p_z)(void *);
+typedef int			(*t_p_i)(void *);
+typedef void		*(*t_p_p)(void *);
+typedef int			(*t_pp_i)(void *, void *);
+typedef void		*(*t_pp_p)(void *, void *);
+typedef void		(*t_pp_v)(void *, void *);
+typedef ssize_t		(*t_ipz_s)(int, void *, size_t);
+
+BATCH(batch_p_v, (((t_p_v)f)(ARG(0, void *)), 0))
+BATCH(batch_p_z, ((t_p_z)f)(ARG(0, void *)))
+BATCH(batch_p_i, ((t_p_i)f)(ARG(0, void *)))
+BATCH(batch_p_p, (uintptr_t)((t_p_p)f)(ARG(0, void *)))
+BATCH(batch_pp_i, ((t_pp_i)f)(ARG(0, void *), ARG(1, void *)))
+BATCH(batch_pp_p, (uintptr_t)((t_pp_p)f)(ARG(0, void *), ARG(1, void *)))
+BATCH(batch_pp_v, (((t_pp_v)f)(ARG(0, void *), ARG(1, void *)), 0))
+BATCH(batch_ipz_s, ((t_ipz_s)f)(ARG(0, int), ARG(1, void *), ARG(2, size_t)))
@@ -0,0 +1,84 @@
+/* ************************************************************************** */
+/*                                                                            */
+/*                                                        :::      ::::::::   */
+/*   callbacks.c                                        :+:      :+:    :+:   */
+/*                                                    +:+ +:+         +:+     */
+/*   By: vmonteco <vmonteco@student.42.fr>          +#+  +:+       +#+        */
+/*                                                +#+#+#+#+#+   +#+           */
+/*   Created: 2026/10/18 14:02:47 by vmonteco          #+#    #+#             */
+/*   Updated: 2026/10/18 14:02:47 by vmonteco         ###   ########.fr       */
+/*                                                                            */
+/* ************************************************************************** */
+
+/*
+** Native callbacks for ft_list_sort and ft_list_remove_if, so that neither
+** benchmarks nor complexity measures pay for a Python callback (and the
+** GIL) on each call (cf. libasm_wrapper/callbacks.py).
+**
+** Each callback counts its calls in g_counters. The Python side points it
+** to a shared anonymous mapping, so that calls made in forked processes
+** (isolated workers) are counted too. Increments are atomic (relaxed).
+*/
+
+#include <stdint.h>
+#include <stdlib.h>
+
+typedef struct s_counters
+{
+	uint64_t	cmp_int_asc;
+	uint64_t	cmp_int_desc;
+	uint64_t	cmp_equal;
+	uint64_t	free_counting;
+	uint64_t	free_noop;
+}	t_counters;
+
+static t_counters	g_default_counters;
+t_counters			*g_counters = &g_default_counters;
+
+#define COUNT(counter) \
+	__atomic_fetch_add(&g_counters->counter, 1, __ATOMIC_RELAXED)
+
+int	cmp_int_asc(void *a, void *b)
+{
+	int	x;
+	int	y;
+
+	COUNT(cmp_int_asc);
+	x = *(int *)a;
+	y = *(int *)b;
+	return ((x > y) - (x < y));
+}
+
+int	cmp_int_desc(void *a, void *b)
+{
+	int	x;
+	int	y;
+
+	COUNT(cmp_int_desc);
+	x = *(int *)a;
+	y = *(int *)b;
+	return ((x < y) - (x > y));
+}
+
+int	cmp_equal(void *a, void *b)
+{
+	(void)a;
+	(void)b;
+	COUNT(cmp_equal);
+	return (0);
+}
+
+void	free_counting(void *data)
+{
+	COUNT(free_counting);
+	free(data);
+}
+
+/*
+** For data that isn't allocated with malloc (arena payloads for instance).
+*/
+void	free_noop(void *data)
+{
+	(void)data;
+	COUNT(free_noop);
+}
@@ -0,0 +1,96 @@
+/* ************************************************************************** */
+/*                                                                            */
+/*                                                        :::      ::::::::   */
+/*   fault_reporter.c                                   :+:      :+:    :+:   */
+/*                                                    +:+ +:+         +:+     */
+/*   By: vmonteco <vmonteco@student.42.fr>          +#+  +:+       +#+        */
+/*                                                +#+#+#+#+#+   +#+           */
+/*   Created: 2026/10/18 17:02:47 by vmonteco          #+#    #+#             */
+/*   Updated: 2026/10/18 17:02:47 by vmonteco         ###   ########.fr       */
+/*                                                                            */
+/* ************************************************************************** */
+
+/*
+** Fault reporter, installed in the isolated workers (cf.
+** base_wrapper/faults.py).
+**
+** On SIGSEGV or SIGBUS, the faulting address (si_addr), si_code and the
+** kind of access are written to a report in shared memory (signals sent by
+** kill or raise aren't faults, they aren't reported). The handler is reset
+** (SA_RESETHAND) and the signal raised again, so that the default action
+** kills the worker, as it would have without the reporter.
+*/
+
+#define _GNU_SOURCE
+#include <signal.h>
+#include <stdint.h>
+#include <string.h>
+#include <ucontext.h>
+
+#define ACCESS_UNKNOWN -1
+#define ACCESS_READ 0
+#define ACCESS_WRITE 1
+/* Page fault error code bit set by write accesses (x86). */
+#define PF_WRITE 0x2
+
+typedef struct s_fault_report
+{
+	int32_t		signo;
+	int32_t		code;
+	int32_t		access;
+	int32_t		padding;
+	uint64_t	address;
+}	t_fault_report;
+
+static t_fault_report	*g_report;
+static char				g_stack[65536];
+
+static int	access_kind(void *context)
+{
+#if defined(__x86_64__)
+	return ((((ucontext_t *)context)->uc_mcontext.gregs[REG_ERR] & PF_WRITE)
+		? ACCESS_WRITE : ACCESS_READ);
+#else
+	(void)context;
+	return (ACCESS_UNKNOWN);
+#endif
+}
+
+/*
+** The signal raised again is blocked until the handler returns.
+*/
+static void	handler(int signo, siginfo_t *info, void *context)
+{
+	if (info->si_code > 0)
+	{
+		g_report->address = (uint64_t)(uintptr_t)info->si_addr;
+		g_report->code = info->si_code;
+		g_report->access = access_kind(context);
+		g_report->signo = signo;
+	}
+	raise(signo);
+}
+
+/*
+** The handler runs on an alternate stack, in case the stack overflowed.
+*/
+int	fault_reporter_install(t_fault_report *report)
+{
+	struct sigaction	action;
+	stack_t				stack;
+
+	g_report = report;
+	stack.ss_sp = g_stack;
+	stack.ss_size = sizeof(g_stack);
+	stack.ss_flags = 0;
+	if (sigaltstack(&stack, NULL) == -1)
+		return (-1);
+	memset(&action, 0, sizeof(action));
+	action.sa_sigaction = handler;
+	action.sa_flags = SA_SIGINFO | SA_RESETHAND | SA_ONSTACK;
+	sigemptyset(&action.sa_mask);
+	if (sigaction(SIGSEGV, &action, NULL) == -1
+		|| sigaction(SIGBUS, &action, NULL) == -1)
+		return (-1);
+	return (0);
+}
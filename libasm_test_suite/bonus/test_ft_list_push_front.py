@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+from libasm_wrapper.tags import (
+    BonusFunctionTag,
+    CategoryTag,
+    ErrorTag,
+    tag_test,
+)
+from linked_lists import IntLinkedList, build_int_linked_list
+from linked_lists.linked_lists import walk
+from t_list import TList
+from typing import List
+import ctypes
+import pytest
+
+
+def push_front(libasm, values, value):
+    """
+    Pushes `value` in front of a list of `values` and returns the values of
+    the resulting list. It's run in a worker (cf. IsolatedExecutor.submit),
+    where the list lives.
+    """
+    data = ctypes.c_int(value)
+    head = build_int_linked_list(values) if values else None
+    begin = ctypes.pointer(ctypes.cast(head, ctypes.POINTER(TList)))
+    libasm.ft_list_push_front(begin, ctypes.addressof(data))
+    return [
+        node.data_value() for node in walk(begin.contents, IntLinkedList)
+    ]
+
+
+@tag_test(CategoryTag.BONUS)
+@tag_test(BonusFunctionTag.FT_LIST_PUSH_FRONT)
+@pytest.mark.parametrize(
+    "values",
+    [[], [2], [2, 3, 4]],
+    ids=["Empty list", "1-node list", "3-node list"],
+)
+def test_ft_list_push_front(libasm_isolated, values: List[int]) -> None:
+    result = libasm_isolated.submit(push_front, values, 1)
+    assert not result.crashed, result.death_repr()
+    assert result.return_value == [1, *values]
+
+
+@tag_test(CategoryTag.BONUS)
+@tag_test(BonusFunctionTag.FT_LIST_PUSH_FRONT)
+@tag_test(ErrorTag.ERRNO)
+def test_ft_list_push_front_insufficient_memory(libasm_tracked) -> None:
+    """
+    Each allocation of ft_list_push_front fails in turn: the list should be
+    left unchanged.
+    """
+    failures = list(libasm_tracked.allocation_failures(push_front, [2, 3], 1))
+    assert failures, "ft_list_push_front doesn't allocate."
+    for failure in failures:
+        assert not failure.outcome.crashed, failure.outcome.death_repr()
+        assert failure.outcome.return_value == [2, 3]
+        assert not failure.outcome.allocations.live_blocks
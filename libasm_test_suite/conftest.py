@@ -6,8 +6,10 @@ to wrap the libasm.so file to test and make it accessible to the
 different tests to run.
 """
 
+from base_wrapper import IsolatedExecutor
 from libasm_wrapper import LibASMWrapper
-from linked_lists import IntLinkedList
+from linked_lists import BaseLinkedList, IntLinkedList, linked_lists_diff
+from typing import Iterator, Optional
 import ctypes
 import pytest
 import os
@@ -24,6 +26,16 @@ def pytest_addoption(parser):
         help="Path to shared library (libasm.so) to test.",
         # type=path_checker
     )
+    parser.addoption(
+        "--call-timeout",
+        action="store",
+        type=float,
+        default=30.0,
+        help=(
+            "Default timeout (in seconds) of the calls run in isolated"
+            " workers (overridden by the call_timeout marker)."
+        ),
+    )
 
 
 # Shared libraries:
@@ -44,14 +56,83 @@ def libasm_shared_library_path(request: pytest.FixtureRequest) -> str:
 
 
 @pytest.fixture(scope="session")
-def libasm(libasm_shared_library_path: str) -> LibASMWrapper:
+def libasm(
+    request: pytest.FixtureRequest, libasm_shared_library_path: str
+) -> LibASMWrapper:
     """
     The libasm fixture gives access to the wrapped libasm.so shared
     library built from the libASM project to test.
     It uses the libasm_shared_library_path to determine where to find
     it.
     """
-    return LibASMWrapper(libasm_shared_library_path, ref=False)
+    return LibASMWrapper(
+        libasm_shared_library_path,
+        ref=False,
+        timeout=request.config.getoption("--call-timeout"),
+    )
+
+
+@pytest.fixture(scope="session")
+def libasm_executor(libasm: LibASMWrapper) -> Iterator[IsolatedExecutor]:
+    """
+    The libasm_executor fixture runs the libasm functions in pre-forked
+    worker processes, so that a crashing function doesn't kill the whole
+    test session (cf. Result.crashed). Their faults are reported (cf.
+    Result.fault), e.g. the overruns of GuardedBuffer arguments.
+    """
+    with IsolatedExecutor(libasm, report_faults=True) as executor:
+        yield executor
+
+
+@pytest.fixture(scope="session")
+def libasm_tracked(libasm: LibASMWrapper) -> Iterator[IsolatedExecutor]:
+    """
+    The libasm_tracked fixture runs the libasm functions in workers
+    tracking their allocations (cf. base_wrapper.alloc_tracker), which
+    can also be made to fail (cf. IsolatedExecutor.allocation_failures).
+    """
+    with IsolatedExecutor(
+        libasm, track_allocations=True, report_faults=True
+    ) as executor:
+        yield executor
+
+
+@pytest.fixture(scope="session")
+def libasm_traced(libasm: LibASMWrapper) -> Iterator[IsolatedExecutor]:
+    """
+    The libasm_traced fixture runs the libasm functions in workers tracing
+    the syscalls they make (cf. Result.syscalls). Tests using it are
+    skipped where tracing isn't supported (only Linux x86_64 is).
+    """
+    try:
+        executor: IsolatedExecutor = IsolatedExecutor(
+            libasm, trace_syscalls=True, report_faults=True
+        )
+    except NotImplementedError as e:
+        pytest.skip(str(e))
+    with executor:
+        yield executor
+
+
+@pytest.fixture
+def libasm_isolated(
+    request: pytest.FixtureRequest, libasm_executor: IsolatedExecutor
+) -> Iterator[IsolatedExecutor]:
+    """
+    The libasm_isolated fixture gives access to libasm_executor with the
+    timeout set by the test's call_timeout marker (if any), e.g.
+    `@pytest.mark.call_timeout(5)`.
+    """
+    marker: Optional[pytest.Mark] = request.node.get_closest_marker(
+        "call_timeout"
+    )
+    default_timeout: Optional[float] = libasm_executor.timeout
+    if marker is not None:
+        libasm_executor.timeout = marker.args[0]
+    try:
+        yield libasm_executor
+    finally:
+        libasm_executor.timeout = default_timeout
 
 
 # @pytest.fixture(scope="session")
@@ -88,13 +169,17 @@ def string_buffer_1048577() -> ctypes.Array[ctypes.c_char]:
     return ctypes.create_string_buffer(1048577)
 
 
-# strdup-specific
-@pytest.fixture
-def test_suite_base_directory() -> str:
-    return BASE_DIR
+# Bonus part:
+def pytest_assertrepr_compare(op, left, right):
+    # Only show the nodes around the first difference of large lists.
+    if (
+        op == "=="
+        and isinstance(left, BaseLinkedList)
+        and isinstance(right, BaseLinkedList)
+    ):
+        return linked_lists_diff(left, right)
 
 
-# Bonus part:
 @pytest.fixture
 def int_linked_list_1_2_3() -> IntLinkedList:
     node_3 = IntLinkedList(ctypes.c_int(3), None)
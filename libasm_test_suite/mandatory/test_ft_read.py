@@ -7,7 +7,7 @@ from libasm_wrapper.tags import (
     ErrorTag,
     tag_test,
 )
-from base_wrapper import Result
+from base_wrapper import MemfdCapture, Result, SharedBuffer
 from base_wrapper.wrapper_types import (
     FdToListenOn,
     FdToWriteTo,
@@ -27,12 +27,14 @@ import pytest
         (b"foo", 3, 3),
         (b"foo", 0, 0),
         (b" " * 1024 * 32, 1024 * 32, 1024 * 32),
+        (b" " * 1024 * 1024 * 8, 1024 * 32, 1024 * 32),
     ],
     ids=[
         "Empty str with count: 0 (exp: 0)",
         '"foo" with count: 3 (exp: 3)',
         '"foo" with count: 0 (exp: 0)',
         "1024*32-long str",
+        "1024*1024*8-long str (larger than the pipe) with count: 1024*32",
     ],
 )
 def test_ft_read(
@@ -106,3 +108,18 @@ def test_ft_read_errno_bad_address(
             os.close(fd)
 
     assert errno == 14
+
+
+@tag_test(CategoryTag.MANDATORY)
+@tag_test(MandatoryFunctionTag.FT_READ)
+def test_ft_read_single_syscall(libasm_traced) -> None:
+    """
+    ft_read should be a single read syscall, made by libasm itself rather
+    than through libc's read (an empty memfd is read).
+    """
+    result: Result = libasm_traced.ft_read(MemfdCapture(), SharedBuffer(8), 8)
+    assert not result.crashed, result.death_repr()
+    assert result.syscalls == [("read", 1)]
+    assert all(
+        syscall.in_library for syscall in result.syscall_trace or ()
+    ), "ft_read calls libc's read."
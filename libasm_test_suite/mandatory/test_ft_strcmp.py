@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 """"""
 
+from libasm_wrapper.sweep import sweep
 from libasm_wrapper.tags import MandatoryFunctionTag, CategoryTag, tag_test
+from base_wrapper import LazyBuffer
 import pytest
 
 
@@ -20,7 +22,11 @@ import pytest
         (b"\x7f", b"\x80", "neg"),
         (b"\x80", b"\x80", "zero"),
         (b"\x7f", b"\x7f", "zero"),
-        (b"foo" * 1024**3 + b"a", b"foo" * 1024**3 + b"b", "neg"),
+        (
+            LazyBuffer(b"foo", 1024**3, suffix=b"a"),
+            LazyBuffer(b"foo", 1024**3, suffix=b"b"),
+            "neg",
+        ),
     ],
     ids=[
         "comparing two empty strs",
@@ -38,8 +44,8 @@ import pytest
 )
 def test_ft_strcmp(
     libasm,
-    s1: bytes,
-    s2: bytes,
+    s1: bytes | LazyBuffer,
+    s2: bytes | LazyBuffer,
     expected_result: str,
 ):
     if expected_result == "neg":
@@ -48,3 +54,15 @@ def test_ft_strcmp(
         assert libasm.ft_strcmp(s1, s2).return_value > 0
     elif expected_result == "zero":
         assert libasm.ft_strcmp(s1, s2).return_value == 0
+
+
+@tag_test(CategoryTag.MANDATORY)
+@tag_test(MandatoryFunctionTag.FT_STRCMP)
+def test_ft_strcmp_alignments(libasm_isolated) -> None:
+    """
+    Every alignment crossed with every length up to 4096, and a few larger
+    ones (cf. libasm_wrapper.sweep).
+    """
+    pytest.importorskip("numpy")
+    report = sweep(libasm_isolated, "strcmp")
+    assert report.passed, report.details()
@@ -5,7 +5,9 @@
 # https://stackoverflow.com/a/64348247/3156085
 
 
+from libasm_wrapper.sweep import sweep
 from libasm_wrapper.tags import MandatoryFunctionTag, CategoryTag, tag_test
+from base_wrapper import GuardedBuffer, Result
 import ctypes
 import pytest
 
@@ -31,3 +33,29 @@ def test_ft_strcpy(
     dst: ctypes.c_char_p = request.getfixturevalue(buffer_fixture_name)
     libasm.ft_strcpy(dst, src)
     assert dst.value == src
+
+
+@tag_test(CategoryTag.MANDATORY)
+@tag_test(MandatoryFunctionTag.FT_STRCPY)
+@pytest.mark.parametrize("length", [*range(33), 63, 64, 65, 4095, 4096])
+def test_ft_strcpy_no_overrun(libasm_isolated, length: int) -> None:
+    """
+    Both src and dst end right before a guard page: reading past src's
+    nul byte or writing past dst's end crashes.
+    """
+    result: Result = libasm_isolated.ft_strcpy(
+        GuardedBuffer(length + 1), GuardedBuffer(b"*" * length)
+    )
+    assert not result.crashed, result.death_repr()
+
+
+@tag_test(CategoryTag.MANDATORY)
+@tag_test(MandatoryFunctionTag.FT_STRCPY)
+def test_ft_strcpy_alignments(libasm_isolated) -> None:
+    """
+    Every alignment crossed with every length up to 4096, and a few larger
+    ones (cf. libasm_wrapper.sweep).
+    """
+    pytest.importorskip("numpy")
+    report = sweep(libasm_isolated, "strcpy")
+    assert report.passed, report.details()
@@ -1,18 +1,19 @@
 #!/usr/bin/env python3
 """"""
 
+from libasm_wrapper.sweep import sweep
 from libasm_wrapper.tags import (
     MandatoryFunctionTag,
     CategoryTag,
     ErrorTag,
     tag_test,
 )
+from base_wrapper import LazyBuffer
 from base_wrapper.result import Result
 from base_wrapper.wrapper_types import PointerToChar
 import ctypes
+import errno
 import pytest
-import subprocess
-import os
 
 
 @tag_test(CategoryTag.MANDATORY)
@@ -49,10 +50,27 @@ def test_ft_strdup(libasm, libc, src: PointerToChar) -> None:
 @tag_test(CategoryTag.MANDATORY)
 @tag_test(MandatoryFunctionTag.FT_STRDUP)
 @tag_test(ErrorTag.ERRNO)
-def test_ft_strdup_insufficient_memory(test_suite_base_directory) -> None:
+def test_ft_strdup_insufficient_memory(libasm_tracked) -> None:
     """
-    Warning: this test can only confirm that ENOMEM is correctly hanlded
-    when it occurs. Not that the implementation is broken.
+    Each allocation of ft_strdup fails in turn: NULL should be returned
+    with errno set to ENOMEM.
     """
-    p = os.path.join(test_suite_base_directory, "bin_tools")
-    subprocess.run("./run_ft_strdup", check=True, cwd=p)
+    failures = list(
+        libasm_tracked.allocation_failures("ft_strdup", LazyBuffer(b"foo", 1))
+    )
+    assert failures, "ft_strdup doesn't allocate."
+    for failure in failures:
+        assert isinstance(failure.outcome, OSError), failure.outcome
+        assert failure.outcome.errno == errno.ENOMEM
+
+
+@tag_test(CategoryTag.MANDATORY)
+@tag_test(MandatoryFunctionTag.FT_STRDUP)
+def test_ft_strdup_alignments(libasm_isolated) -> None:
+    """
+    Every alignment crossed with every length up to 4096, and a few larger
+    ones (cf. libasm_wrapper.sweep).
+    """
+    pytest.importorskip("numpy")
+    report = sweep(libasm_isolated, "strdup")
+    assert report.passed, report.details()
@@ -6,19 +6,22 @@ C standard : 7.1.4.1
 https://www.open-std.org/jtc1/sc22/wg14/www/docs/n1256.pdf
 """
 
+from libasm_wrapper.sweep import sweep
 from libasm_wrapper.tags import MandatoryFunctionTag, CategoryTag, tag_test
+from base_wrapper import GuardedBuffer, LazyBuffer, Result
 import pytest
 
 
 @tag_test(CategoryTag.MANDATORY)
 @tag_test(MandatoryFunctionTag.FT_STRLEN)
+@pytest.mark.call_timeout(10)
 @pytest.mark.parametrize(
     "string,expected_length",
     [
         (b"", 0),
         (b"foo", 3),
         (b"*" * 1048576, 1048576),
-        (b"*" * (1024**3), 1024**3),
+        (LazyBuffer(b"*", 1024**3), 1024**3),
     ],
     ids=[
         "empty string",
@@ -27,5 +30,34 @@ import pytest
         f"{1024**3}-long str",
     ],
 )
-def test_ft_strlen(libasm, string: bytes, expected_length: int) -> None:
-    assert libasm.ft_strlen(string) == expected_length
+def test_ft_strlen(
+    libasm_isolated, string: bytes | LazyBuffer, expected_length: int
+) -> None:
+    result: Result = libasm_isolated.ft_strlen(string)
+    assert not (result.crashed or result.timed_out), result.death_repr()
+    assert result == expected_length
+
+
+@tag_test(CategoryTag.MANDATORY)
+@tag_test(MandatoryFunctionTag.FT_STRLEN)
+@pytest.mark.parametrize("length", [*range(33), 63, 64, 65, 4095, 4096])
+def test_ft_strlen_no_over_read(libasm_isolated, length: int) -> None:
+    """
+    The string ends right before a guard page: reading past its
+    terminating nul byte (e.g. with unaligned word-sized loads) crashes.
+    """
+    result: Result = libasm_isolated.ft_strlen(GuardedBuffer(b"*" * length))
+    assert not result.crashed, result.death_repr()
+    assert result == length
+
+
+@tag_test(CategoryTag.MANDATORY)
+@tag_test(MandatoryFunctionTag.FT_STRLEN)
+def test_ft_strlen_alignments(libasm_isolated) -> None:
+    """
+    Every alignment crossed with every length up to 4096, and a few larger
+    ones (cf. libasm_wrapper.sweep).
+    """
+    pytest.importorskip("numpy")
+    report = sweep(libasm_isolated, "strlen")
+    assert report.passed, report.details()
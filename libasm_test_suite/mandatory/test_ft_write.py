@@ -12,11 +12,12 @@ from libasm_wrapper.tags import (
     tag_test,
 )
 from base_wrapper.wrapper_types import (
+    ArgIndex,
     FdToWriteTo,
     FdToListenOn,
     FdsToListenOnInfos,
 )
-from base_wrapper import Result
+from base_wrapper import Result, LazyBuffer, MemfdCapture
 import errno
 import ctypes
 import os
@@ -34,6 +35,7 @@ import tempfile
         (b"foo", 2, 2),
         (b"foo", 3, 3),
         (b" " * 1024 * 32, 1024 * 32, 1024 * 32),
+        (b"*" * 1024 * 1024 * 8, 1024 * 1024 * 8, 1024 * 1024 * 8),
     ],
     ids=[
         "Empty str - 0 (exp: 0)",
@@ -41,6 +43,7 @@ import tempfile
         '"foo" - 2 (exp: 2)',
         '"foo" - 3 (exp: 3)',
         "1024*32-long - 1024*64 (exp: 1024*64)",
+        "1024*1024*8-long (larger than the pipe) - 1024*1024*8",
     ],
 )
 def test_ft_write(
@@ -66,6 +69,41 @@ def test_ft_write(
     assert res.return_value == expected_result
 
 
+@tag_test(CategoryTag.MANDATORY)
+@tag_test(MandatoryFunctionTag.FT_WRITE)
+@pytest.mark.parametrize(
+    "pattern,repeat",
+    [
+        (b"", 0),
+        (b"foo", 1),
+        (b"0123456789abcdef", 1024 * 1024 * 16),
+    ],
+    ids=[
+        "Empty str",
+        '"foo"',
+        "256MiB",
+    ],
+)
+def test_ft_write_memfd(libasm, pattern: bytes, repeat: int) -> None:
+    """
+    The output is captured in a memfd and checked chunk by chunk against
+    the mapping, so that large outputs are never copied.
+    """
+    buf: LazyBuffer = LazyBuffer(pattern, repeat)
+    nbytes: int = len(buf)
+
+    res: Result[ctypes.c_ssize_t] = libasm.ft_write(
+        MemfdCapture(), buf, nbytes
+    )
+
+    assert res.return_value == nbytes
+    output: memoryview = res.memfd_outputs[ArgIndex(0)]
+    assert len(output) == nbytes
+    chunk: bytes = pattern * (1024 * 64)
+    for i in range(0, nbytes, len(chunk) or 1):
+        assert output[i : i + len(chunk)] == chunk[: nbytes - i]
+
+
 @tag_test(CategoryTag.MANDATORY)
 @tag_test(MandatoryFunctionTag.FT_WRITE)
 @tag_test(ErrorTag.ERRNO)
@@ -119,3 +157,18 @@ def test_ft_write_errno_no_space_left_on_device(
             os.close(fd)
 
     assert _errno == errno.ENOSPC
+
+
+@tag_test(CategoryTag.MANDATORY)
+@tag_test(MandatoryFunctionTag.FT_WRITE)
+def test_ft_write_single_syscall(libasm_traced) -> None:
+    """
+    ft_write should be a single write syscall, made by libasm itself rather
+    than through libc's write.
+    """
+    result: Result = libasm_traced.ft_write(MemfdCapture(), b"foo", 3)
+    assert not result.crashed, result.death_repr()
+    assert result.syscalls == [("write", 1)]
+    assert all(
+        syscall.in_library for syscall in result.syscall_trace or ()
+    ), "ft_write calls libc's write."
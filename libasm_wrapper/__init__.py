@@ -1,9 +1,25 @@
 """
 libasm_wrapper provides utilities to interface a libasm shared library (.so).
+
+The wrappers (and base_wrapper) are imported on first access, so that
+importing a light submodule (e.g. tags, for the CLI) stays cheap.
 """
 
-from .libasm_wrapper import LibASMWrapper
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .libasm_wrapper import FreeFunction, LibASMWrapper, ListComparator
 
 __all__ = [
+    "FreeFunction",
     "LibASMWrapper",
+    "ListComparator",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    if name in __all__:
+        from . import libasm_wrapper
+
+        return getattr(libasm_wrapper, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
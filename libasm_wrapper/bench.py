@@ -0,0 +1,483 @@
+"""
+The bench module measures the performance of the libasm functions against
+their libc counterparts, over a range of input sizes.
+"""
+
+import ctypes
+import json
+import math
+import os
+import re
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from base_wrapper import LazyBuffer
+from base_wrapper.benchmark import BenchmarkStats, benchmark
+from base_wrapper.ptrace import InstructionCount, count_instructions
+from .libasm_wrapper import LibASMWrapper
+
+KiB: int = 1024
+MiB: int = 1024 * KiB
+GiB: int = 1024 * MiB
+
+default_sizes: Sequence[int] = (
+    0,
+    1,
+    16,
+    256,
+    4 * KiB,
+    64 * KiB,
+    1 * MiB,
+    16 * MiB,
+    256 * MiB,
+    1 * GiB,
+)
+
+# Single-stepping costs a few microseconds per instruction.
+default_instruction_sizes: Sequence[int] = tuple(
+    size for size in default_sizes if size <= 64 * KiB
+)
+
+benchmarked_functions: Sequence[str] = (
+    "strlen",
+    "strcpy",
+    "strcmp",
+    "strdup",
+    "write",
+    "read",
+)
+
+_size_units: Dict[str, int] = {
+    "": 1,
+    "b": 1,
+    "kib": KiB,
+    "mib": MiB,
+    "gib": GiB,
+}
+
+
+def parse_size(size: str) -> int:
+    """
+    parse_size converts sizes such as "1MiB" or "4096" to a number of
+    bytes.
+    """
+    match: Optional[re.Match] = re.fullmatch(
+        r"\s*(\d+)\s*([kmg]ib|b)?\s*", size, re.IGNORECASE
+    )
+    if match is None:
+        raise ValueError(f"Invalid size: {size!r}.")
+    return int(match[1]) * _size_units[(match[2] or "").lower()]
+
+
+def format_size(size: int) -> str:
+    for unit, multiple in (("GiB", GiB), ("MiB", MiB), ("KiB", KiB)):
+        if size >= multiple and not size % multiple:
+            return f"{size // multiple}{unit}"
+    return f"{size}B"
+
+
+###############################################################################
+#                                  Inputs                                     #
+###############################################################################
+
+# A case is the arguments to pass and a callable cleaning them up.
+Case = Tuple[Tuple[Any, ...], Callable[[], None]]
+CaseBuilder = Callable[[int], Case]
+
+_libc = ctypes.CDLL("libc.so.6", use_errno=True)
+_libc.free.argtypes = (ctypes.c_void_p,)
+_libc.free.restype = None
+
+
+def _buffers(*lazy_buffers: LazyBuffer) -> Case:
+    """
+    Materializes the buffers (large ones are cheap, cf. LazyBuffer).
+    """
+
+    def release() -> None:
+        for lazy_buffer in lazy_buffers:
+            lazy_buffer.release()
+
+    return (
+        tuple(lazy_buffer.materialize() for lazy_buffer in lazy_buffers),
+        release,
+    )
+
+
+def _strcpy_case(size: int) -> Case:
+    (src, dst), release = _buffers(
+        LazyBuffer(b"*", size), LazyBuffer(b"-", size)
+    )
+    return (dst, src), release
+
+
+def _fd_case(path: str, flags: int) -> CaseBuilder:
+    def build(size: int) -> Case:
+        fd: int = os.open(path, flags)
+        (buf,), release = _buffers(LazyBuffer(b"*", size))
+
+        def cleanup() -> None:
+            release()
+            os.close(fd)
+
+        return (fd, buf, size), cleanup
+
+    return build
+
+
+case_builders: Dict[str, CaseBuilder] = {
+    "strlen": lambda size: _buffers(LazyBuffer(b"*", size)),
+    "strcpy": _strcpy_case,
+    # Identical strings: both have to be read entirely.
+    "strcmp": lambda size: _buffers(
+        LazyBuffer(b"*", size), LazyBuffer(b"*", size)
+    ),
+    "strdup": lambda size: _buffers(LazyBuffer(b"*", size)),
+    "write": _fd_case("/dev/null", os.O_WRONLY),
+    "read": _fd_case("/dev/zero", os.O_RDONLY),
+}
+
+# Functions returning memory to free after each call.
+_returns_allocated_memory: Sequence[str] = ("strdup",)
+
+
+###############################################################################
+#                                 Measures                                    #
+###############################################################################
+
+
+class BenchmarkEntry(NamedTuple):
+    function: str
+    size: int
+    stats: BenchmarkStats
+    ref_stats: BenchmarkStats
+
+    @property
+    def ns_per_call(self) -> float:
+        return self.stats.median
+
+    @property
+    def ref_ns_per_call(self) -> float:
+        return self.ref_stats.median
+
+    @property
+    def bytes_per_ns(self) -> float:
+        return self.size / self.ns_per_call if self.ns_per_call else math.inf
+
+    @property
+    def ref_bytes_per_ns(self) -> float:
+        if not self.ref_ns_per_call:
+            return math.inf
+        return self.size / self.ref_ns_per_call
+
+    @property
+    def ratio(self) -> float:
+        """
+        How many times slower than the reference the function is.
+        """
+        if not self.ref_ns_per_call:
+            return math.inf if self.ns_per_call else 1.0
+        return self.ns_per_call / self.ref_ns_per_call
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(
+            function=self.function,
+            size=self.size,
+            stats=self.stats._asdict(),
+            ref_stats=self.ref_stats._asdict(),
+            bytes_per_ns=self.bytes_per_ns,
+            ref_bytes_per_ns=self.ref_bytes_per_ns,
+            ratio=self.ratio,
+        )
+
+
+def _free(pointer: Any) -> None:
+    _libc.free(ctypes.cast(pointer, ctypes.c_void_p))
+
+
+def result_cleanup(function: str) -> Optional[Callable[[Any], None]]:
+    """
+    Function releasing what a call to `function` (without its "ft_"
+    prefix) returns, to pass as the cleanup of a benchmark, or None if
+    there's nothing to release.
+    """
+    return _free if function in _returns_allocated_memory else None
+
+
+def bench_function(
+    libasm: LibASMWrapper,
+    libasm_ref: LibASMWrapper,
+    function: str,
+    size: int,
+    **kwargs: Any,
+) -> BenchmarkEntry:
+    """
+    bench_function measures `function` (without its "ft_" prefix) on an
+    input of `size` bytes for both wrappers.
+
+    kwargs are passed to base_wrapper.benchmark.benchmark.
+    """
+    cleanup: Optional[Callable[[Any], None]] = result_cleanup(function)
+    functions: Tuple[Callable[..., Any], ...] = (
+        getattr(libasm, f"raw_{libasm.non_ref_prefix}{function}"),
+        getattr(libasm_ref, f"raw_{function}"),
+    )
+
+    def measure(f: Callable[..., Any], **options: Any) -> BenchmarkStats:
+        args, release = case_builders[function](size)
+        try:
+            return benchmark(f, *args, cleanup=cleanup, **options)
+        finally:
+            release()
+
+    measures: List[BenchmarkStats] = [measure(f, **kwargs) for f in functions]
+    # Raw durations (when the overhead isn't well below one of them) are
+    # only compared with raw durations.
+    if len({m.overhead_subtracted for m in measures}) > 1:
+        measures = [
+            measure(f, **{**kwargs, "subtract_overhead": False})
+            if m.overhead_subtracted
+            else m
+            for f, m in zip(functions, measures)
+        ]
+    return BenchmarkEntry(function, size, *measures)
+
+
+def bench(
+    libasm: LibASMWrapper,
+    libasm_ref: LibASMWrapper,
+    functions: Iterable[str] = benchmarked_functions,
+    sizes: Iterable[int] = default_sizes,
+    **kwargs: Any,
+) -> List[BenchmarkEntry]:
+    return [
+        bench_function(libasm, libasm_ref, function, size, **kwargs)
+        for function in functions
+        for size in sizes
+    ]
+
+
+class InstructionEntry(NamedTuple):
+    """
+    Instructions retired inside the library by a call (cf.
+    base_wrapper.ptrace). Unlike durations, these are exact and don't
+    depend on the machine.
+    """
+
+    function: str
+    size: int
+    instructions: InstructionCount
+    ref_instructions: InstructionCount
+
+    @property
+    def instructions_per_byte(self) -> float:
+        if not self.size:
+            return math.inf
+        return self.instructions.in_library / self.size
+
+    @property
+    def ref_instructions_per_byte(self) -> float:
+        if not self.size:
+            return math.inf
+        return self.ref_instructions.in_library / self.size
+
+    @property
+    def ratio(self) -> float:
+        """
+        How many times more instructions than the reference the function
+        retires.
+        """
+        if not self.ref_instructions.in_library:
+            return math.inf if self.instructions.in_library else 1.0
+        return self.instructions.in_library / self.ref_instructions.in_library
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(
+            function=self.function,
+            size=self.size,
+            instructions=self.instructions._asdict(),
+            ref_instructions=self.ref_instructions._asdict(),
+            ratio=self.ratio,
+        )
+
+
+def count_function(
+    libasm: LibASMWrapper,
+    libasm_ref: LibASMWrapper,
+    function: str,
+    size: int,
+) -> InstructionEntry:
+    """
+    count_function counts the instructions `function` (without its "ft_"
+    prefix) retires on an input of `size` bytes for both wrappers.
+    """
+    counts: List[InstructionCount] = []
+    for f in (
+        getattr(libasm, f"raw_{libasm.non_ref_prefix}{function}"),
+        getattr(libasm_ref, f"raw_{function}"),
+    ):
+        args, release = case_builders[function](size)
+        try:
+            counts.append(count_instructions(f, *args))
+        finally:
+            release()
+    return InstructionEntry(function, size, *counts)
+
+
+def count(
+    libasm: LibASMWrapper,
+    libasm_ref: LibASMWrapper,
+    functions: Iterable[str] = benchmarked_functions,
+    sizes: Iterable[int] = default_instruction_sizes,
+) -> List[InstructionEntry]:
+    return [
+        count_function(libasm, libasm_ref, function, size)
+        for function in functions
+        for size in sizes
+    ]
+
+
+###############################################################################
+#                                 Reporting                                   #
+###############################################################################
+
+Entry = Union[BenchmarkEntry, InstructionEntry]
+
+
+class Threshold(NamedTuple):
+    """
+    A Threshold requires `function` to be at most `max_ratio` times slower
+    than the reference at `size` (or to retire at most `max_ratio` times
+    more instructions, when instructions are counted).
+    """
+
+    function: str
+    size: int
+    max_ratio: float
+
+    @classmethod
+    def parse(cls, threshold: str) -> "Threshold":
+        """
+        Parses thresholds written as "ft_strlen:1MiB:4".
+        """
+        try:
+            function, size, max_ratio = threshold.split(":")
+            return cls(
+                function.removeprefix(LibASMWrapper.non_ref_prefix),
+                parse_size(size),
+                float(max_ratio),
+            )
+        except ValueError:
+            raise ValueError(
+                f"Invalid threshold {threshold!r} (expected e.g."
+                ' "ft_strlen:1MiB:4").'
+            )
+
+    def check(self, entries: Iterable[Entry]) -> Optional[str]:
+        """
+        Returns an error message if the threshold isn't met.
+        """
+        for entry in entries:
+            if (entry.function, entry.size) == (self.function, self.size):
+                if entry.ratio > self.max_ratio:
+                    return (
+                        f"{LibASMWrapper.non_ref_prefix}{self.function}"
+                        f" {_describe_ratio(entry, entry.ratio)} libc at"
+                        f" {format_size(self.size)} (max:"
+                        f" {self.max_ratio}x)."
+                    )
+                return None
+        return f"No measure for {self.function} at {format_size(self.size)}."
+
+
+def _describe_ratio(entry: Entry, ratio: float) -> str:
+    if isinstance(entry, InstructionEntry):
+        return f"retires {ratio:.2f}x more instructions than"
+    return f"is {ratio:.2f}x slower than"
+
+
+def to_json(entries: Iterable[Entry]) -> str:
+    return json.dumps([entry.as_dict() for entry in entries], indent=2)
+
+
+def _format_table(rows: List[Tuple[str, ...]]) -> str:
+    widths: List[int] = [
+        max(len(row[i]) for row in rows) for i in range(len(rows[0]))
+    ]
+    return "\n".join(
+        "  ".join(
+            cell.ljust(width) if i == 0 else cell.rjust(width)
+            for i, (cell, width) in enumerate(zip(row, widths))
+        )
+        for row in rows
+    )
+
+
+def to_table(entries: Iterable[BenchmarkEntry]) -> str:
+    header: Tuple[str, ...] = (
+        "function",
+        "size",
+        "ns/call",
+        "±",
+        "p95",
+        "libc ns/call",
+        "±",
+        "B/ns",
+        "libc B/ns",
+        "ratio",
+    )
+    rows: List[Tuple[str, ...]] = [header] + [
+        (
+            LibASMWrapper.non_ref_prefix + entry.function,
+            format_size(entry.size),
+            f"{entry.ns_per_call:.1f}",
+            f"{entry.stats.ci_half_width:.1f}",
+            f"{entry.stats.p95:.1f}",
+            f"{entry.ref_ns_per_call:.1f}",
+            f"{entry.ref_stats.ci_half_width:.1f}",
+            f"{entry.bytes_per_ns:.3f}",
+            f"{entry.ref_bytes_per_ns:.3f}",
+            f"{entry.ratio:.2f}",
+        )
+        for entry in entries
+    ]
+    return _format_table(rows)
+
+
+def instructions_to_table(entries: Iterable[InstructionEntry]) -> str:
+    header: Tuple[str, ...] = (
+        "function",
+        "size",
+        "instructions",
+        "total",
+        "libc instructions",
+        "total",
+        "instr/B",
+        "libc instr/B",
+        "ratio",
+    )
+    rows: List[Tuple[str, ...]] = [header] + [
+        (
+            LibASMWrapper.non_ref_prefix + entry.function,
+            format_size(entry.size),
+            str(entry.instructions.in_library),
+            str(entry.instructions.total),
+            str(entry.ref_instructions.in_library),
+            str(entry.ref_instructions.total),
+            f"{entry.instructions_per_byte:.3f}",
+            f"{entry.ref_instructions_per_byte:.3f}",
+            f"{entry.ratio:.2f}",
+        )
+        for entry in entries
+    ]
+    return _format_table(rows)
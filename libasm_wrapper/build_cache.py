@@ -0,0 +1,142 @@
+"""
+The build_cache module stores built shared libraries (libasm.so and the
+shims of the test suite) outside of the student repositories, keyed by a
+hash of what they are built from: a re-run on unchanged sources skips
+compilation completely, whatever the files' modification times (which a
+git checkout or a copy changes).
+"""
+
+import filecmp
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import Iterable, Iterator, Optional
+
+# Bump to invalidate the cached artifacts (e.g. when a build command
+# changes).
+_version: str = "1"
+
+# Files of a libasm repository that the build depends on.
+source_suffixes: frozenset = frozenset(
+    {".s", ".S", ".asm", ".inc", ".h", ".c", ".mk"}
+)
+_source_names: frozenset = frozenset({"Makefile", "makefile", "GNUmakefile"})
+
+
+def default_cache_dir() -> str:
+    return os.path.join(
+        os.environ.get("XDG_CACHE_HOME")
+        or os.path.join(os.path.expanduser("~"), ".cache"),
+        "ft_pytester_libasm",
+    )
+
+
+def is_source(name: str) -> bool:
+    """
+    Whether the file `name` is one the build depends on.
+    """
+    return (
+        name in _source_names or os.path.splitext(name)[1] in source_suffixes
+    )
+
+
+def _source_files(repo_path: str) -> Iterator[str]:
+    """
+    Paths (relative to the repository) of its sources, in a stable order.
+    Hidden directories (.git...) are skipped.
+    """
+    for directory, subdirectories, files in os.walk(repo_path):
+        subdirectories[:] = sorted(
+            d for d in subdirectories if not d.startswith(".")
+        )
+        for name in sorted(files):
+            if is_source(name):
+                yield os.path.relpath(os.path.join(directory, name), repo_path)
+
+
+def digest(parts: Iterable[bytes]) -> str:
+    h = hashlib.sha256(_version.encode())
+    for part in parts:
+        # Length-prefixed, so that parts can't be shifted between each
+        # other.
+        h.update(len(part).to_bytes(8, "little"))
+        h.update(part)
+    return h.hexdigest()
+
+
+def _file_parts(root: str, paths: Iterable[str]) -> Iterator[bytes]:
+    for path in paths:
+        yield path.encode()
+        with open(os.path.join(root, path), "rb") as f:
+            yield f.read()
+
+
+def repo_key(repo_path: str, bonus: bool = False) -> str:
+    """
+    Key of the shared library built from a libasm repository: its sources,
+    Makefile and headers, and whether the bonus part is built.
+    """
+    return digest(
+        [
+            b"bonus" if bonus else b"mandatory",
+            *_file_parts(repo_path, _source_files(repo_path)),
+        ]
+    )
+
+
+def shim_key(src_path: str, command: str) -> str:
+    """
+    Key of a shim built from the single source file `src_path` with
+    `command`.
+    """
+    with open(src_path, "rb") as f:
+        return digest([command.encode(), f.read()])
+
+
+def _install(src: str, dst: str) -> None:
+    """
+    Copies `src` to `dst` atomically: processes that loaded the previous
+    `dst` keep their (unmodified) mapping.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(dst)),
+        prefix=f".{os.path.basename(dst)}.",
+    )
+    os.close(fd)
+    try:
+        shutil.copyfile(src, tmp_path)
+        os.chmod(tmp_path, 0o755)
+        os.replace(tmp_path, dst)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class BuildCache:
+    """
+    BuildCache stores built files under `directory`/<key>/<name>.
+    """
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self.directory: str = directory or default_cache_dir()
+
+    def path(self, key: str, name: str) -> str:
+        return os.path.join(self.directory, key[:2], key, name)
+
+    def get(self, key: str, name: str, dst: str) -> bool:
+        """
+        Installs the cached file at `dst` (unless it's already there),
+        returns False if it isn't cached.
+        """
+        path: str = self.path(key, name)
+        if not os.path.isfile(path):
+            return False
+        if not (os.path.isfile(dst) and filecmp.cmp(path, dst, shallow=False)):
+            _install(path, dst)
+        return True
+
+    def put(self, key: str, name: str, src: str) -> None:
+        path: str = self.path(key, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _install(src, path)
@@ -0,0 +1,103 @@
+"""
+The callbacks module exposes the native callbacks of
+libasm_test_suite/bin_tools/callbacks.c (compiled by the build task) as
+ready-made function pointers for ft_list_sort and ft_list_remove_if.
+
+Unlike Python callbacks, they don't re-enter the interpreter: benchmarks
+measure the sort rather than Python. Their calls are counted in a shared
+anonymous mapping, which processes forked afterwards (e.g. the workers of
+an IsolatedExecutor) share.
+"""
+
+import ctypes
+import functools
+import mmap
+import os
+from typing import Any, Dict, Sequence
+
+from .libasm_wrapper import FreeFunction, ListComparator
+
+callbacks_path: str = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "libasm_test_suite",
+    "bin_tools",
+    "callbacks.so",
+)
+
+comparators: Sequence[str] = ("cmp_int_asc", "cmp_int_desc", "cmp_equal")
+free_functions: Sequence[str] = ("free_counting", "free_noop")
+
+
+class Counters(ctypes.Structure):
+    """
+    t_counters (cf. callbacks.c): the number of calls of each callback.
+    """
+
+    _fields_ = [
+        (name, ctypes.c_uint64) for name in (*comparators, *free_functions)
+    ]
+
+
+class NativeCallbacks:
+    """
+    NativeCallbacks loads the callbacks library at `path` and points its
+    counters to shared memory.
+
+    Attributes are named after the callbacks:
+     - cmp_int_asc, cmp_int_desc: compare the ints pointed to,
+     - cmp_equal: considers everything equal,
+     - free_counting: frees its argument,
+     - free_noop: doesn't (for data not allocated with malloc).
+    """
+
+    cmp_int_asc: Any
+    cmp_int_desc: Any
+    cmp_equal: Any
+    free_counting: Any
+    free_noop: Any
+
+    def __init__(self, path: str = callbacks_path) -> None:
+        if not os.path.isfile(path):
+            raise FileNotFoundError(
+                f"{path} not found (it's compiled by the build task)."
+            )
+        self.library: ctypes.CDLL = ctypes.CDLL(os.path.abspath(path))
+        self._mmap: mmap.mmap = mmap.mmap(-1, ctypes.sizeof(Counters))
+        self.counters: Counters = Counters.from_buffer(self._mmap)
+        ctypes.c_void_p.in_dll(self.library, "g_counters").value = (
+            ctypes.addressof(self.counters)
+        )
+        for name in comparators:
+            setattr(self, name, self._function_pointer(ListComparator, name))
+        for name in free_functions:
+            setattr(self, name, self._function_pointer(FreeFunction, name))
+
+    def _function_pointer(self, prototype: Any, name: str) -> Any:
+        return prototype(
+            ctypes.cast(getattr(self.library, name), ctypes.c_void_p).value
+        )
+
+    def count(self, name: str) -> int:
+        """
+        Number of calls of callback `name` since the last reset().
+        """
+        return getattr(self.counters, name)
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            name: self.count(name) for name in (*comparators, *free_functions)
+        }
+
+    def reset(self) -> None:
+        ctypes.memset(
+            ctypes.addressof(self.counters), 0, ctypes.sizeof(Counters)
+        )
+
+
+@functools.cache
+def native_callbacks(path: str = callbacks_path) -> NativeCallbacks:
+    """
+    Shared NativeCallbacks instance (the counters pointer is global to the
+    library, a single instance per library is meaningful).
+    """
+    return NativeCallbacks(path)
@@ -0,0 +1,526 @@
+"""
+The fuzz module compares the libasm functions with their reference
+implementations (libc, or a Python oracle for ft_atoi_base) on inputs
+generated with a seeded PRNG.
+
+Inputs are run by batches through the batch harness (cf.
+base_wrapper.batch), so that millions of short inputs can be tried, in
+isolated workers (cf. base_wrapper.executor) so that crashes are reported
+as divergences.
+
+Divergences are minimized (cf. base_wrapper.shrink) and stored in a corpus
+(cf. base_wrapper.corpus) replayed by the next runs.
+"""
+
+import array
+import ctypes
+import os
+import random
+import re
+import string
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
+
+from base_wrapper import IsolatedExecutor, Result
+from base_wrapper.alloc_tracker import Allocations
+from base_wrapper.corpus import Corpus
+from base_wrapper.shrink import Row, shrink
+from .libasm_wrapper import LibASMWrapper
+
+Columns = Sequence[Sequence[Any]]
+
+# Symbols looked up in the global scope: free is the preloaded one when
+# allocations are tracked (cf. base_wrapper.alloc_tracker).
+_libc = ctypes.CDLL(None, use_errno=True)
+_libc.free.argtypes = (ctypes.c_void_p,)
+_libc.free.restype = None
+
+_duration_units: Dict[str, float] = {
+    "": 1,
+    "s": 1,
+    "m": 60,
+    "h": 3600,
+}
+
+
+def parse_duration(duration: str) -> float:
+    """
+    parse_duration converts durations such as "60s", "2m" or "90" to a
+    number of seconds.
+    """
+    match: Optional[re.Match] = re.fullmatch(
+        r"\s*(\d+(?:\.\d+)?)\s*([smh])?\s*", duration, re.IGNORECASE
+    )
+    if match is None:
+        raise ValueError(f"Invalid duration: {duration!r}.")
+    return float(match[1]) * _duration_units[(match[2] or "").lower()]
+
+
+###############################################################################
+#                                Generators                                   #
+###############################################################################
+
+# Bytes at the signedness and ASCII boundaries.
+edge_bytes: bytes = bytes((0x01, 0x7E, 0x7F, 0x80, 0x81, 0xFE, 0xFF))
+printable_bytes: bytes = string.printable.encode()
+non_nul_bytes: bytes = bytes(range(1, 256))
+# isspace(3)
+_whitespaces: bytes = b" \t\n\v\f\r"
+
+
+def _translation_table(alphabet: bytes) -> bytes:
+    """
+    Table mapping random bytes to bytes of `alphabet` (cf. bytes.translate),
+    so that strings are generated without a Python level loop.
+    """
+    return bytes(alphabet[i % len(alphabet)] for i in range(256))
+
+
+_tables: Sequence[bytes] = tuple(
+    _translation_table(alphabet)
+    for alphabet in (
+        edge_bytes,
+        printable_bytes,
+        non_nul_bytes,
+        # Mostly edge bytes, in the middle of printable ones.
+        edge_bytes * 16 + printable_bytes,
+    )
+)
+
+
+def random_length(rng: random.Random, max_length: int = 4096) -> int:
+    """
+    Mostly short lengths, sometimes longer ones.
+    """
+    r: float = rng.random()
+    if r < 0.7:
+        return rng.randrange(0, 17)
+    if r < 0.95:
+        return rng.randrange(0, 257)
+    return rng.randrange(0, max_length + 1)
+
+
+def random_string(rng: random.Random, max_length: int = 4096) -> bytes:
+    """
+    Nul free string mixing edge bytes, printable and arbitrary bytes.
+    """
+    return rng.randbytes(random_length(rng, max_length)).translate(
+        rng.choice(_tables)
+    )
+
+
+def random_string_pair(rng: random.Random) -> Row:
+    """
+    Pairs of strings that are equal, share a prefix, differ by a single
+    (edge) byte, or are unrelated.
+    """
+    s1: bytes = random_string(rng)
+    r: float = rng.random()
+    if r < 0.2:
+        return s1, s1
+    if r < 0.6:
+        prefix: bytes = s1[: rng.randint(0, len(s1))]
+        return s1, prefix + random_string(rng)
+    if r < 0.8 and s1:
+        i: int = rng.randrange(len(s1))
+        return s1, s1[:i] + bytes((rng.choice(edge_bytes),)) + s1[i + 1 :]
+    return s1, random_string(rng)
+
+
+def random_base(rng: random.Random) -> bytes:
+    """
+    Mostly valid bases, sometimes invalid ones (too short, duplicated
+    characters, signs or whitespaces).
+    """
+    digits: bytes = string.digits.encode() + string.ascii_letters.encode()
+    r: float = rng.random()
+    if r < 0.1:
+        return bytes(rng.choices(digits, k=rng.randint(0, 1)))
+    if r < 0.2:
+        base: bytes = bytes(rng.sample(digits, rng.randint(2, 16)))
+        return base + base[rng.randrange(len(base)) :][:1]
+    if r < 0.3:
+        base = bytes(rng.sample(digits, rng.randint(2, 16)))
+        i: int = rng.randrange(len(base))
+        forbidden: int = rng.choice(b"+-" + _whitespaces)
+        return base[:i] + bytes((forbidden,)) + base[i:]
+    return bytes(rng.sample(digits, rng.randint(2, len(digits))))
+
+
+def random_atoi_base_input(rng: random.Random) -> Row:
+    base: bytes = random_base(rng)
+    whitespaces: bytes = bytes(
+        rng.choices(_whitespaces, k=rng.randrange(0, 4))
+    )
+    signs: bytes = bytes(rng.choices(b"+-", k=rng.randrange(0, 4)))
+    number: bytes = bytes(rng.choices(base or b"0", k=rng.randrange(0, 12)))
+    garbage: bytes = random_string(rng, 16) if rng.random() < 0.3 else b""
+    return whitespaces + signs + number + garbage, base
+
+
+###############################################################################
+#                                 Oracles                                     #
+###############################################################################
+
+
+def atoi_base(s: bytes, base: bytes) -> Optional[int]:
+    """
+    Python ft_atoi_base, as specified by the subject. Returns None when the
+    result doesn't fit in an int (undefined behavior).
+    """
+    if (
+        len(base) < 2
+        or len(set(base)) != len(base)
+        or any(c in base for c in b"+-" + _whitespaces)
+    ):
+        return 0
+    i: int = 0
+    while i < len(s) and s[i] in _whitespaces:
+        i += 1
+    negative: bool = False
+    while i < len(s) and s[i] in b"+-":
+        negative ^= s[i] == ord("-")
+        i += 1
+    value: int = 0
+    while i < len(s) and s[i] in base:
+        value = value * len(base) + base.index(s[i])
+        i += 1
+    if negative:
+        value = -value
+    if not -(2**31) <= value < 2**31:
+        return None
+    return value
+
+
+###############################################################################
+#                                 Targets                                     #
+###############################################################################
+
+
+def _sign(value: int) -> int:
+    return (value > 0) - (value < 0)
+
+
+def _strings(addresses: Sequence[int]) -> List[Optional[bytes]]:
+    """
+    Reads then frees returned (allocated) strings.
+    """
+    strings: List[Optional[bytes]] = []
+    for address in addresses:
+        if not address:
+            strings.append(None)
+            continue
+        strings.append(ctypes.string_at(address))
+        _libc.free(address)
+    return strings
+
+
+def _run_strcpy(batch_function: Callable[..., Any], columns: Columns) -> Any:
+    (sources,) = columns
+    destinations: List[ctypes.Array[ctypes.c_char]] = [
+        ctypes.create_string_buffer(len(source) + 1) for source in sources
+    ]
+    addresses: List[int] = [ctypes.addressof(d) for d in destinations]
+    return_values: Sequence[int] = batch_function(
+        array.array("Q", addresses), sources
+    ).return_values
+    return [
+        (returned == address, destination.value)
+        for returned, address, destination in zip(
+            return_values, addresses, destinations
+        )
+    ]
+
+
+class FuzzTarget(NamedTuple):
+    """
+    How to generate inputs for a function (without its "ft_" prefix), run
+    them through the batch harness, and normalize the results so that they
+    can be compared with the reference ones.
+
+    `oracle`, if set, computes the expected results instead of the
+    reference library.
+    """
+
+    generate: Callable[[random.Random], Row]
+    run: Callable[[Callable[..., Any], Columns], Sequence[Any]]
+    oracle: Optional[Callable[[Columns], Sequence[Any]]] = None
+
+
+targets: Dict[str, FuzzTarget] = {
+    "strlen": FuzzTarget(
+        generate=lambda rng: (random_string(rng),),
+        run=lambda f, columns: f(*columns).return_values,
+    ),
+    "strcmp": FuzzTarget(
+        generate=random_string_pair,
+        # Only the sign of the difference is specified.
+        run=lambda f, columns: [_sign(v) for v in f(*columns).return_values],
+    ),
+    "strcpy": FuzzTarget(
+        generate=lambda rng: (random_string(rng),),
+        run=_run_strcpy,
+    ),
+    "strdup": FuzzTarget(
+        generate=lambda rng: (random_string(rng),),
+        run=lambda f, columns: _strings(f(*columns).return_values),
+    ),
+    "atoi_base": FuzzTarget(
+        generate=random_atoi_base_input,
+        run=lambda f, columns: f(*columns).return_values,
+        oracle=lambda columns: [atoi_base(*row) for row in zip(*columns)],
+    ),
+}
+
+fuzzed_functions: Sequence[str] = tuple(targets)
+
+
+###############################################################################
+#                                  Engine                                     #
+###############################################################################
+
+
+def _truncate(value: Any, max_length: int = 64) -> str:
+    r: str = repr(value)
+    if len(r) <= max_length:
+        return r
+    return f"{r[:max_length]}... ({len(value)} bytes)"
+
+
+class Crash(NamedTuple):
+    """
+    Outcome of a call that killed its worker (or timed out).
+    """
+
+    reason: str
+
+    def __repr__(self) -> str:
+        return f"<crash: {self.reason}>"
+
+
+class Divergence(NamedTuple):
+    function: str
+    args: Row
+    value: Any
+    expected: Any
+
+    def __str__(self) -> str:
+        return (
+            f"{LibASMWrapper.non_ref_prefix}{self.function}"
+            f"({', '.join(_truncate(arg) for arg in self.args)}):"
+            f" {self.value!r} (expected: {self.expected!r})"
+        )
+
+
+class FuzzReport(NamedTuple):
+    function: str
+    seed: int
+    executions: int
+    duration: float
+    divergences: List[Divergence]
+    # Number of corpus cases replayed before generating new inputs.
+    replayed: int = 0
+    # Allocations of the fuzzed function (when tracked).
+    allocations: Optional[Allocations] = None
+
+    @property
+    def executions_per_second(self) -> float:
+        return self.executions / self.duration if self.duration else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{LibASMWrapper.non_ref_prefix}{self.function}:"
+            f" {self.executions} executions in {self.duration:.1f}s"
+            f" ({self.executions_per_second:.0f} exec/s, {self.replayed}"
+            f" corpus cases replayed), {len(self.divergences)} divergences"
+            f" (seed: {self.seed})."
+        ) + (
+            ""
+            if self.allocations is None
+            else f" {self.allocations}, {self.allocations.live_blocks} live"
+            " blocks."
+        )
+
+
+def _run_batch(
+    wrapper: LibASMWrapper, function: str, columns: Columns
+) -> List[Any]:
+    """
+    Runs a batch in an isolated worker (cf. IsolatedExecutor.submit) and
+    returns the normalized results.
+    """
+    return list(
+        targets[function].run(
+            getattr(wrapper.batch, f"{wrapper.non_ref_prefix}{function}"),
+            columns,
+        )
+    )
+
+
+class Fuzzer:
+    """
+    Fuzzer runs inputs of `function` (without its "ft_" prefix) through the
+    crash-safe path (batches are run in the isolated workers of
+    `executor`), and compares the results with the reference ones.
+    """
+
+    def __init__(
+        self,
+        libasm_ref: LibASMWrapper,
+        function: str,
+        executor: IsolatedExecutor,
+    ) -> None:
+        self.function = function
+        self.target: FuzzTarget = targets[function]
+        self.executor = executor
+        self.ref: Optional[Callable[..., Any]] = (
+            None if self.target.oracle else getattr(libasm_ref.batch, function)
+        )
+        # Sum of the allocations of the batches run (when tracked).
+        self.allocations: Optional[Allocations] = None
+
+    def run(self, rows: Sequence[Row]) -> List[Any]:
+        """
+        Returns the normalized results of the rows. When the batch crashes,
+        it's split in halves until the crashing rows are found.
+        """
+        if not rows:
+            return []
+        result: Result = self.executor.submit(
+            _run_batch, self.function, list(zip(*rows))
+        )
+        if result.allocations is not None:
+            self.allocations = result.allocations + (
+                self.allocations or Allocations()
+            )
+        if not (result.crashed or result.timed_out):
+            return result.return_value
+        if len(rows) == 1:
+            return [Crash(result.death_repr())]
+        middle: int = len(rows) // 2
+        return self.run(rows[:middle]) + self.run(rows[middle:])
+
+    def expected(self, rows: Sequence[Row]) -> Sequence[Any]:
+        columns: Columns = list(zip(*rows))
+        if self.target.oracle is not None:
+            return self.target.oracle(columns)
+        return self.target.run(self.ref, columns)  # type: ignore
+
+    def divergences(self, rows: Sequence[Row]) -> List[Divergence]:
+        return [
+            Divergence(self.function, row, value, expected)
+            for row, value, expected in zip(
+                rows, self.run(rows), self.expected(rows)
+            )
+            # None: undefined behavior.
+            if expected is not None and value != expected
+        ]
+
+    def diverges(self, row: Row) -> bool:
+        return bool(self.divergences([row]))
+
+    def shrink(
+        self, divergence: Divergence, max_executions: int = 1000
+    ) -> Divergence:
+        """
+        Minimizes the input of a divergence (cf. base_wrapper.shrink).
+        """
+        row: Row = shrink(
+            divergence.args,
+            self.diverges,  # type: ignore
+            max_executions,
+        )
+        shrunk: List[Divergence] = self.divergences([row])
+        return shrunk[0] if shrunk else divergence
+
+
+def fuzz(
+    libasm: LibASMWrapper,
+    libasm_ref: LibASMWrapper,
+    function: str,
+    budget: float,
+    seed: Optional[int] = None,
+    batch_size: int = 1000,
+    max_divergences: int = 100,
+    corpus: Optional[Corpus] = None,
+    max_shrunk: int = 10,
+    shrink_executions: int = 1000,
+    timeout: Optional[float] = 10.0,
+    track_allocations: bool = False,
+) -> FuzzReport:
+    """
+    fuzz compares `function` (without its "ft_" prefix) with its reference
+    on generated inputs for `budget` seconds (or until `max_divergences`
+    divergences are found). Calls are run in isolated workers, crashes
+    and calls lasting more than `timeout` seconds are reported as
+    divergences.
+
+    The cases stored in `corpus` are replayed first. The first
+    `max_shrunk` new divergences are then minimized (with at most
+    `shrink_executions` executions each) and added to it.
+
+    The same `seed` generates the same inputs, a random one is picked (and
+    reported) by default.
+
+    With `track_allocations`, the allocations of the function and its
+    invalid frees are reported (cf. base_wrapper.alloc_tracker), the
+    crashing batches excepted.
+    """
+    target: FuzzTarget = targets[function]
+    if seed is None:
+        seed = int.from_bytes(os.urandom(4), "little")
+    rng: random.Random = random.Random(seed)
+    divergences: List[Divergence] = []
+    new_divergences: List[Divergence] = []
+    executions: int = 0
+    start: float = time.perf_counter()
+    deadline: float = start + budget
+    replayed: List[Row] = corpus.load(function) if corpus else []
+
+    with IsolatedExecutor(
+        libasm, timeout=timeout, track_allocations=track_allocations
+    ) as executor:
+        fuzzer: Fuzzer = Fuzzer(libasm_ref, function, executor)
+
+        # Regressions first:
+        for i in range(0, len(replayed), batch_size):
+            divergences += fuzzer.divergences(replayed[i : i + batch_size])
+        executions += len(replayed)
+
+        while (
+            time.perf_counter() < deadline
+            and len(divergences) + len(new_divergences) < max_divergences
+        ):
+            rows: List[Row] = [target.generate(rng) for _ in range(batch_size)]
+            new_divergences += fuzzer.divergences(rows)
+            executions += batch_size
+        duration: float = time.perf_counter() - start
+        # Those of the fuzzed executions, without the reruns of shrinking.
+        allocations: Optional[Allocations] = fuzzer.allocations
+
+        shrunk: Dict[Row, Divergence] = {}
+        for divergence in new_divergences[:max_shrunk]:
+            divergence = fuzzer.shrink(divergence, shrink_executions)
+            shrunk.setdefault(divergence.args, divergence)
+            if corpus is not None:
+                corpus.add(function, divergence.args)
+
+    return FuzzReport(
+        function,
+        seed,
+        executions,
+        duration,
+        (divergences + list(shrunk.values()) + new_divergences[max_shrunk:])[
+            :max_divergences
+        ],
+        len(replayed),
+        allocations,
+    )
@@ -0,0 +1,394 @@
+"""
+The grade module tests many libasm repositories at once (e.g. all the
+submissions of a deadline): repositories are built by a bounded pool of
+build processes, and each test suite runs in its own pytest process as
+soon as its repository is built, so that all the cores are kept busy.
+
+Builds and suites have a timeout, after which their whole process group
+is killed: a pathological submission (an infinite loop, a fork bomb, a
+Makefile waiting for input...) only fails its own grade.
+"""
+
+import concurrent.futures
+import hashlib
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+import xml.etree.ElementTree as ElementTree
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .build_cache import BuildCache, repo_key
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_pytest_config_file = os.path.join(BASE_DIR, "ft_asm_pytester_pytest.ini")
+
+# Lines of output kept in the grades of failed builds and suites.
+_tail_lines: int = 20
+
+
+class Grade(NamedTuple):
+    repo: str
+    # "passed", "failed", "build failed", "timed out" or "error".
+    status: str
+    duration: float
+    passed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    # Ids of the failed tests.
+    failures: List[str] = []
+    # Full output of the build and test suite.
+    log: Optional[str] = None
+    # Last lines of the output, when the build or suite went wrong.
+    tail: str = ""
+
+    def __str__(self) -> str:
+        counts: str = (
+            f"{self.passed} passed, {self.failed} failed,"
+            f" {self.skipped} skipped"
+            if self.status in ("passed", "failed")
+            else self.status
+        )
+        return f"{self.repo}: {counts} ({self.duration:.1f}s)"
+
+    def to_json(self) -> str:
+        return json.dumps(self._asdict())
+
+
+class _Built(NamedTuple):
+    repo: str
+    shared_lib_path: str
+    log: str
+    duration: float
+
+
+def find_repos(paths: Iterable[str]) -> List[str]:
+    """
+    Repositories are directories containing a Makefile. A path that isn't
+    a repository is searched for repositories among its subdirectories.
+    """
+    repos: List[str] = []
+    for path in map(os.path.abspath, paths):
+        if os.path.isfile(os.path.join(path, "Makefile")):
+            repos.append(path)
+            continue
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"{path} not found.")
+        repos.extend(
+            entry.path
+            for entry in sorted(os.scandir(path), key=lambda e: e.name)
+            if entry.is_dir()
+            and os.path.isfile(os.path.join(entry.path, "Makefile"))
+        )
+    return repos
+
+
+def _available_memory() -> Optional[int]:
+    """
+    Memory available without swapping (MemAvailable counts the page cache
+    that can be reclaimed, the free pages don't).
+    """
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError):
+        return None
+
+
+def _cores() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def default_jobs(memory_per_suite: int) -> int:
+    """
+    Number of suites that can run at once: one per core, as long as each
+    one can have `memory_per_suite` bytes.
+    """
+    jobs: int = _cores()
+    memory: Optional[int] = _available_memory()
+    if memory is not None:
+        jobs = min(jobs, memory // memory_per_suite)
+    return max(jobs, 1)
+
+
+def _run(
+    command: Sequence[str], log: Any, timeout: float, **kwargs: Any
+) -> Union[int, None]:
+    """
+    Runs `command` in its own process group, with its output appended to
+    `log`. Returns its exit code, or None if it timed out (the whole group
+    is then killed).
+    """
+    log.write(f"$ {' '.join(command)}\n")
+    log.flush()
+    process: subprocess.Popen = subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+        start_new_session=True,
+        **kwargs,
+    )
+    try:
+        return process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        return None
+    finally:
+        # The leftovers of the command (background processes...) go too.
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        process.wait()
+
+
+def _tail(path: str) -> str:
+    with open(path, errors="replace") as log:
+        return "".join(log.readlines()[-_tail_lines:])
+
+
+def _log_path(logs: str, repo: str) -> str:
+    digest: str = hashlib.sha1(repo.encode()).hexdigest()[:8]
+    return os.path.join(logs, f"{os.path.basename(repo)}-{digest}.log")
+
+
+def _build(
+    repo: str,
+    bonus: bool,
+    static_lib: str,
+    shared_lib: str,
+    logs: str,
+    timeout: float,
+    cache: Optional[BuildCache] = None,
+) -> Union[_Built, Grade]:
+    """
+    Builds the static library with the repository's Makefile, then the
+    shared library out of it (cf. the build task), unless `cache` has it.
+    """
+    start: float = time.perf_counter()
+    log_path: str = _log_path(logs, repo)
+    static_lib_path: str = os.path.join(repo, static_lib)
+    shared_lib_path: str = os.path.join(repo, shared_lib)
+    key: Optional[str] = None
+    if cache is not None:
+        try:
+            key = repo_key(repo, bonus)
+        except OSError:
+            # An unreadable source (e.g. a dangling symlink): the repository
+            # is built without the cache, make reports the problem if any.
+            pass
+    if (
+        cache is not None
+        and key is not None
+        and cache.get(key, shared_lib, shared_lib_path)
+    ):
+        with open(log_path, "w") as log:
+            log.write(f"{shared_lib_path} restored from the build cache.\n")
+        return _Built(
+            repo, shared_lib_path, log_path, time.perf_counter() - start
+        )
+    commands: List[List[str]] = [
+        ["make", "-C", repo, *(["bonus"] if bonus else [])],
+        [
+            "gcc",
+            "-shared",
+            "-g",
+            "-nodefaultlibs",
+            "-o",
+            shared_lib_path,
+            "-Wl,--whole-archive",
+            static_lib_path,
+            "-Wl,--no-whole-archive",
+        ],
+    ]
+    with open(log_path, "w") as log:
+        for command in commands:
+            status: Optional[int] = _run(command, log, timeout)
+            if status != 0 or (
+                command is commands[0] and not os.path.isfile(static_lib_path)
+            ):
+                break
+        else:
+            if cache is not None and key is not None:
+                cache.put(key, shared_lib, shared_lib_path)
+            return _Built(
+                repo, shared_lib_path, log_path, time.perf_counter() - start
+            )
+    return Grade(
+        repo,
+        "timed out" if status is None else "build failed",
+        time.perf_counter() - start,
+        log=log_path,
+        tail=_tail(log_path),
+    )
+
+
+def _test(
+    built: _Built, marks: str, timeout: float, call_timeout: float
+) -> Grade:
+    """
+    Runs the test suite against the built shared library in its own pytest
+    process, and reads its results from a JUnit XML report.
+    """
+    start: float = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        report_path: str = os.path.join(tmp, "report.xml")
+        with open(built.log, "a") as log:
+            status: Optional[int] = _run(
+                [
+                    sys.executable,
+                    "-m",
+                    "pytest",
+                    "-c",
+                    _pytest_config_file,
+                    "-q",
+                    "-p",
+                    "no:cacheprovider",
+                    f"--libasm={built.shared_lib_path}",
+                    f"--call-timeout={call_timeout}",
+                    f"--junitxml={report_path}",
+                    *(["-m", marks] if marks else []),
+                ],
+                log,
+                timeout,
+                cwd=BASE_DIR,
+            )
+        duration: float = built.duration + time.perf_counter() - start
+        if status is None or not os.path.isfile(report_path):
+            return Grade(
+                built.repo,
+                "timed out" if status is None else "error",
+                duration,
+                log=built.log,
+                tail=_tail(built.log),
+            )
+        failures: List[str] = []
+        skipped: int = 0
+        tests: int = 0
+        for case in ElementTree.parse(report_path).iter("testcase"):
+            tests += 1
+            if case.find("skipped") is not None:
+                skipped += 1
+            elif (
+                case.find("failure") is not None
+                or case.find("error") is not None
+            ):
+                failures.append(f"{case.get('classname')}::{case.get('name')}")
+    return Grade(
+        built.repo,
+        "failed" if failures or status != 0 else "passed",
+        duration,
+        passed=tests - skipped - len(failures),
+        failed=len(failures),
+        skipped=skipped,
+        failures=failures,
+        log=built.log,
+        tail=_tail(built.log) if status not in (0, 1) else "",
+    )
+
+
+def grade(
+    repos: Sequence[str],
+    *,
+    bonus: bool = False,
+    static_lib: str = "libasm.a",
+    shared_lib: str = "libasm.so",
+    marks: str = "mandatory",
+    jobs: int = 1,
+    build_jobs: int = 1,
+    build_timeout: float = 120.0,
+    timeout: float = 600.0,
+    call_timeout: float = 30.0,
+    logs: str = "grade_logs",
+    cache: Optional[BuildCache] = None,
+) -> Iterator[Grade]:
+    """
+    Builds and tests `repos`, and yields their grades as they are ready
+    (in no particular order).
+
+    At most `build_jobs` builds and `jobs` test suites run at once. Suites
+    start as soon as their repository is built. Repositories whose shared
+    library is in `cache` aren't built again.
+    """
+    os.makedirs(logs, exist_ok=True)
+    with (
+        concurrent.futures.ThreadPoolExecutor(build_jobs) as builds,
+        concurrent.futures.ThreadPoolExecutor(jobs) as suites,
+    ):
+        # Repository of each build or suite, and when it was submitted:
+        pending: Dict[concurrent.futures.Future, Tuple[str, float]] = {
+            builds.submit(
+                _build,
+                repo,
+                bonus,
+                static_lib,
+                shared_lib,
+                logs,
+                build_timeout,
+                cache,
+            ): (repo, time.perf_counter())
+            for repo in repos
+        }
+        while pending:
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                repo, start = pending.pop(future)
+                outcome: Union[_Built, Grade]
+                try:
+                    outcome = future.result()
+                except Exception:
+                    # A repository breaking the grader (e.g. an unreadable
+                    # log or report) only gets an error grade.
+                    outcome = Grade(
+                        repo,
+                        "error",
+                        time.perf_counter() - start,
+                        tail="".join(
+                            traceback.format_exc().splitlines(True)[
+                                -_tail_lines:
+                            ]
+                        ),
+                    )
+                if isinstance(outcome, Grade):
+                    yield outcome
+                else:
+                    pending[
+                        suites.submit(
+                            _test, outcome, marks, timeout, call_timeout
+                        )
+                    ] = (repo, time.perf_counter())
+
+
+def summary(grades: Sequence[Grade]) -> str:
+    statuses: Dict[str, int] = {}
+    for g in grades:
+        statuses[g.status] = statuses.get(g.status, 0) + 1
+    return f"{len(grades)} repositories: " + ", ".join(
+        f"{count} {status}" for status, count in sorted(statuses.items())
+    )
@@ -1,6 +1,8 @@
 import ctypes
+import os
 from typing import (
     Dict,
+    Optional,
 )
 
 from base_wrapper import BaseWrapper
@@ -8,6 +10,15 @@ from base_wrapper.wrapper_types import FuncInfos, PointerToChar
 from base_wrapper.utils import pointer_to_char_errcheck, integer_errcheck
 from t_list import TList
 
+# int (*cmp)() of ft_list_sort and ft_list_remove_if, called with two data
+# pointers.
+ListComparator = ctypes.CFUNCTYPE(
+    ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p
+)
+# void (*free_fct)(void *) of ft_list_remove_if.
+FreeFunction = ctypes.CFUNCTYPE(None, ctypes.c_void_p)
+
+
 class LibASMWrapper(BaseWrapper):
     # TODO: Check this docstring.
     """
@@ -91,7 +102,7 @@ class LibASMWrapper(BaseWrapper):
         "list_sort": FuncInfos(
             argtypes=(
                 ctypes.POINTER(ctypes.POINTER(TList)),
-                ctypes.CFUNCTYPE(ctypes.c_int),
+                ListComparator,
             ),
             restype=type(None),
             errcheck=None,
@@ -100,8 +111,8 @@ class LibASMWrapper(BaseWrapper):
             argtypes=(
                 ctypes.POINTER(ctypes.POINTER(TList)),
                 ctypes.c_void_p,
-                ctypes.CFUNCTYPE(ctypes.c_int),
-                ctypes.CFUNCTYPE(None, ctypes.c_void_p)
+                ListComparator,
+                FreeFunction,
             ),
             restype=type(None),
             errcheck=None,
@@ -124,6 +135,26 @@ class LibASMWrapper(BaseWrapper):
 
     non_ref_prefix: str = "ft_"
 
+    # Compiled by the build task.
+    batch_shim_path: Optional[str] = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "libasm_test_suite",
+        "bin_tools",
+        "batch.so",
+    )
+    alloc_tracker_path: Optional[str] = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "libasm_test_suite",
+        "bin_tools",
+        "alloc_tracker.so",
+    )
+    fault_reporter_path: Optional[str] = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "libasm_test_suite",
+        "bin_tools",
+        "fault_reporter.so",
+    )
+
     def __init__(self, *args, ref: bool = False, **kwargs):
         self.ref = ref
         super().__init__(*args, **kwargs)
@@ -0,0 +1,164 @@
+"""
+The scaling module measures how the costs of the libasm functions grow
+with the size of their input, and fits them to complexity classes (cf.
+base_wrapper.complexity).
+
+Three metrics are available:
+ - "comparisons": calls to the comparator (ft_list_sort only, with the
+   native comparator of libasm_wrapper.callbacks), exact,
+ - "instructions": instructions retired inside the library (cf.
+   base_wrapper.ptrace), exact, for the string functions,
+ - "time": durations, noisy but available for every function.
+"""
+
+import ctypes
+import random
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from base_wrapper.benchmark import benchmark
+from base_wrapper.complexity import (
+    ComplexityFit,
+    analyze,
+    geometric_sizes,
+)
+from base_wrapper.ptrace import count_instructions
+from linked_lists import IntListArena
+from .bench import (
+    KiB,
+    MiB,
+    case_builders,
+    result_cleanup,
+)
+from .callbacks import NativeCallbacks, native_callbacks
+from .libasm_wrapper import LibASMWrapper
+
+metrics: Sequence[str] = ("comparisons", "instructions", "time")
+
+# Complexities expected from a reasonable implementation.
+expected_complexities: Dict[str, str] = {
+    "strlen": "n",
+    "strcpy": "n",
+    "strcmp": "n",
+    "strdup": "n",
+    "list_sort": "n log n",
+}
+
+# Quadratic sorts call the comparator n^2 / 2 times, and single-stepping
+# costs a few microseconds per instruction.
+_default_sizes: Dict[str, Sequence[int]] = {
+    "comparisons": geometric_sizes(16, 16 * KiB),
+    "instructions": geometric_sizes(256, 16 * KiB, 4),
+    "time": geometric_sizes(4 * KiB, 4 * MiB, 4),
+}
+
+
+def default_metric(function: str) -> str:
+    return "comparisons" if function == "list_sort" else "instructions"
+
+
+def default_sizes(function: str, metric: str) -> Sequence[int]:
+    if function == "list_sort" and metric == "time":
+        return _default_sizes["comparisons"]
+    return _default_sizes[metric]
+
+
+def _shuffled_list(size: int, seed: int) -> IntListArena:
+    return IntListArena(random.Random(seed).sample(range(size), size))
+
+
+def _raw_list_sort(libasm: LibASMWrapper) -> Any:
+    return getattr(libasm, f"raw_{libasm.non_ref_prefix}list_sort")
+
+
+def sort_comparisons(libasm: LibASMWrapper, size: int, seed: int = 0) -> int:
+    """
+    Number of comparator calls ft_list_sort makes to sort `size` shuffled
+    integers.
+    """
+    callbacks: NativeCallbacks = native_callbacks()
+    arena: IntListArena = _shuffled_list(size, seed)
+    before: int = callbacks.count("cmp_int_asc")
+    _raw_list_sort(libasm)(ctypes.pointer(arena.head), callbacks.cmp_int_asc)
+    return callbacks.count("cmp_int_asc") - before
+
+
+def sort_duration(libasm: LibASMWrapper, size: int, seed: int = 0) -> float:
+    """
+    Duration (in nanoseconds) of ft_list_sort on `size` shuffled integers.
+    """
+    callbacks: NativeCallbacks = native_callbacks()
+    arena: IntListArena = _shuffled_list(size, seed)
+    head: Any = ctypes.pointer(arena.head)
+    list_sort: Any = _raw_list_sort(libasm)
+    start: int = time.perf_counter_ns()
+    list_sort(head, callbacks.cmp_int_asc)
+    return time.perf_counter_ns() - start
+
+
+def _string_cost(
+    libasm: LibASMWrapper,
+    function: str,
+    size: int,
+    measure: Callable[..., float],
+) -> float:
+    args, release = case_builders[function](size)
+    try:
+        return measure(
+            getattr(libasm, f"raw_{libasm.non_ref_prefix}{function}"), *args
+        )
+    finally:
+        release()
+
+
+def cost_function(
+    libasm: LibASMWrapper, function: str, metric: str
+) -> Callable[[int], float]:
+    """
+    Returns the cost of `function` (without its "ft_" prefix) as a
+    function of the input size.
+    """
+    if function == "list_sort":
+        if metric == "comparisons":
+            return lambda size: sort_comparisons(libasm, size)
+        if metric == "time":
+            return lambda size: sort_duration(libasm, size)
+    elif function in case_builders:
+        if metric == "instructions":
+            return lambda size: _string_cost(
+                libasm,
+                function,
+                size,
+                lambda f, *args: count_instructions(f, *args).in_library,
+            )
+        if metric == "time":
+            return lambda size: _string_cost(
+                libasm,
+                function,
+                size,
+                lambda f, *args: benchmark(
+                    f,
+                    *args,
+                    cleanup=result_cleanup(function),
+                ).median,
+            )
+    raise ValueError(f"The {metric} of {function} can't be measured.")
+
+
+def analyze_function(
+    libasm: LibASMWrapper,
+    function: str,
+    metric: Optional[str] = None,
+    sizes: Optional[Sequence[int]] = None,
+    repeat: int = 1,
+) -> ComplexityFit:
+    """
+    Fits the costs of `function` (without its "ft_" prefix) over `sizes`
+    (by default, sizes suited to the metric).
+    """
+    metric = metric or default_metric(function)
+    return analyze(
+        cost_function(libasm, function, metric),
+        sizes or default_sizes(function, metric),
+        repeat,
+    )
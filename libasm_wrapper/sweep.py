@@ -0,0 +1,531 @@
+"""
+The sweep module runs the mandatory string functions over every alignment
+(0 to 63) of their pointer arguments crossed with every length (0 to 4096,
+plus large powers of two), to catch the bugs of word-sized and vector
+loops: misaligned heads, tails and page crossings. The functions taking
+two strings are run over every pair of their alignments modulo 16 for
+each length (cf. Cases).
+
+Strings aren't allocated per case: they are views into 64 buffers whose
+nul bytes are at 64 consecutive offsets modulo 64 (cf. Strings), so that a
+string of any length and alignment is a single address. Calls go through
+the batch harness (cf. base_wrapper.batch), in isolated workers (cf.
+base_wrapper.executor), and the expected results are computed by NumPy on
+whole chunks of cases at once.
+
+NumPy is an optional dependency, only needed by this module (pip install
+ft_pytester_libasm[sweep]).
+"""
+
+import array
+import ctypes
+import functools
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from base_wrapper import IsolatedExecutor, Result
+from base_wrapper.batch import BatchFunction
+from .libasm_wrapper import LibASMWrapper
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore[assignment]
+
+# Alignments of each pointer argument.
+alignments: int = 64
+
+# Alignments (modulo this) of the two pointer arguments of ft_strcpy and
+# ft_strcmp crossed for every length.
+pair_alignments: int = 16
+
+# Byte `r` positions before a nul byte (cf. _bytes). Its period makes a
+# string a prefix of the string `period` bytes longer, and its values span
+# the bytes above 127 (signedness bugs of ft_strcmp).
+period: int = 254
+
+# Bytes of the destination buffers of ft_strcpy, which never appear in the
+# strings (cf. _bytes), and of the source buffers past their nul byte, so
+# that copying them shows.
+_sentinel: int = 0xFF
+_past_nul: int = 0xFE
+
+# Last byte of the strings of the second family used by ft_strcmp, compared
+# with _bytes(1) (98, "b"): above 127 on purpose.
+_last_byte: int = 0xE2
+
+# Cases reported per chunk of lengths.
+_max_failures: int = 16
+
+default_lengths: Sequence[int] = (
+    *range(4097),
+    *(2**power for power in range(13, 17)),
+)
+
+# Symbols looked up in the global scope: free is the preloaded one when
+# allocations are tracked (cf. base_wrapper.alloc_tracker).
+_libc = ctypes.CDLL(None)
+_libc.strcmp.argtypes = (ctypes.c_void_p, ctypes.c_void_p)
+_libc.strcmp.restype = ctypes.c_int
+_libc.free.argtypes = (ctypes.c_void_p,)
+_libc.free.restype = None
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ModuleNotFoundError(
+            "The sweep needs NumPy (pip install ft_pytester_libasm[sweep])."
+        )
+
+
+def _round_up(n: Any, multiple: int) -> Any:
+    return -(-n // multiple) * multiple
+
+
+def _aligned_empty(size: int, fill: int) -> "np.ndarray":
+    """
+    A `size` bytes array filled with `fill`, whose data is 64 bytes
+    aligned.
+    """
+    raw: np.ndarray = np.full(size + alignments, fill, np.uint8)
+    shift: int = -raw.ctypes.data % alignments
+    return raw[shift : shift + size]
+
+
+def _bytes(r: "np.ndarray") -> "np.ndarray":
+    """
+    Byte `r` positions before the nul byte of the strings (1 to 254).
+    """
+    return (1 + r * 97 % period).astype(np.uint8)
+
+
+@functools.lru_cache
+def _libc_batch(shim: ctypes.CDLL, name: str) -> BatchFunction:
+    """
+    Batched libc function, to check and free the results.
+    """
+    return BatchFunction(shim, getattr(_libc, name))
+
+
+def _column(addresses: "np.ndarray") -> array.array:
+    """
+    Addresses as a ready-made column of the batch harness.
+    """
+    return array.array("Q", addresses.astype(np.uint64).tobytes())
+
+
+class Strings:
+    """
+    Strings holds every string of up to `max_length` bytes at every
+    alignment: its buffer k ends with a nul byte at an offset equal to k
+    modulo 64, so the string of length L and alignment a is the L bytes
+    before the nul byte of buffer (a + L) % 64.
+
+    The content of a string only depends on its length: its byte r
+    positions before the nul byte is _bytes(r), except the last one when
+    `last_byte` is given.
+    """
+
+    def __init__(self, max_length: int, last_byte: Optional[int] = None):
+        _require_numpy()
+        self.max_length = max_length
+        self.nul_offset: int = _round_up(max_length, alignments) + alignments
+        self.stride: int = self.nul_offset + 2 * alignments
+        self.memory: np.ndarray = _aligned_empty(
+            alignments * self.stride, _past_nul
+        ).reshape(alignments, self.stride)
+        offsets: np.ndarray = np.arange(self.stride)
+        for k in range(alignments):
+            nul: int = self.nul_offset + k
+            self.memory[k, :nul] = _bytes(nul - offsets[:nul])
+            self.memory[k, nul] = 0
+            if last_byte is not None:
+                self.memory[k, nul - 1] = last_byte
+        self.base: int = self.memory.ctypes.data
+
+    def addresses(
+        self, lengths: "np.ndarray", alignment: "np.ndarray"
+    ) -> "np.ndarray":
+        if lengths.size and lengths.max() > self.max_length:
+            raise ValueError(f"Strings are at most {self.max_length} long.")
+        k: np.ndarray = (alignment + lengths) % alignments
+        return self.base + k * self.stride + self.nul_offset + k - lengths
+
+
+@functools.lru_cache(maxsize=2)
+def _strings(max_length: int, last_byte: Optional[int] = None) -> Strings:
+    """
+    Strings are built once per worker.
+    """
+    return Strings(max_length, last_byte)
+
+
+def cases_per_length(two_pointers: bool) -> int:
+    return pair_alignments**2 if two_pointers else alignments
+
+
+class Cases(NamedTuple):
+    """
+    Every length crossed with every alignment of the first pointer
+    argument.
+
+    With `two_pointers`, every length is crossed with every pair of
+    alignments modulo 16 of both pointer arguments (hence with every
+    relative misalignment modulo 16), and both of them still go through
+    every alignment modulo 64: the case i of a length has the alignments
+    i % 64 and (i // 16 + 16 * (i + length)) % 64.
+    """
+
+    lengths: "np.ndarray"
+    alignments: "np.ndarray"
+    # Alignments of the second pointer argument (destination or s2).
+    other_alignments: "np.ndarray"
+
+    @classmethod
+    def of(cls, lengths: Sequence[int], two_pointers: bool = False) -> "Cases":
+        per_length: int = cases_per_length(two_pointers)
+        repeated: np.ndarray = np.repeat(
+            np.asarray(lengths, np.int64), per_length
+        )
+        i: np.ndarray = np.tile(
+            np.arange(per_length, dtype=np.int64), len(lengths)
+        )
+        return cls(
+            repeated,
+            i % alignments,
+            (i // pair_alignments + pair_alignments * (i + repeated))
+            % alignments,
+        )
+
+
+class SweepFailure(NamedTuple):
+    function: str
+    length: int
+    alignment: int
+    # Alignment of the second pointer argument (destination or s2).
+    other_alignment: Optional[int]
+    value: Any
+    expected: Any
+
+    def __str__(self) -> str:
+        alignment: str = f"alignment {self.alignment}"
+        if self.other_alignment is not None:
+            alignment += f"/{self.other_alignment}"
+        return (
+            f"{LibASMWrapper.non_ref_prefix}{self.function} (length"
+            f" {self.length}, {alignment}): {self.value!r} (expected:"
+            f" {self.expected!r})"
+        )
+
+
+class _Outcome(NamedTuple):
+    """
+    Outcome of a chunk of cases in a worker.
+    """
+
+    failed: int
+    failures: List[SweepFailure]
+
+
+def _failures(
+    function: str,
+    cases: Cases,
+    failing: "np.ndarray",
+    describe: Callable[[int], Tuple[Any, Any]],
+    two_pointers: bool = True,
+) -> _Outcome:
+    """
+    `describe` returns the value and the expected one of a failing case
+    (only the reported ones are described).
+    """
+    indices: np.ndarray = np.flatnonzero(failing)
+    return _Outcome(
+        len(indices),
+        [
+            SweepFailure(
+                function,
+                int(cases.lengths[i]),
+                int(cases.alignments[i]),
+                int(cases.other_alignments[i]) if two_pointers else None,
+                *describe(i),
+            )
+            for i in indices[:_max_failures]
+        ],
+    )
+
+
+def _sweep_strlen(
+    f: Callable[..., Any], cases: Cases, max_length: int, shim: ctypes.CDLL
+) -> _Outcome:
+    src: np.ndarray = _strings(max_length).addresses(
+        cases.lengths, cases.alignments
+    )
+    values: np.ndarray = np.frombuffer(f(_column(src))[0], np.uint64)
+    return _failures(
+        "strlen",
+        cases,
+        values != cases.lengths,
+        lambda i: (int(values[i]), int(cases.lengths[i])),
+        two_pointers=False,
+    )
+
+
+def _sweep_strcmp(
+    f: Callable[..., Any], cases: Cases, max_length: int, shim: ctypes.CDLL
+) -> _Outcome:
+    """
+    Cases alternate between 5 kinds: equal strings, s1 prefix of s2, s2
+    prefix of s1, and strings differing at their last byte (either way).
+    Only the signs of the results are compared.
+    """
+    strings: Strings = _strings(max_length)
+    other_strings: Strings = _strings(max_length, _last_byte)
+    lengths: np.ndarray = cases.lengths
+    kinds: np.ndarray = np.arange(len(lengths)) % 5
+    longer: np.ndarray = lengths + period
+    s1: np.ndarray = np.select(
+        [kinds == 2, kinds == 4],
+        [
+            strings.addresses(longer, cases.alignments),
+            other_strings.addresses(lengths, cases.alignments),
+        ],
+        strings.addresses(lengths, cases.alignments),
+    )
+    s2: np.ndarray = np.select(
+        [kinds == 1, kinds == 3],
+        [
+            strings.addresses(longer, cases.other_alignments),
+            other_strings.addresses(lengths, cases.other_alignments),
+        ],
+        strings.addresses(lengths, cases.other_alignments),
+    )
+    last: int = int(np.sign(int(_bytes(np.array(1))) - _last_byte))
+    expected: np.ndarray = np.select(
+        [kinds == 1, kinds == 2, kinds == 3, kinds == 4],
+        [-1, 1, (lengths > 0) * last, (lengths > 0) * -last],
+        0,
+    )
+    values: np.ndarray = np.sign(
+        np.frombuffer(f(_column(s1), _column(s2))[0], np.int64)
+    )
+    return _failures(
+        "strcmp",
+        cases,
+        values != expected,
+        lambda i: (int(values[i]), int(expected[i])),
+    )
+
+
+def _sweep_strcpy(
+    f: Callable[..., Any], cases: Cases, max_length: int, shim: ctypes.CDLL
+) -> _Outcome:
+    """
+    Destinations are laid out in a single arena filled with a sentinel
+    byte: each copy must change exactly length + 1 bytes of its slot, and
+    be equal to its source.
+    """
+    lengths: np.ndarray = cases.lengths
+    slots: np.ndarray = _round_up(
+        cases.other_alignments + lengths + 2, alignments
+    )
+    starts: np.ndarray = np.cumsum(slots) - slots
+    arena: np.ndarray = _aligned_empty(
+        int(slots.sum()) + alignments, _sentinel
+    )
+    dst: np.ndarray = arena.ctypes.data + starts + cases.other_alignments
+    src: np.ndarray = _strings(max_length).addresses(lengths, cases.alignments)
+    returned: np.ndarray = np.frombuffer(
+        f(_column(dst), _column(src))[0], np.uint64
+    )
+    # Counted by 64 bytes blocks first (slots are made of whole blocks).
+    changed: np.ndarray = np.add.reduceat(
+        np.count_nonzero((arena != _sentinel).reshape(-1, alignments), axis=1),
+        starts // alignments,
+    )
+    differ: np.ndarray = (
+        np.frombuffer(
+            _libc_batch(shim, "strcmp")(_column(dst), _column(src))[0],
+            np.int64,
+        )
+        != 0
+    )
+
+    def describe(i: int) -> Tuple[str, str]:
+        value: str = f"{changed[i]} bytes changed"
+        if returned[i] != dst[i]:
+            value += f", returned dst{int(returned[i]) - int(dst[i]):+}"
+        if differ[i]:
+            value += ", different copy"
+        return value, f"{lengths[i] + 1} bytes changed"
+
+    return _failures(
+        "strcpy",
+        cases,
+        (returned != dst) | (changed != lengths + 1) | differ,
+        describe,
+    )
+
+
+def _sweep_strdup(
+    f: Callable[..., Any], cases: Cases, max_length: int, shim: ctypes.CDLL
+) -> _Outcome:
+    src: np.ndarray = _strings(max_length).addresses(
+        cases.lengths, cases.alignments
+    )
+    copies: np.ndarray = np.frombuffer(f(_column(src))[0], np.uint64)
+    allocated: np.ndarray = copies != 0
+    differ: np.ndarray = np.zeros(len(copies), bool)
+    differ[allocated] = (
+        np.frombuffer(
+            _libc_batch(shim, "strcmp")(
+                _column(copies[allocated]), _column(src[allocated])
+            )[0],
+            np.int64,
+        )
+        != 0
+    )
+    _libc_batch(shim, "free")(_column(copies[allocated]))
+    return _failures(
+        "strdup",
+        cases,
+        ~allocated | differ,
+        lambda i: ("different copy" if allocated[i] else None, "a copy"),
+        two_pointers=False,
+    )
+
+
+_Sweep = Callable[[Callable[..., Any], Cases, int, ctypes.CDLL], _Outcome]
+
+_sweeps: Dict[str, _Sweep] = {
+    "strlen": _sweep_strlen,
+    "strcpy": _sweep_strcpy,
+    "strcmp": _sweep_strcmp,
+    "strdup": _sweep_strdup,
+}
+
+swept_functions: Sequence[str] = tuple(_sweeps)
+
+# Functions taking two strings (cf. Cases).
+_two_pointers: Sequence[str] = ("strcpy", "strcmp")
+
+
+def _sweep_chunk(
+    wrapper: LibASMWrapper,
+    function: str,
+    lengths: Sequence[int],
+    max_length: int,
+) -> _Outcome:
+    """
+    Sweeps `lengths` in an isolated worker (cf. IsolatedExecutor.submit).
+    """
+    return _sweeps[function](
+        getattr(wrapper.batch, wrapper.get_attr_name(function)),
+        Cases.of(lengths, function in _two_pointers),
+        max_length,
+        wrapper.batch.shim,
+    )
+
+
+class SweepReport(NamedTuple):
+    function: str
+    cases: int
+    duration: float
+    # Number of failing cases, some of them are reported in failures.
+    failed: int
+    failures: List[SweepFailure]
+    # Lengths whose cases crashed the worker, with the reason.
+    crashes: List[str]
+
+    @property
+    def passed(self) -> bool:
+        return not (self.failed or self.crashes)
+
+    def __str__(self) -> str:
+        return (
+            f"{LibASMWrapper.non_ref_prefix}{self.function}: {self.cases}"
+            f" cases in {self.duration:.1f}s, {self.failed} failures,"
+            f" {len(self.crashes)} crashes."
+        )
+
+    def details(self) -> str:
+        """
+        The report followed by its crashes and reported failures.
+        """
+        return "\n  ".join(map(str, [self, *self.crashes, *self.failures]))
+
+
+def _chunks(lengths: Sequence[int], chunk_size: int) -> List[List[int]]:
+    """
+    Splits `lengths` in chunks of about `chunk_size` string bytes (per
+    alignment).
+    """
+    chunks: List[List[int]] = [[]]
+    size: int = 0
+    for length in lengths:
+        if chunks[-1] and size + length > chunk_size:
+            chunks.append([])
+            size = 0
+        chunks[-1].append(length)
+        size += length + alignments
+    return chunks
+
+
+def sweep(
+    executor: IsolatedExecutor,
+    function: str,
+    lengths: Sequence[int] = default_lengths,
+    chunk_size: int = 1 << 18,
+) -> SweepReport:
+    """
+    Sweeps `function` (without its "ft_" prefix) of the wrapper of
+    `executor`. Chunks of lengths that crash their worker are split until
+    the crashing lengths are found.
+    """
+    _require_numpy()
+    if function not in _sweeps:
+        raise ValueError(
+            f"{function} can't be swept (choices: {', '.join(_sweeps)})."
+        )
+    # The prefix cases of strcmp need longer strings.
+    max_length: int = max(lengths, default=0) + period
+    per_length: int = cases_per_length(function in _two_pointers)
+    failed: int = 0
+    failures: List[SweepFailure] = []
+    crashes: List[str] = []
+    start: float = time.perf_counter()
+
+    def run(chunk: List[int]) -> None:
+        nonlocal failed
+        result: Result = executor.submit(
+            _sweep_chunk, function, chunk, max_length
+        )
+        if not (result.crashed or result.timed_out):
+            failed += result.return_value.failed
+            failures.extend(result.return_value.failures)
+        elif len(chunk) == 1:
+            crashes.append(f"length {chunk[0]}: {result.death_repr()}")
+        else:
+            run(chunk[: len(chunk) // 2])
+            run(chunk[len(chunk) // 2 :])
+
+    # Chunks of about the same number of string bytes, whatever the number
+    # of cases per length.
+    for chunk in _chunks(lengths, chunk_size * alignments // per_length):
+        run(chunk)
+    return SweepReport(
+        function,
+        len(lengths) * per_length,
+        time.perf_counter() - start,
+        failed,
+        failures,
+        crashes,
+    )
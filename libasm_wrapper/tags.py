@@ -22,7 +22,6 @@ The structure is as follow:
 
 from enum import Enum
 from typing import Union, Sequence
-from pytest import mark
 
 __all__ = [
     "MandatoryFunctionTag",
@@ -82,4 +81,8 @@ all_tags: Sequence[LibASMTag] = (
 
 
 def tag_test(tag: LibASMTag):
+    # pytest is imported here rather than at the top: the CLI imports this
+    # module for its help strings, and shouldn't pay for pytest.
+    from pytest import mark
+
     return mark.__getattr__(tag)
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import pytest
+from base_wrapper.tests.conftest import compiled_shim, gcc  # noqa: F401
 from libasm_wrapper import LibASMWrapper
 
 
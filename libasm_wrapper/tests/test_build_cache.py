@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import os
+import shutil
+
+from libasm_wrapper.build_cache import BuildCache, repo_key
+
+
+def _repo(path):
+    path.mkdir()
+    (path / "Makefile").write_text("all:\n")
+    (path / "ft_strlen.s").write_text("ft_strlen:\n\tret\n")
+    (path / ".git").mkdir()
+    (path / ".git" / "HEAD").write_text("ref: refs/heads/master\n")
+    (path / "libasm.a").write_bytes(b"!<arch>\n")
+    return path
+
+
+def test_repo_key(tmp_path):
+    repo = _repo(tmp_path / "repo")
+    key = repo_key(str(repo))
+
+    # Copies, modification times and build products don't matter:
+    copy = tmp_path / "copy"
+    shutil.copytree(repo, copy)
+    os.utime(copy / "ft_strlen.s", (0, 0))
+    (copy / "libasm.a").write_bytes(b"")
+    (copy / ".git" / "HEAD").write_text("ref: refs/heads/other\n")
+    assert repo_key(str(copy)) == key
+
+    # The sources and the part built do:
+    assert repo_key(str(repo), bonus=True) != key
+    (copy / "ft_strlen.s").write_text("ft_strlen:\n\txor rax, rax\n\tret\n")
+    assert repo_key(str(copy)) != key
+    (repo / "ft_strcmp.s").write_text("")
+    assert repo_key(str(repo)) != key
+
+
+def test_build_cache(tmp_path):
+    cache = BuildCache(str(tmp_path / "cache"))
+    built = tmp_path / "libasm.so"
+    built.write_bytes(b"\x7fELF")
+    installed = tmp_path / "installed.so"
+
+    assert not cache.get("ab12", "libasm.so", str(installed))
+    assert not installed.exists()
+
+    cache.put("ab12", "libasm.so", str(built))
+    built.write_bytes(b"rebuilt")
+    assert cache.get("ab12", "libasm.so", str(installed))
+    assert installed.read_bytes() == b"\x7fELF"
+    assert os.access(installed, os.X_OK)
+    assert not cache.get("cd34", "libasm.so", str(installed))
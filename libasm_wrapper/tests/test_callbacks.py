@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import ctypes
+import os
+
+import pytest
+
+from libasm_wrapper.callbacks import NativeCallbacks
+
+_libc = ctypes.CDLL("libc.so.6")
+_libc.malloc.restype = ctypes.c_void_p
+_libc.malloc.argtypes = (ctypes.c_size_t,)
+
+
+@pytest.fixture(scope="module")
+def callbacks(compiled_shim):
+    return NativeCallbacks(compiled_shim("callbacks.c"))
+
+
+def test_comparators(callbacks):
+    callbacks.reset()
+    one, two = ctypes.c_int(1), ctypes.c_int(2)
+
+    assert callbacks.cmp_int_asc(ctypes.byref(one), ctypes.byref(two)) < 0
+    assert callbacks.cmp_int_desc(ctypes.byref(one), ctypes.byref(two)) > 0
+    assert callbacks.cmp_equal(ctypes.byref(one), ctypes.byref(two)) == 0
+    assert callbacks.cmp_int_asc(ctypes.byref(two), ctypes.byref(two)) == 0
+    assert callbacks.count("cmp_int_asc") == 2
+
+
+def test_counters_are_shared(callbacks):
+    callbacks.reset()
+
+    pid = os.fork()
+    if not pid:
+        callbacks.free_counting(_libc.malloc(16))
+        callbacks.free_noop(None)
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+    assert callbacks.counts()["free_counting"] == 1
+    assert callbacks.counts()["free_noop"] == 1
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+from libasm_wrapper.fuzz import (
+    atoi_base,
+    parse_duration,
+    random_string_pair,
+    targets,
+)
+import pytest
+import random
+
+
+@pytest.mark.parametrize(
+    "s,base,exp",
+    [
+        (b"0", b"", 0),
+        (b"1", b"11", 0),
+        (b"1", b"\t1", 0),
+        (b"+ 0", b"01", 0),
+        (b"  ---+--+1234ab567", b"0123456789", -1234),
+        (b"2A", b"0123456789ABCDEF", 42),
+        (b"1" * 40, b"01", None),
+    ],
+)
+def test_atoi_base_oracle(s: bytes, base: bytes, exp):
+    assert atoi_base(s, base) == exp
+
+
+def test_parse_duration():
+    assert parse_duration("60s") == parse_duration("1m") == 60
+    assert parse_duration("1.5") == 1.5
+    with pytest.raises(ValueError):
+        parse_duration("1 minute")
+
+
+@pytest.mark.parametrize("function", list(targets))
+def test_generation_is_seeded(function: str):
+    generate = targets[function].generate
+    rng_1, rng_2 = random.Random(42), random.Random(42)
+
+    assert [generate(rng_1) for _ in range(100)] == [
+        generate(rng_2) for _ in range(100)
+    ]
+
+
+def test_generated_strings_have_no_nul_byte():
+    rng = random.Random(0)
+    for _ in range(1000):
+        assert not any(b"\0" in s for s in random_string_pair(rng))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+import os
+import time
+
+import libasm_wrapper.grade
+from libasm_wrapper.build_cache import BuildCache
+from libasm_wrapper.grade import (
+    Grade,
+    _Built,
+    _build,
+    _run,
+    default_jobs,
+    find_repos,
+    grade,
+)
+
+
+def _alive(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            return stat.read().split()[2] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def test_find_repos(tmp_path):
+    for name in ["b", "a", "not_a_repo"]:
+        (tmp_path / name).mkdir()
+    for name in ["a", "b"]:
+        (tmp_path / name / "Makefile").write_text("all:\n")
+
+    assert find_repos([str(tmp_path)]) == [
+        str(tmp_path / "a"),
+        str(tmp_path / "b"),
+    ]
+    assert find_repos([str(tmp_path / "b")]) == [str(tmp_path / "b")]
+
+
+def test_default_jobs():
+    assert 1 <= default_jobs(1) <= (os.cpu_count() or 1)
+    assert default_jobs(1 << 60) == 1
+
+
+def test_run_timeout_kills_the_process_group(tmp_path):
+    pid_file = tmp_path / "pid"
+    with open(tmp_path / "log", "w") as log:
+        start = time.perf_counter()
+        status = _run(
+            ["sh", "-c", f"sleep 60 & echo $! > {pid_file}; wait"], log, 0.5
+        )
+
+    assert status is None
+    assert time.perf_counter() - start < 10
+    # The background process was killed too (it may be left as a zombie
+    # until it's reaped):
+    time.sleep(0.1)
+    assert not _alive(int(pid_file.read_text()))
+
+
+def test_build_unreadable_source(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "Makefile").write_text("all:\n\tar rcs libasm.a\n")
+    (repo / "broken.s").symlink_to(tmp_path / "nonexistent")
+    logs = tmp_path / "logs"
+    logs.mkdir()
+
+    # The sources can't be hashed: the repository is built uncached.
+    built = _build(
+        str(repo),
+        False,
+        "libasm.a",
+        "libasm.so",
+        str(logs),
+        60,
+        BuildCache(str(tmp_path / "cache")),
+    )
+
+    assert isinstance(built, _Built)
+    assert os.path.isfile(built.shared_lib_path)
+
+
+def test_grade_survives_a_raising_build(tmp_path, monkeypatch):
+    def build(repo, *args):
+        if repo == "b":
+            raise RuntimeError("grader bug")
+        return Grade(repo, "build failed", 0.0)
+
+    monkeypatch.setattr(libasm_wrapper.grade, "_build", build)
+
+    grades = {
+        g.repo: g
+        for g in grade(["a", "b", "c"], jobs=2, logs=str(tmp_path / "logs"))
+    }
+
+    assert grades["a"].status == grades["c"].status == "build failed"
+    assert grades["b"].status == "error"
+    assert "RuntimeError: grader bug" in grades["b"].tail
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import ctypes
+
+import pytest
+
+from base_wrapper import IsolatedExecutor
+from libasm_wrapper import LibASMWrapper
+from libasm_wrapper.sweep import (
+    Cases,
+    Strings,
+    cases_per_length,
+    sweep,
+    swept_functions,
+)
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture(scope="module")
+def libc_executor(compiled_shim):
+    libc = LibASMWrapper(
+        "libc.so.6",
+        ref=True,
+        system_lib=True,
+        batch_shim=compiled_shim("batch.c"),
+    )
+    with IsolatedExecutor(libc) as executor:
+        yield executor
+
+
+def test_strings_alignments_and_content():
+    strings = Strings(300)
+    cases = Cases.of([0, 1, 63, 64, 65, 300])
+    addresses = strings.addresses(cases.lengths, cases.alignments)
+
+    assert (addresses % 64 == cases.alignments).all()
+    for address, length in zip(addresses, cases.lengths):
+        s = ctypes.string_at(int(address))
+        assert len(s) == length
+        # Same content at every alignment:
+        assert s == ctypes.string_at(
+            int(addresses[cases.lengths == length][0])
+        )
+
+
+def test_two_pointers_cases():
+    cases = Cases.of([8, 9], two_pointers=True)
+
+    for length in (8, 9):
+        selected = cases.lengths == length
+        alignments = cases.alignments[selected]
+        other_alignments = cases.other_alignments[selected]
+        assert set(zip(alignments % 16, other_alignments % 16)) == {
+            (a, b) for a in range(16) for b in range(16)
+        }
+        assert set(alignments) == set(other_alignments) == set(range(64))
+
+
+def test_strings_prefixes():
+    strings = Strings(600)
+    short, long = strings.addresses(np.array([10, 264]), np.array([0, 0]))
+
+    assert ctypes.string_at(int(long)).startswith(ctypes.string_at(int(short)))
+
+
+@pytest.mark.parametrize("function", swept_functions)
+def test_sweep_libc(libc_executor, function):
+    report = sweep(libc_executor, function, lengths=range(130))
+
+    assert report.passed, report.details()
+    assert report.cases == 130 * cases_per_length(
+        function in ("strcpy", "strcmp")
+    )
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+import subprocess
+
+import pytest
+
+from libasm_wrapper.watch import (
+    affected_functions,
+    changed_objects,
+    object_digests,
+)
+
+SOURCES = {
+    "strlen.c": "unsigned long ft_strlen(const char *s) { return !!*s; }\n",
+    "strdup.c": (
+        "unsigned long ft_strlen(const char *s);\n"
+        "char *ft_strdup(const char *s) { ft_strlen(s); return 0; }\n"
+    ),
+    "strcmp.c": "int ft_strcmp(const char *a, const char *b) { return 0; }\n",
+    "helper.c": "int helper(int x) { return x; }\n",
+    "strlen_helper.c": (
+        "unsigned long ft_strlen(const char *s);\n"
+        "unsigned long helper_len_plus_one(const char *s)"
+        " { return ft_strlen(s) + 1; }\n"
+    ),
+    "strcpy.c": (
+        "unsigned long helper_len_plus_one(const char *s);\n"
+        "char *ft_strcpy(char *d, const char *s)"
+        " { helper_len_plus_one(s); return d; }\n"
+    ),
+}
+
+
+def _compile(gcc, repo, name, source):
+    (repo / name).write_text(source)
+    subprocess.run(
+        [gcc, "-c", "-o", str(repo / name.replace(".c", ".o")), name],
+        cwd=repo,
+        check=True,
+    )
+
+
+@pytest.fixture
+def repo(gcc, tmp_path):
+    for name, source in SOURCES.items():
+        _compile(gcc, tmp_path, name, source)
+    return tmp_path
+
+
+def test_affected_functions(gcc, repo):
+    before = object_digests(str(repo))
+    assert len(before) == 6
+
+    _compile(gcc, repo, "strlen.c", SOURCES["strlen.c"].replace("!!", "!"))
+    _compile(gcc, repo, "strcmp.c", SOURCES["strcmp.c"])
+    after = object_digests(str(repo))
+    changed = changed_objects(before, after)
+
+    # Recompiling unchanged sources doesn't change their objects:
+    assert changed == [str(repo / "strlen.o")]
+    # ft_strdup calls ft_strlen, ft_strcpy calls it through a helper:
+    assert affected_functions(changed, after) == {
+        "ft_strlen",
+        "ft_strdup",
+        "ft_strcpy",
+    }
+    assert affected_functions([str(repo / "strcmp.o")], after) == {"ft_strcmp"}
+    # Any function may use a helper:
+    assert affected_functions([str(repo / "helper.o")], after) is None
@@ -0,0 +1,112 @@
+"""
+The watch module supports the watch task: after an incremental rebuild of
+a libasm repository, it tells which ft_* functions changed (the global
+symbols defined by the object files whose content changed, read from
+their symbol tables), so that only their tests are run again.
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional, Set
+
+from base_wrapper.elf import STB_LOCAL, ElfFile
+from base_wrapper.inotify import Event
+
+from .build_cache import digest, is_source
+from .tags import BonusFunctionTag, MandatoryFunctionTag, ToolFunctionTag
+
+# Functions whose tests can be selected by marker.
+tagged_functions: Set[str] = {
+    tag.value
+    for tags in (MandatoryFunctionTag, BonusFunctionTag, ToolFunctionTag)
+    for tag in tags
+}
+
+
+def is_source_change(events: Iterable[Event]) -> bool:
+    """
+    Whether `events` change a file the build depends on (rather than build
+    products).
+    """
+    return any(
+        event.overflow
+        or (not event.is_dir and is_source(os.path.basename(event.path)))
+        for event in events
+    )
+
+
+def object_digests(repo_path: str) -> Dict[str, str]:
+    """
+    Digests of the object files of a repository, by path (hidden
+    directories are skipped).
+    """
+    digests: Dict[str, str] = {}
+    for directory, subdirectories, files in os.walk(repo_path):
+        subdirectories[:] = [
+            d for d in subdirectories if not d.startswith(".")
+        ]
+        for name in files:
+            if name.endswith(".o"):
+                path: str = os.path.join(directory, name)
+                with open(path, "rb") as f:
+                    digests[path] = digest([f.read()])
+    return digests
+
+
+def changed_objects(
+    before: Dict[str, str], after: Dict[str, str]
+) -> List[str]:
+    """
+    Object files created or modified between two calls of object_digests.
+    """
+    return sorted(path for path, d in after.items() if before.get(path) != d)
+
+
+def _symbols(object_path: str, defined: bool) -> Set[str]:
+    """
+    Global symbols defined (or referenced, if not `defined`) by an object
+    file.
+    """
+    with ElfFile(object_path) as elf:
+        return {
+            s.name
+            for s in elf.static_symbols
+            if s.name and s.bind != STB_LOCAL and s.defined == defined
+        }
+
+
+def affected_functions(
+    changed: Iterable[str], objects: Iterable[str] = ()
+) -> Optional[Set[str]]:
+    """
+    Tagged functions defined by the `changed` objects, and by the other
+    `objects` calling them, directly or not (e.g. ft_strdup calling
+    ft_strlen), or None when any function may be affected: a changed object
+    defining none of them (e.g. a helper) may be used by all of them.
+    """
+    # Every affected symbol, tagged or not, as a caller may reach a tagged
+    # function through untagged ones (e.g. a helper calling ft_strlen).
+    symbols: Set[str] = set()
+    for path in changed:
+        defined: Set[str] = _symbols(path, defined=True)
+        if not defined & tagged_functions:
+            return None
+        symbols |= defined
+    callers: Set[str] = set(objects) - set(changed)
+    while True:
+        calling: Set[str] = {
+            path
+            for path in callers
+            if _symbols(path, defined=False) & symbols
+        }
+        if not calling:
+            return symbols & tagged_functions
+        for path in calling:
+            symbols |= _symbols(path, defined=True)
+        callers -= calling
+
+
+def function_marks(functions: Iterable[str]) -> str:
+    """
+    Marker expression selecting the tests of `functions`.
+    """
+    return " or ".join(sorted(functions))
@@ -4,8 +4,22 @@ library perspective.
 """
 
 from typing import List
-from .linked_lists import IntLinkedList
+from .arena import IntListArena
+from .linked_lists import (
+    BaseLinkedList,
+    IntLinkedList,
+    LinkedListCycleError,
+    build_int_linked_list,
+    first_difference,
+    linked_lists_diff,
+)
 
 __all__: List = [
+    "BaseLinkedList",
     "IntLinkedList",
+    "IntListArena",
+    "LinkedListCycleError",
+    "build_int_linked_list",
+    "first_difference",
+    "linked_lists_diff",
 ]
@@ -0,0 +1,238 @@
+"""
+This module provides IntListArena, an allocator laying out the nodes of a
+linked list of integers and their payloads in a single anonymous mapping.
+
+Lists of millions of elements are built and read back with a handful of
+bulk copies, without any Python object per node.
+"""
+
+import array
+import ctypes
+import mmap
+from typing import Any, Optional, Union
+
+from .linked_lists import BaseLinkedList, LinkedListCycleError
+
+NodePointer = Any  # ctypes.POINTER(BaseLinkedList) instance.
+
+
+class IntListArena:
+    """
+    IntListArena builds the linked list of `values` (C ints):
+
+    | node 0 | node 1 | ... | node N-1 | int 0 | int 1 | ... | int N-1 |
+
+    Node i points to int i and to node i + 1 (node N-1's next is NULL).
+
+    The arena owns the memory: nodes and payloads remain valid as long as it
+    (or its head pointer, cf. IntListArena.head) is alive.
+    """
+
+    # LP64 (x86_64) layout.
+    node_size: int = 16
+    payload_size: int = 4
+
+    def __init__(self, values: Union[array.array, Any]) -> None:
+        """
+        values: any iterable of integers. array("i") instances and buffers
+        of C ints (NumPy int32 arrays for instance) are copied in bulk.
+        """
+        payloads: memoryview = self._as_int_buffer(values)
+        self.length: int = len(payloads)
+        nodes_size: int = self.length * self.node_size
+        self._mmap: mmap.mmap = mmap.mmap(
+            -1, max(1, nodes_size + self.length * self.payload_size)
+        )
+        self.nodes_address: int = ctypes.addressof(
+            ctypes.c_char.from_buffer(self._mmap)
+        )
+        self.payloads_address: int = self.nodes_address + nodes_size
+
+        with memoryview(self._mmap) as view:
+            with view[:nodes_size].cast("Q") as nodes:
+                # data pointers:
+                nodes[0::2] = array.array(
+                    "Q",
+                    range(
+                        self.payloads_address,
+                        self.payloads_address
+                        + self.length * self.payload_size,
+                        self.payload_size,
+                    ),
+                )
+                # next pointers:
+                nodes[1::2] = array.array(
+                    "Q",
+                    range(
+                        self.nodes_address + self.node_size,
+                        self.nodes_address + nodes_size + self.node_size,
+                        self.node_size,
+                    ),
+                )
+                if self.length:
+                    nodes[-1] = 0
+            view[nodes_size : nodes_size + payloads.nbytes] = payloads.cast(
+                "B"
+            )
+
+    @staticmethod
+    def _as_int_buffer(values: Any) -> memoryview:
+        try:
+            view: memoryview = memoryview(values)
+            if view.format == "i" and view.ndim == 1 and view.contiguous:
+                return view
+        except TypeError:
+            pass
+        return memoryview(array.array("i", values))
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__}: {self.length} nodes at"
+            f" {self.nodes_address:#x}>"
+        )
+
+    @property
+    def head(self) -> NodePointer:
+        """
+        Pointer to the first node (NULL for an empty list), suitable for
+        t_list * arguments. It keeps the arena alive.
+        """
+        head: NodePointer = ctypes.POINTER(BaseLinkedList)()
+        if self.length:
+            head = ctypes.cast(
+                self.nodes_address, ctypes.POINTER(BaseLinkedList)
+            )
+        head._arena = self
+        return head
+
+    def node_index(self, address: int) -> Optional[int]:
+        """
+        Index of the node at `address`, None if it isn't one of the
+        arena's nodes.
+        """
+        index, offset = divmod(address - self.nodes_address, self.node_size)
+        if offset or not 0 <= index < self.length:
+            return None
+        return index
+
+    def values(
+        self, head: Optional[Any] = None, max_foreign_nodes: int = 1 << 20
+    ) -> array.array:
+        """
+        Reads the list starting at `head` (a node pointer or address,
+        defaults to the first node) back into an array("i").
+
+        Nodes are read from a bulk copy of the arena, only nodes (or
+        payloads) allocated elsewhere (by ft_list_push_front for instance)
+        are read through ctypes. Raises LinkedListCycleError if the list has
+        a cycle (or more than `max_foreign_nodes` of such nodes).
+        """
+        address: int
+        if head is None:
+            address = self.nodes_address if self.length else 0
+        elif isinstance(head, int):
+            address = head
+        else:
+            address = ctypes.cast(head, ctypes.c_void_p).value or 0
+
+        nodes_size: int = self.length * self.node_size
+        nodes: array.array = array.array("Q")
+        payloads: array.array = array.array("i")
+        with memoryview(self._mmap) as view:
+            nodes.frombytes(view[:nodes_size])
+            payloads.frombytes(
+                view[nodes_size : nodes_size + self.length * self.payload_size]
+            )
+
+        if (
+            address == self.nodes_address
+            and nodes[1::2] == self._next_pointers
+        ):
+            # The nodes are still linked in the arena's order (the list
+            # wasn't modified, or only its data pointers were swapped).
+            return self._gather(nodes[0::2], payloads)
+        return self._walk(address, nodes, payloads, max_foreign_nodes)
+
+    @property
+    def _next_pointers(self) -> array.array:
+        next_pointers: array.array = array.array(
+            "Q",
+            range(
+                self.nodes_address + self.node_size,
+                self.nodes_address + (self.length + 1) * self.node_size,
+                self.node_size,
+            ),
+        )
+        if self.length:
+            next_pointers[-1] = 0
+        return next_pointers
+
+    def _gather(
+        self, data_pointers: array.array, payloads: array.array
+    ) -> array.array:
+        payloads_address: int = self.payloads_address
+        payloads_end: int = payloads_address + len(payloads) * 4
+        if data_pointers == array.array(
+            "Q", range(payloads_address, payloads_end, 4)
+        ):
+            return payloads
+        return array.array(
+            "i",
+            (
+                (
+                    payloads[(data - payloads_address) >> 2]
+                    if payloads_address <= data < payloads_end and not data & 3
+                    else ctypes.c_int.from_address(data).value
+                )
+                for data in data_pointers
+            ),
+        )
+
+    def _walk(
+        self,
+        address: int,
+        nodes: array.array,
+        payloads: array.array,
+        max_foreign_nodes: int,
+    ) -> array.array:
+        values: array.array = array.array("i")
+        append = values.append
+        nodes_address: int = self.nodes_address
+        nodes_size: int = len(nodes) * 8
+        payloads_address: int = self.payloads_address
+        payloads_size: int = len(payloads) * 4
+        # Upper bound of the number of nodes before a cycle is certain.
+        remaining: int = self.length + max_foreign_nodes
+        offset: int
+        data: int
+
+        # Offsets are checked with bitwise operations rather than divmod
+        # (nodes are 16 bytes long, payloads 4 bytes long).
+        while address:
+            remaining -= 1
+            if remaining < 0:
+                raise LinkedListCycleError("The list has a cycle.")
+            offset = address - nodes_address
+            if 0 <= offset < nodes_size and not offset & 15:
+                offset >>= 3
+                data = nodes[offset]
+                address = nodes[offset + 1]
+            else:
+                node: BaseLinkedList = BaseLinkedList.from_address(address)
+                data = node.data or 0
+                address = ctypes.cast(node.next, ctypes.c_void_p).value or 0
+            offset = data - payloads_address
+            if 0 <= offset < payloads_size and not offset & 3:
+                append(payloads[offset >> 2])
+            else:
+                append(ctypes.c_int.from_address(data).value)
+        return values
+
+    def close(self) -> None:
+        """
+        Unmaps the arena, pointers to its nodes become dangling.
+        """
+        self._mmap.close()
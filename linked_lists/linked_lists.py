@@ -1,12 +1,124 @@
 """
 This module provides tools for working with chained lists.
+
+Lists are walked iteratively with Floyd's cycle detection, so that
+comparing or printing a list broken by the tested function (a sort making
+a loop for instance) neither recurses nor hangs.
 """
 
-from typing import List
-from ctypes import Structure, c_void_p, pointer, POINTER, cast
+from itertools import zip_longest
+from typing import Any, Iterator, List, Optional, Type
+from ctypes import Structure, c_void_p, POINTER, cast
 import ctypes
 
 
+class LinkedListCycleError(ValueError):
+    """
+    Raised when walking a list that has a cycle.
+    """
+
+
+def _address(node: Any) -> int:
+    """
+    Address of `node`, a node, a node pointer or an address (0 for NULL
+    pointers and None).
+    """
+    if node is None:
+        return 0
+    if isinstance(node, int):
+        return node
+    if isinstance(node, Structure):
+        return ctypes.addressof(node)
+    return cast(node, c_void_p).value or 0
+
+
+def walk(
+    node: Any, node_type: Optional[Type["BaseLinkedList"]] = None
+) -> Iterator["BaseLinkedList"]:
+    """
+    Yields the nodes of the list starting at `node` (cf. _address), as
+    `node_type` instances (defaults to the type of `node` or of the nodes
+    it points to).
+
+    Raises LinkedListCycleError once a cycle is detected.
+    """
+    if node_type is None:
+        node_type = BaseLinkedList
+        if isinstance(node, BaseLinkedList):
+            node_type = type(node)
+        elif isinstance(getattr(node, "_type_", None), type) and issubclass(
+            node._type_, BaseLinkedList
+        ):
+            node_type = node._type_
+    address: int = _address(node)
+    # Floyd's tortoise: it moves every other step, a cycle is certain once
+    # the current node catches up with it.
+    slow: int = address
+    steps: int = 0
+    while address:
+        current: BaseLinkedList = node_type.from_address(address)
+        yield current
+        address = cast(current.next, c_void_p).value or 0
+        steps += 1
+        if not steps & 1:
+            slow = (
+                cast(node_type.from_address(slow).next, c_void_p).value or 0
+            )
+        if address == slow:
+            raise LinkedListCycleError("The list has a cycle.")
+
+
+def has_cycle(node: Any) -> bool:
+    """
+    Whether the list starting at `node` (cf. walk) has a cycle.
+    """
+    try:
+        for _ in walk(node):
+            pass
+    except LinkedListCycleError:
+        return True
+    return False
+
+
+def first_difference(a: Any, b: Any) -> Optional[int]:
+    """
+    Index of the first differing node of lists `a` and `b` (the length of
+    the shortest one if it is a prefix of the other), None if they are
+    equal.
+
+    A list with a cycle is endless: it is compared to the other one until
+    they differ (at the latest at the end of the other one). Only a cycle
+    in both lists raises LinkedListCycleError.
+    """
+    cycles: List[Any] = []
+
+    def nodes(node: Any) -> Iterator[BaseLinkedList]:
+        current: Optional[BaseLinkedList] = None
+        try:
+            for current in walk(node):
+                yield current
+            return
+        except LinkedListCycleError:
+            cycles.append(node)
+            if len(cycles) == 2:
+                raise
+        # The nodes of the cycle repeat endlessly.
+        assert current is not None
+        while True:
+            current = type(current).from_address(
+                cast(current.next, c_void_p).value or 0
+            )
+            yield current
+
+    i: int
+    node_a: Optional[BaseLinkedList]
+    node_b: Optional[BaseLinkedList]
+    for i, (node_a, node_b) in enumerate(zip_longest(nodes(a), nodes(b))):
+        if node_a is None or node_b is None or not node_a.data_equals(node_b):
+            return i
+    return None
+
+
 # TODO: Make it explicitly abstract.
 class BaseLinkedList(Structure):
     """
@@ -22,6 +134,9 @@ class BaseLinkedList(Structure):
     def data_repr(self) -> str:
         raise NotImplementedError()
 
+    def data_equals(self, other: "BaseLinkedList") -> bool:
+        raise NotImplementedError()
+
     def single_node_repr(self) -> str:
         next = f"{self.next}" if self.next else "NULL"
         return (
@@ -30,24 +145,53 @@ class BaseLinkedList(Structure):
             f"Next node address: {next}."
         )
 
-    # TODO: How to avoid the POINTER(self.__class__) that would make the type
-    #       constant through all the linked list?
-    #       Maybe give up these methods for the base class and only use them
-    #       in specific subclasses?
     def full_linked_list_repr(self) -> str:
-        node: BaseLinkedList = self
-        all_nodes_repr: List[str] = [
-            self.single_node_repr(),
-        ]
-        while node.next:
-            node = cast(node.next, POINTER(self.__class__))[0]
-            all_nodes_repr.append(node.single_node_repr())
-        return "\n\n".join(
-            f"Node #{i}:\n" + r for i, r in enumerate(all_nodes_repr)
+        """
+        Representation of every node of the list (use linked_list_repr()
+        for long lists).
+        """
+        nodes_repr: Iterator[str] = (
+            f"Node #{i}:\n" + node.single_node_repr()
+            for i, node in enumerate(walk(self))
         )
+        try:
+            return "\n\n".join(nodes_repr)
+        except LinkedListCycleError:
+            return self.linked_list_repr()
+
+    def linked_list_repr(self, around: int = 0, context: int = 3) -> str:
+        """
+        One line representation of the nodes `around` the given index
+        (within `context` nodes), the other ones are only counted.
+        """
+        lines: List[str] = []
+        skipped: int = 0
+        length: int = 0
+        try:
+            for length, node in enumerate(walk(self), 1):
+                if abs(length - 1 - around) > context:
+                    if length - 1 < around:
+                        skipped += 1
+                    continue
+                if skipped:
+                    lines.append(f"... ({skipped} nodes)")
+                    skipped = 0
+                lines.append(
+                    f"#{length - 1} at {ctypes.addressof(node):#x}:"
+                    f" {node.data_repr()}"
+                )
+        except LinkedListCycleError:
+            lines.append(f"... (cycle detected after {length} nodes)")
+        else:
+            if skipped:
+                lines.append(f"... ({skipped} nodes)")
+            if length - 1 > around + context:
+                lines.append(f"... ({length - 1 - around - context} nodes)")
+            lines.append(f"NULL ({length} nodes)")
+        return "\n".join(lines)
 
     def __repr__(self) -> str:
-        return self.full_linked_list_repr()
+        return self.linked_list_repr()
 
 
 BaseLinkedList._fields_ = [
@@ -61,31 +205,64 @@ class IntLinkedList(BaseLinkedList):
     This simple BaseLinkedList subclass handles integers as data.
     """
 
-    # Cast(
-    #     cast(
-    #         node_1.next, POINTER(IntLinkedList))[0].data, POINTER(
-    #             ctypes.c_int
-    #         )
-    # )[0],
+    @staticmethod
+    def _int_at(address: Optional[int]) -> Optional[int]:
+        if not address:
+            return None
+        return ctypes.c_int.from_address(address).value
+
+    def data_value(self) -> Optional[int]:
+        return self._int_at(self.data)
 
     def data_repr(self) -> str:
-        return str(cast(self.data, POINTER(ctypes.c_int))[0])
+        return str(self.data_value())
+
+    def data_equals(self, other: BaseLinkedList) -> bool:
+        return self.data_value() == self._int_at(other.data)
 
     def __eq__(self, other) -> bool:
-        if (self.next is None) == (other.next is None):
-            return (
-                ctypes.c_int(self.data[0]) == ctypes.c_int(other.data[0])
-                and self.next[0] == other.next[0]
-            )
-        return False
+        if not isinstance(other, BaseLinkedList):
+            return NotImplemented
+        return first_difference(self, other) is None
+
+
+def linked_lists_diff(
+    a: BaseLinkedList, b: BaseLinkedList, context: int = 3
+) -> List[str]:
+    """
+    Explanation of the differences between lists `a` and `b`, limited to
+    the nodes around the first difference (cf. pytest_assertrepr_compare).
+    """
+    try:
+        index: Optional[int] = first_difference(a, b)
+    except LinkedListCycleError:
+        return ["Both lists have a cycle."]
+    if index is None:
+        return ["Lists are equal."]
+    return [
+        *(
+            f"{side} list has a cycle."
+            for side, node in (("Left", a), ("Right", b))
+            if has_cycle(node)
+        ),
+        f"Lists differ at node #{index}:",
+        "Left:",
+        *a.linked_list_repr(index, context).splitlines(),
+        "Right:",
+        *b.linked_list_repr(index, context).splitlines(),
+    ]
 
 
 def build_int_linked_list(integers_list: List[int]):
-    node_p = POINTER(IntLinkedList)()
-    for i in integers_list[::-1]:
-        node: IntLinkedList = IntLinkedList(
-            data=cast(pointer(ctypes.c_int(i)), c_void_p),
-            next=cast(node_p, POINTER(BaseLinkedList)),
-        )
-        node_p = pointer(node)
+    """
+    Returns a pointer to the first node of a linked list of
+    `integers_list`. The nodes and their payloads are allocated in an
+    IntListArena, which the pointer keeps alive.
+    """
+    # Imported here as the arena module depends on this one.
+    from .arena import IntListArena
+
+    arena: IntListArena = IntListArena(integers_list)
+    node_p = cast(arena.head, POINTER(IntLinkedList))
+    node_p._arena = arena  # type: ignore[attr-defined]
     return node_p
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+import array
+import ctypes
+import gc
+
+import pytest
+
+from linked_lists import IntListArena, build_int_linked_list
+
+
+@pytest.mark.parametrize("length", [0, 1, 3, 100000])
+def test_arena_values(length):
+    arena = IntListArena(array.array("i", range(length, 0, -1)))
+
+    assert len(arena) == length
+    assert arena.values() == array.array("i", range(length, 0, -1))
+    assert bool(arena.head) == bool(length)
+
+
+def test_arena_walk():
+    arena = IntListArena([1, 2, 3])
+    nodes = (ctypes.c_uint64 * 6).from_address(arena.nodes_address)
+    # 3 -> 1 -> 2, with a payload allocated elsewhere for 1:
+    payload = ctypes.c_int(42)
+    nodes[0] = ctypes.addressof(payload)
+    nodes[1], nodes[3], nodes[5] = (
+        arena.nodes_address + 16,
+        0,
+        arena.nodes_address,
+    )
+
+    assert list(arena.values(arena.nodes_address + 32)) == [3, 42, 2]
+    assert arena.node_index(arena.nodes_address + 32) == 2
+    assert arena.node_index(arena.nodes_address + 33) is None
+
+
+def test_arena_cycle():
+    arena = IntListArena([1, 2, 3])
+    nodes = (ctypes.c_uint64 * 6).from_address(arena.nodes_address)
+    nodes[5] = arena.nodes_address
+
+    with pytest.raises(ValueError):
+        arena.values(max_foreign_nodes=0)
+
+
+def test_build_int_linked_list_keeps_payloads():
+    head = build_int_linked_list([1, 2, 3])
+    gc.collect()
+
+    assert head[0].data_repr() == "1"
+    assert head._arena.values(head) == array.array("i", [1, 2, 3])
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+import ctypes
+
+import pytest
+
+from linked_lists import (
+    LinkedListCycleError,
+    build_int_linked_list,
+    first_difference,
+    linked_lists_diff,
+)
+
+
+def _with_cycle(integers, target):
+    head = build_int_linked_list(integers)
+    arena = head._arena
+    nodes = (ctypes.c_uint64 * (2 * len(arena))).from_address(
+        arena.nodes_address
+    )
+    nodes[-1] = arena.nodes_address + 16 * target
+    return head
+
+
+def test_comparison_is_iterative():
+    a = build_int_linked_list(range(10000))
+    b = build_int_linked_list(range(10000))
+
+    assert a[0] == b[0]
+    assert first_difference(a, b) is None
+
+
+@pytest.mark.parametrize(
+    "integers, index",
+    [([1, 2, 4], 2), ([1, 2], 2), ([1, 2, 3, 4], 3), ([], 0)],
+)
+def test_first_difference(integers, index):
+    assert (
+        first_difference(
+            build_int_linked_list([1, 2, 3]), build_int_linked_list(integers)
+        )
+        == index
+    )
+
+
+def test_cycles():
+    looping = _with_cycle([1, 2, 3, 4, 5], 1)
+
+    assert first_difference(build_int_linked_list([1, 2, 3]), looping) == 3
+    with pytest.raises(LinkedListCycleError):
+        first_difference(looping, looping)
+    assert repr(looping[0]).endswith("(cycle detected after 7 nodes)")
+
+
+def test_one_sided_cycle():
+    # The cycle is detected before the end of the equal prefix.
+    looping = _with_cycle([1] * 4, 0)
+    ones = build_int_linked_list([1] * 10)
+
+    assert first_difference(looping, ones) == 10
+    assert first_difference(ones, looping) == 10
+    assert looping[0] != ones[0]
+    diff = linked_lists_diff(looping[0], ones[0])
+    assert diff[:2] == ["Left list has a cycle.", "Lists differ at node #10:"]
+    diff = linked_lists_diff(ones[0], looping[0])
+    assert diff[:2] == ["Right list has a cycle.", "Lists differ at node #10:"]
+    assert linked_lists_diff(looping[0], looping[0]) == [
+        "Both lists have a cycle."
+    ]
+
+
+def test_bounded_repr():
+    a = build_int_linked_list(range(100000))
+    b = build_int_linked_list([*range(500), -1, *range(501, 100000)])
+
+    diff = linked_lists_diff(a[0], b[0], context=2)
+
+    assert diff[0] == "Lists differ at node #500:"
+    assert len(diff) == 1 + 2 * 9
+    assert diff[-1] == "NULL (100000 nodes)"
+    assert diff[-5].endswith(": -1")
@@ -1,11 +1,20 @@
-from invoke import task, Context
-from typing import List, Optional
+from contextlib import contextmanager
+from invoke import task, Context, Exit
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
 import os
+import signal
 import sys
+import time
+import traceback
 from libasm_wrapper.tags import (
     LibASMTag,
+    MandatoryFunctionTag,
     all_tags,
 )
+from libasm_wrapper.build_cache import BuildCache, repo_key, shim_key
+
+# The wrappers, pytest and NumPy are imported by the tasks that use them:
+# the CLI (e.g. --help) shouldn't pay for them.
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -15,23 +24,122 @@ _static_lib_filename_bonus = "libasm_bonus.a"
 _shared_lib_filename_bonus = "libasm_bonus.so"
 _rootdir = "libasm_test_suite"
 
-# strdup related:
-_run_strdup_src_filename = "run_ft_strdup.c"
-_run_strdup_src_path = os.path.join(
-    os.path.join(BASE_DIR, "libasm_test_suite/bin_tools"),
-    _run_strdup_src_filename,
+# Durations of the startup stages, in order (cf. --startup-time in
+# __main__.py).
+startup_times: List[Tuple[str, float]] = []
+
+
+@contextmanager
+def startup_stage(name: str) -> Iterator[None]:
+    start: float = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_times.append((name, time.perf_counter() - start))
+
+
+# Batch harness (cf. base_wrapper.batch), it doesn't depend on libasm:
+_batch_shim_src_path = os.path.join(
+    BASE_DIR, "libasm_test_suite/bin_tools/batch.c"
+)
+
+# Native list callbacks (cf. libasm_wrapper.callbacks):
+_callbacks_src_path = os.path.join(
+    BASE_DIR, "libasm_test_suite/bin_tools/callbacks.c"
+)
+
+# Allocation tracker (cf. base_wrapper.alloc_tracker):
+_alloc_tracker_src_path = os.path.join(
+    BASE_DIR, "libasm_test_suite/bin_tools/alloc_tracker.c"
+)
+
+# Fault reporter (cf. base_wrapper.faults):
+_fault_reporter_src_path = os.path.join(
+    BASE_DIR, "libasm_test_suite/bin_tools/fault_reporter.c"
 )
-_run_strdup_path = _run_strdup_src_path.replace(".c", "")
+
+
+_shim_flags = "-Wall -Werror -Wextra -shared -fPIC -O2"
+
+
+def _build_tools(c: Context, cache: Optional[BuildCache] = None) -> None:
+    """
+    Builds the shims loaded by the test suite, they don't depend on the
+    libasm repository. Shims found in `cache` aren't recompiled.
+    """
+    with startup_stage("import the wrappers"):
+        from libasm_wrapper import LibASMWrapper
+        from libasm_wrapper.callbacks import callbacks_path
+
+    # Shims: source path, path and libraries to link with.
+    shims: List[Tuple[str, Optional[str], str]] = [
+        # Batch harness:
+        (_batch_shim_src_path, LibASMWrapper.batch_shim_path, ""),
+        # Native callbacks:
+        (_callbacks_src_path, callbacks_path, ""),
+        # Allocation tracker:
+        (_alloc_tracker_src_path, LibASMWrapper.alloc_tracker_path, " -ldl"),
+        # Fault reporter:
+        (_fault_reporter_src_path, LibASMWrapper.fault_reporter_path, ""),
+    ]
+    for src_path, shim_path, libraries in shims:
+        assert shim_path is not None
+        name: str = os.path.basename(shim_path)
+        key: str = shim_key(src_path, f"gcc {_shim_flags}{libraries}")
+        if cache is not None and cache.get(key, name, shim_path):
+            continue
+        c.run(
+            f"gcc {_shim_flags} -o {shim_path} {src_path}{libraries}",
+            echo=True,
+        )
+        if cache is not None:
+            cache.put(key, name, shim_path)
+
+
+def _link(c: Context, static_lib_path: str, shared_lib_path: str) -> None:
+    """
+    Builds the shared library out of the static one.
+    """
+    c.run(
+        f"gcc -shared -g -nodefaultlibs -o {shared_lib_path} "
+        f"-Wl,--whole-archive"
+        f" {static_lib_path} -Wl,--no-whole-archive",
+        echo=True,
+    )
 
 
 @task(
     name="build",
+    help={
+        "path": "path to the libasm repo.",
+        "bonus": "build bonus lib",
+        "cache": (
+            "reuse the libraries built from the same sources (default:"
+            " True, --no-cache to always rebuild)."
+        ),
+        "cache_dir": (
+            "build cache directory (default:"
+            " $XDG_CACHE_HOME/ft_pytester_libasm)."
+        ),
+    },
 )
-def _build(c: Context, /, *, path: str = ".", bonus: bool = False) -> None:
+def _build(
+    c: Context,
+    /,
+    *,
+    path: str = ".",
+    bonus: bool = False,
+    cache: bool = True,
+    cache_dir: Optional[str] = None,
+) -> None:
     """
     The build task takes a libasm repository path and runs its Makefile to
     build the libasm static library (libasm.a). It then builds the shared
     library (libasm.so) out of it.
+
+    The shared library is cached, keyed by a hash of the repository's
+    sources (cf. libasm_wrapper.build_cache): a build of unchanged sources
+    only restores it, without running make.
     """
     # Get paths:
     static_lib_path: str
@@ -45,7 +153,9 @@ def _build(c: Context, /, *, path: str = ".", bonus: bool = False) -> None:
         static_lib_path = os.path.join(repo_path, _static_lib_filename)
         shared_lib_path = os.path.join(repo_path, _shared_lib_filename)
     makefile_path: str = os.path.join(repo_path, "Makefile")
-    includes_path: str = os.path.join(repo_path, "includes")
+    build_cache: Optional[BuildCache] = (
+        BuildCache(cache_dir) if cache else None
+    )
 
     c.run('echo "Running build task"')
 
@@ -59,6 +169,20 @@ def _build(c: Context, /, *, path: str = ".", bonus: bool = False) -> None:
         print(e)
         sys.exit(1)
 
+    _build_tools(c, build_cache)
+
+    # Restore the shared library if its sources were already built:
+    key: str = repo_key(repo_path, bonus)
+    shared_lib_filename: str = os.path.basename(shared_lib_path)
+    if build_cache is not None and build_cache.get(
+        key, shared_lib_filename, shared_lib_path
+    ):
+        c.run(
+            f'echo "{shared_lib_path} restored from the build cache'
+            f' (unchanged sources)."'
+        )
+        return
+
     # Run make:
     c.run(f'echo "Creating {_static_lib_filename} by running the Makefile."')
     # TODO: add other rules as options.
@@ -72,39 +196,15 @@ def _build(c: Context, /, *, path: str = ".", bonus: bool = False) -> None:
         static_lib_path
     ), f"Error: File {static_lib_path} not found."
 
-    # Strdup-related build:
-    # c.run(
-    #     f"gcc -o {_run_strdup_path} -L {repo_path} {_run_strdup_src_path} "
-    #     f"{static_lib_path}",
-    #     echo=True,
-    # )
-    c.run(
-        f"gcc -Wall -Werror -Wextra -g -o {_run_strdup_path} "
-        f"-I {includes_path} {_run_strdup_src_path} "
-        f"{static_lib_path} -L {repo_path}",
-        echo=True,
-    )
-
-    # Build shared library from the static one (if libasm.so is older than
-    # libasm.so):
+    # Build shared library from the static one (always: comparing their
+    # mtimes goes wrong after a checkout or a copy):
     c.run(
         f'echo "Creating {_shared_lib_filename}'
         f' out of {_static_lib_filename}."'
     )
-    if not os.path.isfile(shared_lib_path) or os.path.getmtime(
-        static_lib_path
-    ) > os.path.getmtime(shared_lib_path):
-        c.run(
-            f"gcc -shared -g -nodefaultlibs -o {shared_lib_path} "
-            f"-Wl,--whole-archive"
-            f" {static_lib_path} -Wl,--no-whole-archive",
-            echo=True,
-        )
-    else:
-        c.run(
-            f'echo "{shared_lib_path} younger than {static_lib_path}.'
-            f' Nothing to do."'
-        )
+    _link(c, static_lib_path, shared_lib_path)
+    if build_cache is not None:
+        build_cache.put(key, shared_lib_filename, shared_lib_path)
 
 
 functions_tree = {
@@ -126,6 +226,70 @@ functions_tree = {
 }
 
 
+def _run_suite(shared_lib_path: str, pytest_args: List[str]) -> int:
+    """
+    Runs the test suite against `shared_lib_path` in a child forked from
+    the current process and returns pytest's exit code. pytest and the
+    wrappers are imported before forking, so they stay loaded for the next
+    runs.
+
+    Some tests call the library in the suite's process: when a tested
+    function crashes it, only the child dies. The crash is reported and
+    128 + the signal number is returned (like a shell).
+    """
+    pytest_config_file: str = os.path.join(
+        BASE_DIR, "ft_asm_pytester_pytest.ini"
+    )
+    with startup_stage("import pytest"):
+        import pytest
+    with startup_stage("import the wrappers"):
+        import base_wrapper  # noqa: F401
+        import libasm_wrapper.libasm_wrapper  # noqa: F401
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid: int = os.fork()
+    if pid == 0:
+        exit_code: int = 1
+        try:
+            # From BASE_DIR, like a pytest run from the command line
+            # (testpaths are only used from the rootdir):
+            os.chdir(BASE_DIR)
+            exit_code = pytest.main(
+                [
+                    "-c",
+                    pytest_config_file,
+                    "-sv",
+                    "--maxfail=42",
+                    f"--libasm={shared_lib_path}",
+                    "--color=yes",
+                    *pytest_args,
+                ]
+            )
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(exit_code)
+
+    while True:
+        try:
+            _, status = os.waitpid(pid, 0)
+            break
+        except KeyboardInterrupt:
+            # The child got it too, pytest reports the interrupted run.
+            continue
+    if os.WIFSIGNALED(status):
+        killer: signal.Signals = signal.Signals(os.WTERMSIG(status))
+        print(
+            f"The test suite was killed by {killer.name}: a tested function"
+            " crashed it.",
+            file=sys.stderr,
+        )
+        return 128 + killer
+    return os.waitstatus_to_exitcode(status)
+
+
 @task(
     name="test",
     default=True,
@@ -156,25 +320,21 @@ def test(
 ) -> None:
     """
     Runs the test suite after building the shared library (if necessary).
+
+    The suite runs in a child forked from this process (pytest.main), rather
+    than in a second interpreter.
     """
     shared_lib_path: str
-    tests_flags: str
 
     if tests is None:
         tests = []
 
-    pytest_config_file: str = os.path.join(
-        BASE_DIR, "ft_asm_pytester_pytest.ini"
-    )
-
     repo_path: str = os.path.abspath(path)
     if bonus:
         shared_lib_path = os.path.join(repo_path, _shared_lib_filename_bonus)
     else:
         shared_lib_path = os.path.join(repo_path, _shared_lib_filename)
-    pytest_args: List = []
-
-    d = " --pdb " if debug else ""
+    pytest_args: List[str] = ["--pdb"] if debug else []
 
     c.run('echo "Running test task"')
 
@@ -187,32 +347,708 @@ def test(
     ), f"File {shared_lib_path} not found."
 
     # Run tests:
-    # TODO: consider using a python pytest invoaction :
-    # https://docs.pytest.org/en/6.2.x/usage.html#calling-pytest-from-python-code
-    # Or is it better to keep the command line invocation?
-
     if not tests:
-        if bonus:
-            tests_flags = ''
-        else:
-            tests_flags = '-m mandatory'
+        if not bonus:
+            pytest_args += ["-m", "mandatory"]
     else:
-        tests_flags = '-m "' + " or ".join(flag for flag in tests) + '"'
-    
-    with c.cd(BASE_DIR):
-        c.run(
-            (
-                f"pytest -c {pytest_config_file} -sv --maxfail=42"
-                f" --libasm={shared_lib_path}"
-                f" --color=yes {d} {''.join(pytest_args)}"
-                f" {tests_flags}"
+        pytest_args += ["-m", " or ".join(flag for flag in tests)]
+    exit_code: int = _run_suite(shared_lib_path, pytest_args)
+    if clean:
+        os.remove(shared_lib_path)
+    if exit_code != 0:
+        raise Exit(code=exit_code)
+
+
+@task(
+    name="watch",
+    help={
+        "path": "path to the libasm repo.",
+        "bonus": "build and test the bonus lib.",
+        "initial": "run the whole suite once before watching (default).",
+        "settle": (
+            "seconds without changes to wait for before rebuilding (default:"
+            " 0.2)."
+        ),
+    },
+)
+def watch(
+    c: Context,
+    path: str = ".",
+    bonus: bool = False,
+    initial: bool = True,
+    settle: float = 0.2,
+) -> None:
+    """
+    Watches a libasm repo and, when its sources change, rebuilds it
+    incrementally (make) and re-runs only the tests of the ft_* functions
+    whose object files changed, in a child forked from the same process
+    (a crashing function doesn't stop the watch).
+    """
+    with startup_stage("import the wrappers"):
+        from base_wrapper.inotify import Event, Inotify
+        from libasm_wrapper.watch import (
+            affected_functions,
+            changed_objects,
+            function_marks,
+            is_source_change,
+            object_digests,
+        )
+
+    repo_path: str = os.path.abspath(path)
+    static_lib_path: str = os.path.join(
+        repo_path,
+        _static_lib_filename_bonus if bonus else _static_lib_filename,
+    )
+    shared_lib_path: str = os.path.join(
+        repo_path,
+        _shared_lib_filename_bonus if bonus else _shared_lib_filename,
+    )
+    part: str = "" if bonus else "mandatory"
+    # Marker expression of the tests to run next, None if there are none.
+    marks: Optional[str] = part if initial else None
+    waiting: bool = False
+
+    _build(c, path=repo_path, bonus=bonus)
+
+    with Inotify() as inotify:
+        inotify.add_tree(repo_path)
+        objects: Dict[str, str] = object_digests(repo_path)
+        try:
+            while True:
+                if marks is not None:
+                    # The library is only loaded by the suite's child, each
+                    # build is loaded afresh.
+                    _run_suite(shared_lib_path, ["-m", marks] if marks else [])
+                    marks = None
+
+                if not waiting:
+                    print(
+                        f"Watching {repo_path} (Ctrl-C to stop).", flush=True
+                    )
+                    waiting = True
+                # The build's own writes (objects...) are ignored:
+                events: List[Event] = inotify.read(settle=settle)
+                if not is_source_change(events):
+                    continue
+                waiting = False
+
+                if c.run(
+                    f"make -C {repo_path}{' bonus' if bonus else ''}",
+                    warn=True,
+                ).failed or not os.path.isfile(static_lib_path):
+                    continue
+                _link(c, static_lib_path, shared_lib_path)
+
+                previous_objects: Dict[str, str] = objects
+                objects = object_digests(repo_path)
+                changed: List[str] = changed_objects(previous_objects, objects)
+                if not changed:
+                    print("No object file changed.")
+                    continue
+                functions: Optional[Set[str]] = affected_functions(
+                    changed, objects
+                )
+                if functions is None:
+                    marks = part
+                    continue
+                if not bonus:
+                    functions &= {tag.value for tag in MandatoryFunctionTag}
+                marks = function_marks(functions) or None
+                if marks is None:
+                    print("No tested function changed.")
+        except KeyboardInterrupt:
+            pass
+
+
+@task(
+    name="grade",
+    help={
+        "paths": (
+            "libasm repos, or directories of repos. This option can be"
+            " specified several times."
+        ),
+        "bonus": "build and test the bonus libs.",
+        "tests": (
+            "Marks to designate tests to run (cf. the test task), default:"
+            " mandatory (all the tests with --bonus)."
+        ),
+        "jobs": (
+            "test suites run at once (default: one per core, as long as"
+            " each one has --memory-per-suite)."
+        ),
+        "build_jobs": "builds run at once (default: 4).",
+        "memory_per_suite": "memory needed by a test suite (default: 1GiB).",
+        "build_timeout": (
+            "seconds after which a build step is killed (default: 120)."
+        ),
+        "timeout": (
+            "seconds after which a test suite is killed (default: 600)."
+        ),
+        "call_timeout": (
+            "default timeout (in seconds) of the calls of the suites"
+            " (default: 30)."
+        ),
+        "output": (
+            "report path, one JSON line per repo appended as soon as it's"
+            " graded (default: grade.jsonl)."
+        ),
+        "logs": (
+            "directory of the build and test outputs (default: grade_logs)."
+        ),
+        "cache": (
+            "reuse the libraries built from the same sources (default:"
+            " True, --no-cache to always rebuild)."
+        ),
+        "cache_dir": (
+            "build cache directory (default:"
+            " $XDG_CACHE_HOME/ft_pytester_libasm)."
+        ),
+    },
+    iterable=["paths", "tests"],
+)
+def grade(
+    c: Context,
+    paths: Optional[List[str]] = None,
+    bonus: bool = False,
+    tests: Optional[List[LibASMTag]] = None,
+    jobs: int = 0,
+    build_jobs: int = 4,
+    memory_per_suite: str = "1GiB",
+    build_timeout: float = 120.0,
+    timeout: float = 600.0,
+    call_timeout: float = 30.0,
+    output: str = "grade.jsonl",
+    logs: str = "grade_logs",
+    cache: bool = True,
+    cache_dir: Optional[str] = None,
+) -> None:
+    """
+    Builds and tests many libasm repos in parallel (e.g. the submissions of
+    a deadline), and streams their grades to a single report.
+
+    Each test suite runs in its own pytest process, builds and suites that
+    exceed their timeout are killed without stalling the others.
+    """
+    with startup_stage("import the wrappers"):
+        from libasm_wrapper.bench import parse_size
+        from libasm_wrapper.grade import (
+            Grade,
+            default_jobs,
+            find_repos,
+            grade as run_grade,
+            summary,
+        )
+
+    repos: List[str] = find_repos(paths or ["."])
+    suite_jobs: int = jobs or default_jobs(parse_size(memory_per_suite))
+    grades: List[Grade] = []
+    build_cache: Optional[BuildCache] = (
+        BuildCache(cache_dir) if cache else None
+    )
+
+    _build_tools(c, build_cache)
+    print(
+        f"Grading {len(repos)} repos ({suite_jobs} test suites and"
+        f" {build_jobs} builds at once)."
+    )
+    with open(output, "w") as report:
+        for g in run_grade(
+            repos,
+            bonus=bonus,
+            static_lib=(
+                _static_lib_filename_bonus if bonus else _static_lib_filename
+            ),
+            shared_lib=(
+                _shared_lib_filename_bonus if bonus else _shared_lib_filename
+            ),
+            marks=(
+                " or ".join(tests) if tests else "" if bonus else "mandatory"
             ),
-            pty=True,
+            jobs=suite_jobs,
+            build_jobs=build_jobs,
+            build_timeout=build_timeout,
+            timeout=timeout,
+            call_timeout=call_timeout,
+            logs=logs,
+            cache=build_cache,
+        ):
+            print(g, flush=True)
+            report.write(g.to_json() + "\n")
+            report.flush()
+            grades.append(g)
+    print(summary(grades))
+
+
+@task(
+    name="bench",
+    help={
+        "path": "path to the libasm repo.",
+        "build": "build the static library (libasm.a).",
+        "clean": "remove the shared library (libasm.so) after the benchmark.",
+        "functions": (
+            "Functions to benchmark (default: all the mandatory ones). This"
+            " option can be specified several times."
+        ),
+        "max_size": (
+            "largest input size (e.g. 1MiB, default: 1GiB, or 64KiB when"
+            " counting instructions)."
+        ),
+        "instructions": (
+            "count the instructions retired inside the library (by"
+            " single-stepping the calls) instead of measuring durations."
+            " Counts are exact and don't depend on the machine."
+        ),
+        "output": "JSON report path (default: bench.json).",
+        "threshold": (
+            'Pass/fail threshold, e.g. "ft_strlen:1MiB:4" requires ft_strlen'
+            " to be at most 4 times slower than libc at 1MiB. This option can"
+            " be specified several times."
+        ),
+    },
+    iterable=["functions", "threshold"],
+)
+def bench(
+    c: Context,
+    path: str = ".",
+    build: bool = True,
+    clean: bool = True,
+    functions: Optional[List[str]] = None,
+    max_size: Optional[str] = None,
+    output: str = "bench.json",
+    threshold: Optional[List[str]] = None,
+    instructions: bool = False,
+) -> None:
+    """
+    Benchmarks the ft_* functions against libc over input sizes from 0B to
+    1GiB.
+
+    With --instructions, the instructions retired inside each library are
+    counted instead, which gives results that can be compared exactly
+    between runs and machines.
+    """
+    with startup_stage("import the wrappers"):
+        from libasm_wrapper import LibASMWrapper
+        from libasm_wrapper.bench import (
+            Entry,
+            Threshold,
+            bench as run_bench,
+            benchmarked_functions,
+            count as run_count,
+            default_instruction_sizes,
+            default_sizes,
+            instructions_to_table,
+            parse_size,
+            to_json,
+            to_table,
         )
 
+    repo_path: str = os.path.abspath(path)
+    shared_lib_path: str = os.path.join(repo_path, _shared_lib_filename)
+    thresholds: List[Threshold] = [
+        Threshold.parse(t) for t in threshold or []
+    ]
+    candidate_sizes: Sequence[int] = (
+        default_instruction_sizes if instructions else default_sizes
+    )
+    largest_size: int = (
+        candidate_sizes[-1] if max_size is None else parse_size(max_size)
+    )
+    sizes: List[int] = [
+        size for size in default_sizes if size <= largest_size
+    ]
+    failures: List[str]
+
+    if build:
+        _build(c, path=repo_path)
+
+    # Ensuring that the shared library exists:
+    assert os.path.isfile(
+        shared_lib_path
+    ), f"File {shared_lib_path} not found."
+
+    libasm: LibASMWrapper = LibASMWrapper(shared_lib_path)
+    libasm_ref: LibASMWrapper = LibASMWrapper(
+        "libc.so.6", ref=True, system_lib=True
+    )
+    function_names: List[str] = [
+        f.removeprefix(LibASMWrapper.non_ref_prefix)
+        for f in functions or benchmarked_functions
+    ]
+    entries: Sequence[Entry]
+    if instructions:
+        instruction_entries = run_count(
+            libasm, libasm_ref, functions=function_names, sizes=sizes
+        )
+        print(instructions_to_table(instruction_entries))
+        entries = instruction_entries
+    else:
+        benchmark_entries = run_bench(
+            libasm, libasm_ref, functions=function_names, sizes=sizes
+        )
+        print(to_table(benchmark_entries))
+        entries = benchmark_entries
+    with open(output, "w") as f:
+        f.write(to_json(entries))
+    print(f"JSON report written to {output}.")
+
+    if clean:
+        os.remove(shared_lib_path)
+
+    failures = [
+        failure
+        for failure in (t.check(entries) for t in thresholds)
+        if failure is not None
+    ]
+    if failures:
+        raise Exit("\n".join(failures), code=1)
+
+
+@task(
+    name="fuzz",
+    help={
+        "path": "path to the libasm repo.",
+        "bonus": "build and fuzz the bonus lib (ft_atoi_base).",
+        "build": "build the static library (libasm.a).",
+        "clean": "remove the shared library (libasm.so) after fuzzing.",
+        "function": (
+            "Functions to fuzz (default: all of them). This option can be"
+            " specified several times."
+        ),
+        "budget": (
+            "time budget (e.g. 60s, 5m), shared between the functions"
+            " (default: 60s)."
+        ),
+        "seed": "PRNG seed, to reproduce a run (default: random).",
+        "batch_size": "inputs per batched call (default: 1000).",
+        "corpus": (
+            "directory of the minimized failing cases, replayed before"
+            " generating new inputs (default: fuzz_corpus)."
+        ),
+        "timeout": (
+            "seconds after which a batch is considered stuck (default: 10)."
+        ),
+        "track_allocations": (
+            "report the allocations of the fuzzed functions, and their"
+            " invalid frees (cf. base_wrapper.alloc_tracker)."
+        ),
+    },
+    iterable=["function"],
+)
+def fuzz(
+    c: Context,
+    path: str = ".",
+    bonus: bool = False,
+    build: bool = True,
+    clean: bool = True,
+    function: Optional[List[str]] = None,
+    budget: str = "60s",
+    seed: Optional[str] = None,
+    batch_size: int = 1000,
+    corpus: str = "fuzz_corpus",
+    timeout: float = 10.0,
+    track_allocations: bool = False,
+) -> None:
+    """
+    Compares the ft_* functions with their reference (libc, or a Python
+    oracle for ft_atoi_base) on generated inputs, and reports the
+    executions per second and the divergences found.
+
+    Crashes count as divergences. Divergences are minimized and stored in
+    the corpus, which is replayed first by the next runs.
+    """
+    with startup_stage("import the wrappers"):
+        from base_wrapper.corpus import Corpus
+        from libasm_wrapper import LibASMWrapper
+        from libasm_wrapper.fuzz import (
+            FuzzReport,
+            fuzz as run_fuzz,
+            fuzzed_functions,
+            parse_duration,
+        )
+
+    repo_path: str = os.path.abspath(path)
+    shared_lib_path: str = os.path.join(
+        repo_path,
+        _shared_lib_filename_bonus if bonus else _shared_lib_filename,
+    )
+    functions: List[str] = [
+        f.removeprefix(LibASMWrapper.non_ref_prefix)
+        for f in function
+        or [
+            f
+            for f in fuzzed_functions
+            if bonus or f in LibASMWrapper.libasm_mandatory_functions
+        ]
+    ]
+    function_budget: float = parse_duration(budget) / len(functions)
+    reports: List[FuzzReport] = []
+
+    if build:
+        _build(c, path=repo_path, bonus=bonus)
+
+    # Ensuring that the shared library exists:
+    assert os.path.isfile(
+        shared_lib_path
+    ), f"File {shared_lib_path} not found."
+
+    libasm: LibASMWrapper = LibASMWrapper(shared_lib_path)
+    libasm_ref: LibASMWrapper = LibASMWrapper(
+        "libc.so.6", ref=True, system_lib=True
+    )
+    for function_name in functions:
+        report: FuzzReport = run_fuzz(
+            libasm,
+            libasm_ref,
+            function_name,
+            function_budget,
+            seed=None if seed is None else int(seed),
+            batch_size=batch_size,
+            corpus=Corpus(corpus),
+            timeout=timeout,
+            track_allocations=track_allocations,
+        )
+        print(report)
+        for divergence in report.divergences[:10]:
+            print(f"  {divergence}")
+        reports.append(report)
+
     if clean:
         os.remove(shared_lib_path)
-        os.remove(_run_strdup_path)
+
+    if any(report.divergences for report in reports):
+        raise Exit("Divergences found.", code=1)
+
+
+@task(
+    name="sweep",
+    help={
+        "path": "path to the libasm repo.",
+        "build": "build the static library (libasm.a).",
+        "clean": "remove the shared library (libasm.so) afterwards.",
+        "function": (
+            "Functions to sweep (default: ft_strlen, ft_strcpy, ft_strcmp"
+            " and ft_strdup). This option can be specified several times."
+        ),
+        "max_length": (
+            "largest length, e.g. 1KiB (default: 4096, plus powers of two up"
+            " to 64KiB)."
+        ),
+        "timeout": (
+            "seconds after which a chunk of cases is considered stuck"
+            " (default: 30)."
+        ),
+    },
+    iterable=["function"],
+)
+def sweep(
+    c: Context,
+    path: str = ".",
+    build: bool = True,
+    clean: bool = True,
+    function: Optional[List[str]] = None,
+    max_length: Optional[str] = None,
+    timeout: float = 30.0,
+) -> None:
+    """
+    Runs the string functions over every alignment (0 to 63) of their
+    pointer arguments crossed with every length, and reports the failing
+    cases (needs NumPy).
+    """
+    with startup_stage("import the wrappers"):
+        from base_wrapper import IsolatedExecutor
+        from libasm_wrapper import LibASMWrapper
+        from libasm_wrapper.bench import parse_size
+        from libasm_wrapper.sweep import (
+            SweepReport,
+            default_lengths,
+            sweep as run_sweep,
+            swept_functions,
+        )
+
+    repo_path: str = os.path.abspath(path)
+    shared_lib_path: str = os.path.join(repo_path, _shared_lib_filename)
+    functions: List[str] = [
+        f.removeprefix(LibASMWrapper.non_ref_prefix)
+        for f in function or swept_functions
+    ]
+    lengths: Sequence[int] = (
+        default_lengths
+        if max_length is None
+        else range(parse_size(max_length) + 1)
+    )
+    reports: List[SweepReport] = []
+
+    if build:
+        _build(c, path=repo_path)
+
+    # Ensuring that the shared library exists:
+    assert os.path.isfile(
+        shared_lib_path
+    ), f"File {shared_lib_path} not found."
+
+    libasm: LibASMWrapper = LibASMWrapper(shared_lib_path, timeout=timeout)
+    with IsolatedExecutor(libasm, report_faults=True) as executor:
+        for function_name in functions:
+            report: SweepReport = run_sweep(
+                executor, function_name, lengths
+            )
+            print(report.details())
+            reports.append(report)
+
+    if clean:
+        os.remove(shared_lib_path)
+
+    if not all(report.passed for report in reports):
+        raise Exit("Failing cases found.", code=1)
+
+
+@task(
+    name="complexity",
+    help={
+        "path": "path to the libasm repo.",
+        "bonus": "build and analyze the bonus lib (ft_list_sort).",
+        "build": "build the static library (libasm.a).",
+        "clean": "remove the shared library (libasm.so) afterwards.",
+        "function": (
+            "Functions to analyze (default: ft_strlen and ft_strcmp, and"
+            " ft_list_sort with --bonus). This option can be specified"
+            " several times."
+        ),
+        "metric": (
+            "comparisons (ft_list_sort), instructions (string functions) or"
+            " time (default: the exact metric of each function)."
+        ),
+        "max_complexity": (
+            'largest accepted complexity, e.g. "n log n" (default: O(n) for'
+            " the string functions, O(n log n) for ft_list_sort)."
+        ),
+        "min_confidence": (
+            "confidence below which a fit doesn't fail (default: 0.5)."
+        ),
+    },
+    iterable=["function"],
+)
+def complexity(
+    c: Context,
+    path: str = ".",
+    bonus: bool = False,
+    build: bool = True,
+    clean: bool = True,
+    function: Optional[List[str]] = None,
+    metric: Optional[str] = None,
+    max_complexity: Optional[str] = None,
+    min_confidence: float = 0.5,
+) -> None:
+    """
+    Measures the costs of the ft_* functions over growing input sizes and
+    reports the complexity class they fit best (O(n), O(n log n),
+    O(n^2)...), e.g. to tell a merge sort from a bubble sort.
+    """
+    with startup_stage("import the wrappers"):
+        from base_wrapper.complexity import ComplexityFit, check_complexity
+        from libasm_wrapper import LibASMWrapper
+        from libasm_wrapper.scaling import (
+            analyze_function,
+            expected_complexities,
+        )
+
+    repo_path: str = os.path.abspath(path)
+    shared_lib_path: str = os.path.join(
+        repo_path,
+        _shared_lib_filename_bonus if bonus else _shared_lib_filename,
+    )
+    functions: List[str] = [
+        f.removeprefix(LibASMWrapper.non_ref_prefix)
+        for f in function
+        or ["strlen", "strcmp", *(["list_sort"] if bonus else [])]
+    ]
+    failures: List[str] = []
+
+    if build:
+        _build(c, path=repo_path, bonus=bonus)
+
+    # Ensuring that the shared library exists:
+    assert os.path.isfile(
+        shared_lib_path
+    ), f"File {shared_lib_path} not found."
+
+    libasm: LibASMWrapper = LibASMWrapper(shared_lib_path)
+    for function_name in functions:
+        fit: ComplexityFit = analyze_function(libasm, function_name, metric)
+        print(f"ft_{function_name}: {fit}")
+        failure: Optional[str] = check_complexity(
+            fit,
+            max_complexity or expected_complexities[function_name],
+            min_confidence,
+        )
+        if failure is not None:
+            failures.append(f"ft_{function_name}: {failure}")
+
+    if clean:
+        os.remove(shared_lib_path)
+
+    if failures:
+        raise Exit("\n".join(failures), code=1)
+
+
+@task(
+    name="symbols",
+    help={
+        "path": "path to the libasm repo.",
+        "bonus": "build and inspect the bonus lib.",
+        "build": "build the static library (libasm.a).",
+        "clean": "remove the shared library (libasm.so) afterwards.",
+    },
+)
+def symbols(
+    c: Context,
+    path: str = ".",
+    bonus: bool = False,
+    build: bool = True,
+    clean: bool = True,
+) -> None:
+    """
+    Reports the ft_* functions the shared library defines and the external
+    symbols each one calls (e.g. malloc, or a forbidden strlen), read from
+    its ELF symbols and relocations without loading it.
+    """
+    with startup_stage("import the wrappers"):
+        from base_wrapper.elf import Function, LibraryIndex, library_index
+        from libasm_wrapper import LibASMWrapper
+
+    repo_path: str = os.path.abspath(path)
+    shared_lib_path: str = os.path.join(
+        repo_path,
+        _shared_lib_filename_bonus if bonus else _shared_lib_filename,
+    )
+    missing: List[str] = []
+
+    if build:
+        _build(c, path=repo_path, bonus=bonus)
+
+    # Ensuring that the shared library exists:
+    assert os.path.isfile(
+        shared_lib_path
+    ), f"File {shared_lib_path} not found."
+
+    index: LibraryIndex = library_index(shared_lib_path)
+    for function_name in [
+        *LibASMWrapper.libasm_mandatory_functions,
+        *(LibASMWrapper.libasm_bonus_functions if bonus else []),
+    ]:
+        name: str = LibASMWrapper.non_ref_prefix + function_name
+        function: Optional[Function] = index.functions.get(name)
+        if function is None:
+            print(f"{name}: missing")
+            missing.append(name)
+        else:
+            print(f"{name}: {', '.join(function.imports) or 'no imports'}")
+
+    if clean:
+        os.remove(shared_lib_path)
+
+    if missing:
+        raise Exit(f"Missing functions: {', '.join(missing)}.", code=1)
 
 
 @task